@@ -1,10 +1,34 @@
 import logging
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Generator
+from typing import Any, AsyncGenerator
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy import (
+    Executable,
+    Index,
+    Result,
+    ScalarResult,
+    Table,
+    create_engine,
+    event,
+    func,
+    select,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Bundle, DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+from starlette.concurrency import run_in_threadpool
 
 logger = logging.getLogger("database")
 logger.setLevel(logging.INFO)
@@ -31,27 +55,318 @@ else:
     logger.info("Using SQLite database at %s", sqlite_path)
 
 
+def _env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, "1" if default else "0").lower() not in {"0", "false", "no"}
+
+
 class Base(DeclarativeBase):
     pass
 
 
+# ---- Продовый профиль SQLite: WAL, прагмы, read-only пул + единственный writer ----
+IS_SQLITE = make_url(DATABASE_URL).get_backend_name() == "sqlite"
+SQLITE_TUNED: bool = IS_SQLITE and _env_flag(
+    "APP_SQLITE_TUNED", default=env in {"prod", "production"}
+)
+SQLITE_READ_POOL_SIZE: int = int(os.getenv("APP_SQLITE_READ_POOL_SIZE", "8"))
+
+SQLITE_READ_PRAGMAS: dict[str, int] = {
+    "busy_timeout": 5000,  # мс ожидания блокировки вместо мгновенного SQLITE_BUSY
+    "cache_size": -64000,  # отрицательное значение — KiB, т.е. ~64 МБ
+    "mmap_size": int(os.getenv("APP_SQLITE_MMAP_BYTES", str(256 * 1024 * 1024))),
+}
+SQLITE_WRITE_PRAGMAS: dict[str, int | str] = {
+    "journal_mode": "WAL",  # читатели не блокируются писателем
+    "synchronous": "NORMAL",  # в WAL fsync только на checkpoint
+    **SQLITE_READ_PRAGMAS,
+}
+
+
+# PRAGMA не принимает bind-параметры: имя и значение попадают в текст команды,
+# поэтому допускаются только эти прагмы и значения из фиксированного набора
+_SQLITE_PRAGMA_CHOICES: dict[str, frozenset[str] | None] = {
+    "busy_timeout": None,  # None — целое число
+    "cache_size": None,
+    "mmap_size": None,
+    "journal_mode": frozenset({"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL"}),
+    "synchronous": frozenset({"OFF", "NORMAL", "FULL", "EXTRA"}),
+}
+
+
+def _pragma_statement(name: str, value: Any) -> str:
+    """PRAGMA name=value после проверки по _SQLITE_PRAGMA_CHOICES; иначе ValueError."""
+    if name not in _SQLITE_PRAGMA_CHOICES:
+        raise ValueError(f"Unsupported SQLite pragma: {name!r}")
+    choices = _SQLITE_PRAGMA_CHOICES[name]
+    if choices is None:
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(f"PRAGMA {name} expects an integer, got {value!r}")
+    elif str(value).upper() not in choices:
+        raise ValueError(f"PRAGMA {name} does not accept {value!r}")
+    else:
+        value = str(value).upper()
+    return f"PRAGMA {name}={value}"
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: dict[str, Any]) -> None:
+    """Прагмы выставляются один раз на DBAPI-соединение (флаг живёт в Connection.info)."""
+    # Проверяем сразу: ошибка конфигурации видна при старте, а не на первом запросе
+    statements = [_pragma_statement(name, value) for name, value in pragmas.items()]
+
+    @event.listens_for(engine, "engine_connect")
+    def _set_pragmas(conn: Connection) -> None:
+        if conn.info.get("sqlite_pragmas"):
+            return
+        for statement in statements:
+            conn.exec_driver_sql(statement)
+        conn.commit()
+        conn.info["sqlite_pragmas"] = True
+
+
+def sqlite_readonly_url(url: str) -> str:
+    """sqlite:///path.db -> sqlite:///file:path.db?mode=ro&uri=true."""
+    parsed = make_url(url)
+    return parsed.set(
+        database=f"file:{parsed.database}",
+        query={**parsed.query, "mode": "ro", "uri": "true"},
+    ).render_as_string(hide_password=False)
+
+
+def _sqlite_pool_args(pool_size: int, is_async: bool) -> dict[str, Any]:
+    # Для файлов aiosqlite по умолчанию берёт NullPool — задаём пул явно
+    return {
+        "poolclass": AsyncAdaptedQueuePool if is_async else QueuePool,
+        "pool_size": pool_size,
+        "max_overflow": 0,
+    }
+
+
+class RoutingSession(Session):
+    """Чтение — в read-only пул, запись и flush — через единственный writer.
+
+    Чтение внутри той же транзакции не видит её незакоммиченных записей.
+    """
+
+    def __init__(self, *, writer: Engine, reader: Engine, **kw: Any) -> None:
+        super().__init__(**kw)
+        self.writer = writer
+        self.reader = reader
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any) -> Engine:
+        if self._flushing or isinstance(clause, UpdateBase):
+            return self.writer
+        return self.reader
+
+
+_connect_args = {"check_same_thread": False} if IS_SQLITE else {}
+
 engine = create_engine(
     DATABASE_URL,
-    connect_args=(
-        {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-    ),
+    connect_args=_connect_args,
+    **(_sqlite_pool_args(1, is_async=False) if SQLITE_TUNED else {}),
 )
+read_engine = engine
 
-SessionLocal = sessionmaker(
-    bind=engine,
-    autoflush=False,
-    autocommit=False,
-)
+if SQLITE_TUNED:
+    apply_sqlite_pragmas(engine, SQLITE_WRITE_PRAGMAS)
+    read_engine = create_engine(
+        sqlite_readonly_url(DATABASE_URL),
+        connect_args=_connect_args,
+        **_sqlite_pool_args(SQLITE_READ_POOL_SIZE, is_async=False),
+    )
+    apply_sqlite_pragmas(read_engine, SQLITE_READ_PRAGMAS)
+    SessionLocal: sessionmaker[Session] = sessionmaker(
+        class_=RoutingSession,
+        writer=engine,
+        reader=read_engine,
+        autoflush=False,
+        autocommit=False,
+    )
+else:
+    SessionLocal = sessionmaker(
+        bind=engine,
+        autoflush=False,
+        autocommit=False,
+    )
+
+
+def _duplicate_keys(index: Index, limit: int = 5) -> list[tuple[Any, ...]]:
+    """Значения, которые встречаются больше одного раза под условием индекса."""
+    columns = list(index.columns)
+    stmt = select(*columns).group_by(*columns).having(func.count() > 1).limit(limit)
+    where = index.dialect_options[engine.dialect.name].get("where")
+    if where is not None:
+        stmt = stmt.where(where)
+    with engine.connect() as conn:
+        return [tuple(row) for row in conn.execute(stmt)]
+
+
+def create_missing_indexes(table: Table) -> None:
+    """create_all не добавляет новые индексы в уже существующие таблицы.
+
+    Уникальный индекс, который нарушают уже лежащие в таблице строки, не
+    создаётся: приложение стартует, а в лог уходит ошибка с примерами дубликатов.
+    """
+    for index in table.indexes:
+        try:
+            index.create(bind=engine, checkfirst=True)
+        except IntegrityError:
+            logger.error(
+                "Unique index %s was not created: table %s has duplicate rows, "
+                "e.g. %s. Remove the duplicates and restart to enforce it.",
+                index.name,
+                table.name,
+                _duplicate_keys(index),
+            )
+
+
+class DictBundle(Bundle[dict[str, Any]]):
+    """Набор колонок, который session.scalars() отдаёт как dict — без ORM-объектов."""
 
+    def create_row_processor(self, query: Any, procs: Any, labels: Any) -> Any:
+        def proc(row: Any) -> dict[str, Any]:
+            return dict(zip(labels, [p(row) for p in procs]))
 
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
+        return proc
+
+
+def dialect_insert(entity: type[Base]) -> sqlite.Insert | postgresql.Insert:
+    """INSERT с поддержкой ON CONFLICT для диалекта текущего движка."""
+    if engine.dialect.name == "postgresql":
+        return postgresql.insert(entity)
+    return sqlite.insert(entity)
+
+
+@compiles(Table, "sqlite")
+def _sqlite_table_hint(element: Table, compiler: Any, **kw: Any) -> str:
+    """select().with_hint(table, "INDEXED BY ix", "sqlite") — SQLite сам их не выводит."""
+    text: str = compiler.visit_table(element, **kw)
+    hints = kw.get("fromhints") or {}
+    if kw.get("asfrom") and element in hints:
+        text += " " + hints[element]
+    return text
+
+
+# ---- Async-слой (по умолчанию) и sync-фолбэк ----
+DB_ASYNC: bool = _env_flag("APP_DB_ASYNC", default=True)
+
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    """sqlite:// -> sqlite+aiosqlite://, postgresql[+driver]:// -> postgresql+asyncpg://."""
+    parsed = make_url(url)
+    if parsed.get_dialect().is_async:
+        return url
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver for {parsed.get_backend_name()}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+async_engine: AsyncEngine | None = None
+async_read_engine: AsyncEngine | None = None
+AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = None
+
+if DB_ASYNC:
+    async_engine = create_async_engine(
+        async_database_url(DATABASE_URL),
+        **(_sqlite_pool_args(1, is_async=True) if SQLITE_TUNED else {}),
+    )
+    async_read_engine = async_engine
+    if SQLITE_TUNED:
+        apply_sqlite_pragmas(async_engine.sync_engine, SQLITE_WRITE_PRAGMAS)
+        async_read_engine = create_async_engine(
+            async_database_url(sqlite_readonly_url(DATABASE_URL)),
+            **_sqlite_pool_args(SQLITE_READ_POOL_SIZE, is_async=True),
+        )
+        apply_sqlite_pragmas(async_read_engine.sync_engine, SQLITE_READ_PRAGMAS)
+        AsyncSessionLocal = async_sessionmaker(
+            sync_session_class=RoutingSession,
+            writer=async_engine.sync_engine,
+            reader=async_read_engine.sync_engine,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    else:
+        AsyncSessionLocal = async_sessionmaker(
+            bind=async_engine,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+
+
+def serving_engines() -> list[Engine]:
+    """Sync-движки, через которые идут запросы обработчиков (для событий/метрик)."""
+    if async_engine is not None and async_read_engine is not None:
+        engines = [async_engine.sync_engine, async_read_engine.sync_engine]
+    else:
+        engines = [engine, read_engine]
+    return list(dict.fromkeys(engines))
+
+
+async def dispose_engines() -> None:
+    """Закрывает пулы: потоки aiosqlite-соединений иначе держат процесс при выходе."""
+    for async_eng in dict.fromkeys((async_engine, async_read_engine)):
+        if async_eng is not None:
+            await async_eng.dispose()
+    for sync_eng in dict.fromkeys((engine, read_engine)):
+        sync_eng.dispose()
+
+
+class ThreadedSession:
+    """Sync-сессия за интерфейсом AsyncSession: каждый вызов уходит в пул потоков."""
+
+    def __init__(self, session: Session) -> None:
+        self.sync_session = session
+
+    async def execute(self, statement: Executable, params: Any = None) -> Result[Any]:
+        return await run_in_threadpool(
+            self.sync_session.execute,
+            statement,
+            params,
+            execution_options={"prebuffer_rows": True},
+        )
+
+    async def scalar(self, statement: Executable, params: Any = None) -> Any:
+        return await run_in_threadpool(self.sync_session.scalar, statement, params)
+
+    async def scalars(
+        self, statement: Executable, params: Any = None
+    ) -> ScalarResult[Any]:
+        # Как и AsyncSession, буферизуем строки, чтобы не читать курсор из event loop
+        return await run_in_threadpool(
+            self.sync_session.scalars,
+            statement,
+            params,
+            execution_options={"prebuffer_rows": True},
+        )
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+
+DbSession = AsyncSession | ThreadedSession
+
+
+async def get_db() -> AsyncGenerator[DbSession, None]:
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            yield session
+        return
+
+    threaded = ThreadedSession(SessionLocal())
     try:
-        yield db
+        yield threaded
     finally:
-        db.close()
+        await threaded.close()
+
+
+# Для фоновых задач вне запроса (сборщик мусора и т.п.)
+session_scope = asynccontextmanager(get_db)
@@ -0,0 +1,68 @@
+# app/export.py
+import csv
+import io
+import json
+import os
+from datetime import date
+from typing import Any, Iterable, Iterator, Literal, Sequence
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_CHUNK_ROWS: int = int(os.getenv("APP_EXPORT_CHUNK_ROWS", "1000"))
+EXPORT_FIELDS = ("id", "title", "deadline", "progress")
+EXPORT_MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+# Ячейки с такими префиксами табличные редакторы исполняют как формулы
+_CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_safe(value: Any) -> Any:
+    if isinstance(value, str) and value.startswith(_CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Unsupported type: {type(value).__name__}")
+
+
+def _ndjson_chunk(rows: list[Sequence[Any]]) -> bytes:
+    lines = (
+        json.dumps(
+            dict(zip(EXPORT_FIELDS, row)), default=_json_default, ensure_ascii=False
+        )
+        for row in rows
+    )
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _csv_chunk(rows: list[Sequence[Any]], header: bool) -> bytes:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows([_csv_safe(v) for v in row] for row in rows)
+    return buf.getvalue().encode()
+
+
+def iter_export(
+    rows: Iterable[Sequence[Any]],
+    fmt: ExportFormat,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> Iterator[bytes]:
+    """Сериализует строки порциями по chunk_rows: память не зависит от размера таблицы."""
+    if fmt == "csv":
+        # Заголовок отдаём сразу — первый байт не ждёт первой порции из БД
+        yield _csv_chunk([], header=True)
+    batch: list[Sequence[Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk_rows:
+            yield _ndjson_chunk(batch) if fmt == "ndjson" else _csv_chunk(batch, False)
+            batch = []
+    if batch:
+        yield _ndjson_chunk(batch) if fmt == "ndjson" else _csv_chunk(batch, False)
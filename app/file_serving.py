@@ -0,0 +1,128 @@
+# app/file_serving.py
+import os
+from collections.abc import Mapping
+
+import anyio
+from starlette.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+
+# Адрес blob — его sha256, содержимое по адресу никогда не меняется
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match сравнивается слабо (RFC 9110): W/"x" совпадает с "x"."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """'bytes=a-b' -> (a, b) включительно; None — отдать файл целиком.
+
+    Несколько диапазонов и мусор игнорируются (RFC 9110 это разрешает),
+    диапазон за концом файла — RangeNotSatisfiable (416).
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, sep, last = header.removeprefix("bytes=").strip().partition("-")
+    if not sep or not (first + last).isdigit():
+        return None
+    if not first:
+        # Суффикс: последние N байт
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        raise RangeNotSatisfiable
+    if end < start:
+        return None
+    return start, end
+
+
+class RangeFileResponse(FileResponse):
+    """FileResponse с одним byte range и отдачей через zerocopysend.
+
+    Если сервер объявил ASGI-расширение http.response.zerocopysend, тело
+    уходит через sendfile без копирования в Python; иначе — чтение только
+    запрошенного диапазона блоками по chunk_size.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        stat_result: os.stat_result,
+        byte_range: tuple[int, int] | None = None,
+        headers: Mapping[str, str] | None = None,
+        media_type: str | None = None,
+    ) -> None:
+        size = stat_result.st_size
+        start, end = byte_range or (0, size - 1)
+        merged = {"accept-ranges": "bytes", "content-length": str(end - start + 1)}
+        if byte_range is not None:
+            merged["content-range"] = f"bytes {start}-{end}/{size}"
+        merged.update(headers or {})
+        super().__init__(
+            path,
+            status_code=206 if byte_range is not None else 200,
+            headers=merged,
+            media_type=media_type,
+            stat_result=stat_result,
+            content_disposition_type="inline",
+        )
+        self.offset = start
+        self.count = end - start + 1
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        if scope["method"].upper() == "HEAD" or self.count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            if ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+                await send(
+                    {
+                        "type": ZEROCOPY_EXTENSION,
+                        "file": file.wrapped,
+                        "offset": self.offset,
+                        "count": self.count,
+                        "more_body": False,
+                    }
+                )
+                return
+            await file.seek(self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": remaining > 0,
+                    }
+                )
+            if remaining > 0:
+                # Файл укоротился после stat — закрываем ответ
+                await send(
+                    {"type": "http.response.body", "body": b"", "more_body": False}
+                )
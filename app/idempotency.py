@@ -0,0 +1,240 @@
+# app/idempotency.py
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Annotated
+
+import sqlalchemy as sa
+from fastapi import Depends, Header, HTTPException, Request
+
+from app.database import DbSession, _env_flag, dialect_insert, get_db, session_scope
+from app.models.idempotency import IdempotencyRecord
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+IDEMPOTENCY_TTL_SECONDS: int = int(os.getenv("APP_IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_MAX_KEYS: int = int(os.getenv("APP_IDEMPOTENCY_MAX_KEYS", "10000"))
+# Дублировать ответы в таблицу idempotency_keys: переживают рестарт и видны всем воркерам
+IDEMPOTENCY_PERSIST: bool = _env_flag("APP_IDEMPOTENCY_PERSIST", default=False)
+# Как часто удалять из idempotency_keys записи старше TTL
+IDEMPOTENCY_GC_INTERVAL_SECONDS: int = int(
+    os.getenv("APP_IDEMPOTENCY_GC_INTERVAL_SECONDS", "3600")
+)
+# Сколько ждать завершения первого запроса с тем же ключом
+IDEMPOTENCY_WAIT_SECONDS = 30.0
+MAX_KEY_LENGTH = 255
+
+logger = logging.getLogger("studyplan.idempotency")
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    request_hash: str
+    status: int
+    body: bytes
+    expires_at: float
+
+
+class IdempotentReplay(Exception):
+    """Ответ уже есть: обработчик исключений отдаёт его как есть."""
+
+    def __init__(self, stored: StoredResponse) -> None:
+        super().__init__(stored.status)
+        self.stored = stored
+
+
+class IdempotencyStore:
+    """LRU + TTL ответов по ключу и ожидание запросов, выполняющихся прямо сейчас.
+
+    Запросы с ключом, который уже выполняется, ждут первый, а не гоняются
+    с ним за INSERT. Если первый упал, ключ освобождается и следующий
+    выполняет запрос сам.
+    """
+
+    def __init__(
+        self, max_keys: int = IDEMPOTENCY_MAX_KEYS, ttl: float = IDEMPOTENCY_TTL_SECONDS
+    ) -> None:
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self._entries: OrderedDict[str, StoredResponse] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, now: float | None = None) -> StoredResponse | None:
+        stored = self._entries.get(key)
+        if stored is None:
+            return None
+        if stored.expires_at <= (time.monotonic() if now is None else now):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return stored
+
+    def put(
+        self, key: str, request_hash: str, status: int, body: bytes
+    ) -> StoredResponse:
+        stored = StoredResponse(request_hash, status, body, time.monotonic() + self.ttl)
+        self._entries[key] = stored
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+        return stored
+
+    async def acquire(self, key: str, timeout: float) -> StoredResponse | None:
+        """Готовый ответ или None — ключ захвачен, вызывающий обязан release()."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            stored = self.get(key)
+            if stored is not None:
+                return stored
+            pending = self._inflight.get(key)
+            if pending is None:
+                self._inflight[key] = loop.create_future()
+                return None
+            try:
+                await asyncio.wait_for(asyncio.shield(pending), deadline - loop.time())
+            except asyncio.TimeoutError:
+                raise HTTPException(
+                    status_code=409,
+                    detail="A request with this Idempotency-Key is in progress",
+                ) from None
+
+    def release(self, key: str) -> None:
+        pending = self._inflight.pop(key, None)
+        if pending is not None and not pending.done():
+            pending.set_result(None)
+
+
+idempotency_store = IdempotencyStore()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _expired_before() -> datetime:
+    """Записи с created_at не позже этого момента уже не отдаются повторам."""
+    return _utcnow() - timedelta(seconds=idempotency_store.ttl)
+
+
+class IdempotencySlot:
+    """Захваченный ключ: обработчик сохраняет в него ответ перед commit."""
+
+    def __init__(self, key: str, request_hash: str) -> None:
+        self.key = key
+        self.request_hash = request_hash
+        self._response: tuple[int, bytes] | None = None
+
+    async def save(self, db: DbSession, status: int, body: bytes) -> None:
+        """Вызывать до commit: при персистентности запись идёт в ту же транзакцию."""
+        self._response = (status, body)
+        if IDEMPOTENCY_PERSIST:
+            stmt = dialect_insert(IdempotencyRecord).values(
+                key=self.key,
+                request_hash=self.request_hash,
+                status=status,
+                body=body,
+                created_at=_utcnow(),
+            )
+            # Просроченная запись с тем же ключом заменяется, живая — остаётся
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[IdempotencyRecord.key],
+                    set_={
+                        "request_hash": stmt.excluded.request_hash,
+                        "status": stmt.excluded.status,
+                        "body": stmt.excluded.body,
+                        "created_at": stmt.excluded.created_at,
+                    },
+                    where=IdempotencyRecord.created_at <= _expired_before(),
+                )
+            )
+
+    def commit(self) -> None:
+        """После commit транзакции: ответ становится виден повторам."""
+        if self._response is not None:
+            idempotency_store.put(self.key, self.request_hash, *self._response)
+
+
+async def _load_persisted(db: DbSession, key: str) -> StoredResponse | None:
+    record = await db.scalar(
+        sa.select(IdempotencyRecord).where(
+            IdempotencyRecord.key == key,
+            IdempotencyRecord.created_at > _expired_before(),
+        )
+    )
+    if record is None:
+        return None
+    return idempotency_store.put(key, record.request_hash, record.status, record.body)
+
+
+async def purge_expired(db: DbSession) -> int:
+    """Удаляет из idempotency_keys записи старше TTL; возвращает их число."""
+    purged = list(
+        await db.scalars(
+            sa.delete(IdempotencyRecord)
+            .where(IdempotencyRecord.created_at <= _expired_before())
+            .returning(IdempotencyRecord.key)
+        )
+    )
+    await db.commit()
+    return len(purged)
+
+
+async def run_idempotency_gc(interval: int = IDEMPOTENCY_GC_INTERVAL_SECONDS) -> None:
+    """Фоновая задача из lifespan: периодическая чистка просроченных ключей."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_scope() as db:
+                removed = await purge_expired(db)
+            if removed:
+                logger.info("Idempotency GC removed %d keys", removed)
+        except Exception:
+            logger.exception("Idempotency GC failed")
+
+
+def _check(stored: StoredResponse, request_hash: str) -> None:
+    if stored.request_hash != request_hash:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used with a different request body",
+        )
+    raise IdempotentReplay(stored)
+
+
+async def idempotency_slot(
+    request: Request,
+    key: str | None = Header(None, alias=IDEMPOTENCY_HEADER, max_length=MAX_KEY_LENGTH),
+    db: DbSession = Depends(get_db),
+) -> AsyncIterator[IdempotencySlot | None]:
+    """Зависимость POST-эндпоинта: повтор отдаётся до валидации тела и без запросов к topics."""
+    if key is None:
+        yield None
+        return
+    scoped = f"{request.method} {request.url.path}:{key}"
+    request_hash = hashlib.sha256(await request.body()).hexdigest()
+
+    stored = await idempotency_store.acquire(scoped, IDEMPOTENCY_WAIT_SECONDS)
+    if stored is not None:
+        _check(stored, request_hash)
+    try:
+        if IDEMPOTENCY_PERSIST:
+            stored = await _load_persisted(db, scoped)
+            if stored is not None:
+                _check(stored, request_hash)
+        yield IdempotencySlot(scoped, request_hash)
+    finally:
+        idempotency_store.release(scoped)
+
+
+IdempotencyDep = Annotated[IdempotencySlot | None, Depends(idempotency_slot)]
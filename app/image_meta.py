@@ -0,0 +1,87 @@
+# app/image_meta.py
+import struct
+
+# SOF0..SOF15 без DHT (C4), JPG (C8) и DAC (CC) — в них размеры кадра
+_JPEG_SOF = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Маркеры без поля длины
+_JPEG_STANDALONE = frozenset(range(0xD0, 0xD8)) | {0x01}
+_JPEG_SOS, _JPEG_EOI = 0xDA, 0xD9
+
+
+class ImageHeaderParser:
+    """Ширина и высота из заголовка по мере прихода байт, без декодирования пикселей.
+
+    PNG — чанк IHDR сразу за сигнатурой; JPEG — первый маркер SOFn, сегменты
+    до него (EXIF и т.п.) пропускаются без буферизации. Если заголовок не
+    найден, размеры остаются None.
+    """
+
+    def __init__(self, mime: str) -> None:
+        self.mime = mime
+        self.width: int | None = None
+        self.height: int | None = None
+        self.done = False
+        self._buf = b""
+        self._skip = 2 if mime == "image/jpeg" else 0  # SOI
+
+    def feed(self, chunk: bytes) -> None:
+        if self.done:
+            return
+        if self._skip:
+            skipped = min(self._skip, len(chunk))
+            self._skip -= skipped
+            chunk = chunk[skipped:]
+        self._buf += chunk
+        if self.mime == "image/png":
+            self._parse_png()
+        else:
+            self._parse_jpeg()
+
+    def _parse_png(self) -> None:
+        # 8 байт сигнатуры, длина чанка, тип "IHDR", ширина и высота (big-endian)
+        if len(self._buf) < 24:
+            return
+        if self._buf[12:16] == b"IHDR":
+            self.width, self.height = struct.unpack(">II", self._buf[16:24])
+        self._finish()
+
+    def _parse_jpeg(self) -> None:
+        buf = self._buf
+        while not self.done:
+            if len(buf) < 2:
+                break
+            if buf[0] != 0xFF:
+                self._finish()
+                return
+            if buf[1] == 0xFF:
+                # Байты-заполнители перед маркером
+                buf = buf[1:]
+                continue
+            marker = buf[1]
+            if marker in _JPEG_STANDALONE:
+                buf = buf[2:]
+                continue
+            if marker in (_JPEG_SOS, _JPEG_EOI):
+                self._finish()
+                return
+            if len(buf) < 4:
+                break
+            (length,) = struct.unpack(">H", buf[2:4])
+            if marker in _JPEG_SOF:
+                # Длина, точность (1 байт), высота и ширина (по 2 байта)
+                if len(buf) < 9:
+                    break
+                self.height, self.width = struct.unpack(">HH", buf[5:9])
+                self._finish()
+                return
+            segment = 2 + length
+            if len(buf) < segment:
+                self._skip = segment - len(buf)
+                buf = b""
+                break
+            buf = buf[segment:]
+        self._buf = buf
+
+    def _finish(self) -> None:
+        self.done = True
+        self._buf = b""
@@ -1,27 +1,139 @@
 # app/main.py
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 import time
 import uuid
-from collections import defaultdict
-from datetime import date
+from collections.abc import AsyncIterator, Iterator, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import date, datetime
 from pathlib import Path
-from typing import Awaitable, Callable
+from typing import Annotated, Any, Literal, cast
 
 import sqlalchemy as sa
-from fastapi import Depends, FastAPI, File, HTTPException, Request, UploadFile
-from fastapi.exceptions import RequestValidationError
+from fastapi import Body, Depends, FastAPI, Header, Query, Request
+from fastapi.exceptions import HTTPException, RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response
-from sqlalchemy.orm import Mapped, Session, mapped_column
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Mapped, mapped_column
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.config import mask_sensitive
-from app.database import Base, engine, get_db
-from app.schemas.topic import ProgressUpdate, TopicCreate, TopicResponse
-from app.secure_files import secure_save
-from app.utils.errors import problem_json
+from app.database import (
+    Base,
+    DbSession,
+    DictBundle,
+    SessionLocal,
+    create_missing_indexes,
+    dialect_insert,
+    dispose_engines,
+    engine,
+    get_db,
+    serving_engines,
+    session_scope,
+)
+from app.export import EXPORT_CHUNK_ROWS, EXPORT_MEDIA_TYPES, ExportFormat, iter_export
+from app.file_serving import (
+    IMMUTABLE_CACHE_CONTROL,
+    RangeFileResponse,
+    RangeNotSatisfiable,
+    etag_matches,
+    parse_range,
+)
+from app.idempotency import (
+    REPLAYED_HEADER,
+    IdempotencyDep,
+    IdempotentReplay,
+    run_idempotency_gc,
+)
+from app.metrics import (
+    HTTP_LATENCY,
+    HTTP_REQUESTS,
+    METRICS_CONTENT_TYPE,
+    RATE_LIMIT_REJECTS,
+    REGISTRY,
+    instrument_engines,
+)
+from app.models.upload import UploadBlob, UploadImage
+from app.multipart_stream import stream_file_field
+from app.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+)
+from app.profiling import (
+    PROFILE_MODE,
+    ProfiledRoute,
+    begin_request,
+    dump_profile,
+    end_request,
+    instrument_db_timings,
+    measure,
+    sampled_profiler,
+    stop_profiler,
+    wants_profile,
+)
+from app.ratelimit import SlidingWindowLimiter, match_route_limit, parse_route_limits
+from app.read_cache import (
+    GenerationCache,
+    Rendered,
+    default_process_lock,
+    lock_single_process,
+)
+from app.request_logging import (
+    decode_body,
+    is_sampled,
+    route_log_level,
+    start_queue_logging,
+    stop_queue_logging,
+    wants_body,
+)
+from app.schemas.topic import (
+    ProgressUpdate,
+    TopicBatchItem,
+    TopicBatchResponse,
+    TopicBulkResponse,
+    TopicChangesResponse,
+    TopicCreate,
+    TopicProgressItem,
+    TopicResponse,
+    TopicRow,
+    TopicSearchRow,
+    TopicStatsResponse,
+)
+from app.schemas.upload import ImageMime, UploadResponse
+from app.search import install_fts, title_matches
+from app.secure_files import StreamingImageWriter, blob_relpath, parse_blob_name
+from app.topic_changes import (
+    CHANGES_PAGE_LIMIT,
+    change_notifier,
+    changes_horizon,
+    install_change_log,
+    read_changes,
+    record_changes,
+    run_change_gc,
+    stream_changes,
+)
+from app.topic_stats import (
+    TOPIC_STATS_SUMMARY,
+    count_change,
+    count_deleted,
+    count_inserted,
+    count_progress_change,
+    read_topic_stats,
+    rebuild_topic_stats,
+)
+from app.upload_store import commit_upload, release_upload, run_upload_gc
+from app.utils.errors import problem_json, problem_json_from_scope
+from app.write_buffer import ProgressWriteBuffer
 
 
 # ===================== Модель БД =====================
@@ -29,6 +141,12 @@ class Topic(Base):
     __tablename__ = "topics"
     __table_args__ = (
         sa.UniqueConstraint("title", "deadline", name="uq_title_deadline"),
+        # Фильтры и сортировки GET /topics: диапазон + keyset по id внутри значения
+        sa.Index("ix_topics_deadline_id", "deadline", "id"),
+        sa.Index("ix_topics_progress_id", "progress", "id"),
+        # Отбор по одной колонке, сортировка по другой
+        sa.Index("ix_topics_deadline_progress_id", "deadline", "progress", "id"),
+        sa.Index("ix_topics_progress_deadline_id", "progress", "deadline", "id"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
@@ -37,11 +155,55 @@ class Topic(Base):
     progress: Mapped[int] = mapped_column(default=0)
 
 
+# UNIQUE (title, deadline) не ловит дубликаты с deadline = NULL
+sa.Index(
+    "uq_title_null_deadline",
+    Topic.title,
+    unique=True,
+    sqlite_where=Topic.deadline.is_(None),
+    postgresql_where=Topic.deadline.is_(None),
+)
+
+
 Base.metadata.create_all(bind=engine)
+create_missing_indexes(Base.metadata.tables["topics"])
+install_fts(engine)
+install_change_log(engine, Topic.__table__)
+if TOPIC_STATS_SUMMARY:
+    rebuild_topic_stats(engine, Topic.__table__)
+instrument_engines(serving_engines())
+# Server-Timing: хуки на каждый SQL нужны только при включённом профилировании
+if PROFILE_MODE != "off":
+    instrument_db_timings(serving_engines())
 
 
 # ===================== Приложение =====================
-app = FastAPI(title="Study Plan App", version="0.1.0")
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    # Второй воркер на той же базе не стартует: его ETag не видели бы наших записей
+    process_lock = lock_single_process(PROCESS_LOCK) if PROCESS_LOCK else None
+    start_queue_logging()
+    change_notifier.open()
+    upload_gc = asyncio.create_task(run_upload_gc(UPLOAD_DIR))
+    change_gc = asyncio.create_task(run_change_gc())
+    idempotency_gc = asyncio.create_task(run_idempotency_gc())
+    yield
+    upload_gc.cancel()
+    change_gc.cancel()
+    idempotency_gc.cancel()
+    # Открытые потоки SSE завершаются, а не держат остановку
+    change_notifier.close()
+    # Буфер прогресса дописывается до закрытия пулов
+    await progress_buffer.close()
+    await dispose_engines()
+    stop_queue_logging()
+    if process_lock is not None:
+        process_lock.close()
+
+
+app = FastAPI(title="Study Plan App", version="0.1.0", lifespan=lifespan)
+# Границы validate/serialize для Server-Timing; должно стоять до объявления роутов
+app.router.route_class = ProfiledRoute
 
 # ---- CORS (ADR-002) ----
 _env_origins = os.getenv("CORS_ALLOWED_ORIGINS", "").strip()
@@ -55,90 +217,185 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=False,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", REPLAYED_HEADER],
 )
 
 # ---- Логирование + X-Request-ID (R8) ----
-logging.basicConfig(level=logging.INFO)
+start_queue_logging()
 logger = logging.getLogger("studyplan")
 REQUEST_ID_HEADER = "X-Request-ID"
 
+# ---- Лимит размера тела (ADR-003) ----
+MAX_BODY_BYTES: int = int(os.getenv("APP_MAX_BODY_BYTES", str(2 * 1024 * 1024)))
 
-@app.middleware("http")
-async def request_id_middleware(
-    request: Request,
-    call_next: Callable[[Request], Awaitable[Response]],
-) -> Response:
-    rid = request.headers.get(REQUEST_ID_HEADER, str(uuid.uuid4()))
-    request.state.request_id = rid
-    response = await call_next(request)
-    response.headers[REQUEST_ID_HEADER] = rid
-    return response
+# ---- Rate-limit per-IP и per-route (ADR-003) ----
+RATE_LIMIT_RPM: int = int(os.getenv("APP_RATE_LIMIT_RPM", "0"))  # 0 = выключено
+# Отдельные лимиты для префиксов путей, например "/upload=10,/topics/batch=30"
+RATE_LIMIT_ROUTES: dict[str, int] = parse_route_limits(
+    os.getenv("APP_RATE_LIMIT_ROUTES", "")
+)
+_limiter = SlidingWindowLimiter(
+    window=60.0,
+    max_keys=int(os.getenv("APP_RATE_LIMIT_MAX_KEYS", "100000")),
+)
 
 
-# ---- Лимит размера тела (ADR-003) ----
-MAX_BODY_BYTES: int = int(os.getenv("APP_MAX_BODY_BYTES", str(2 * 1024 * 1024)))
+def _too_large_detail() -> str:
+    return f"Payload too large: request body exceeds {MAX_BODY_BYTES} bytes"
 
 
-@app.middleware("http")
-async def body_size_limit_middleware(
-    request: Request,
-    call_next: Callable[[Request], Awaitable[Response]],
-) -> Response:
-    cl = request.headers.get("content-length")
+def _early_reject(scope: Scope, headers: Headers) -> tuple[int, str, str] | None:
+    """413/429 по заголовкам и адресу клиента — до роутинга и разбора тела."""
+    cl = headers.get("content-length")
     if cl and cl.isdigit() and int(cl) > MAX_BODY_BYTES:
-        return JSONResponse(
-            status_code=413,
-            content=problem_json(
-                request,
-                413,
-                "Payload Too Large",
-                detail=f"Payload too large: request body exceeds {MAX_BODY_BYTES} bytes",
-            ),
-            media_type="application/problem+json",
-        )
-    return await call_next(request)
+        return 413, "Payload Too Large", _too_large_detail()
 
+    rule, limit = match_route_limit(scope["path"], RATE_LIMIT_ROUTES, RATE_LIMIT_RPM)
+    if limit > 0:
+        client = scope.get("client")
+        ip = client[0] if client else "unknown"
+        if not _limiter.hit(f"{rule}|{ip}", limit):
+            RATE_LIMIT_REJECTS.inc(rule)
+            return 429, "Too Many Requests", f"Rate limit {limit}/min exceeded"
+    return None
 
-# ---- Простейший rate-limit per-IP (ADR-003) ----
-RATE_LIMIT_RPM: int = int(os.getenv("APP_RATE_LIMIT_RPM", "0"))  # 0 = выключено
-_WINDOW = 60.0
-_hits: dict[str, list[float]] = defaultdict(list)
 
+async def _read_body(receive: Receive) -> tuple[bytes, list[Message]]:
+    messages: list[Message] = []
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request" or not message.get("more_body"):
+            break
+    body = b"".join(m.get("body", b"") for m in messages if m["type"] == "http.request")
+    return body, messages
 
-def _client_ip(request: Request) -> str:
-    return request.client.host if request.client else "unknown"
 
+class RequestPipelineMiddleware:
+    """Один чистый ASGI-слой вместо четырёх BaseHTTPMiddleware.
 
-@app.middleware("http")
-async def rate_limit_middleware(
-    request: Request,
-    call_next: Callable[[Request], Awaitable[Response]],
-) -> Response:
-    if RATE_LIMIT_RPM <= 0:
-        return await call_next(request)
+    X-Request-ID кладётся в scope["state"] (его видит request.state),
+    413/429 отдаются до роутинга, тело читается только для логирования
+    небольших JSON и затем переигрывается приложению.
+    """
 
-    ip = _client_ip(request)
-    now = time.time()
-    bucket = _hits[ip]
-    while bucket and now - bucket[0] > _WINDOW:
-        bucket.pop(0)
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-    if len(bucket) >= RATE_LIMIT_RPM:
-        return JSONResponse(
-            status_code=429,
-            content=problem_json(
-                request,
-                429,
-                "Too Many Requests",
-                detail=f"Rate limit {RATE_LIMIT_RPM}/min exceeded",
-            ),
-            media_type="application/problem+json",
-        )
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        rid = headers.get(REQUEST_ID_HEADER) or str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = rid
+        method, path = scope["method"], scope["path"]
+        level = route_log_level(path)
+        sampled = logger.isEnabledFor(level) and is_sampled()
+        reject = _early_reject(scope, headers)
+
+        if sampled:
+            body: dict[str, Any] = {}
+            if reject is None and wants_body(headers):
+                raw, buffered = await _read_body(receive)
+                body = decode_body(raw)
+                receive = _replay(buffered, receive)
+            logger.log(
+                level, "Request %s %s body=%s", method, path, mask_sensitive(body)
+            )
+
+        status = 500
+        start = time.perf_counter()
+        profile = reject is None and wants_profile(headers)
+        timings = begin_request() if profile else None
 
-    bucket.append(now)
-    return await call_next(request)
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = MutableHeaders(scope=message)
+                response_headers.append(REQUEST_ID_HEADER, rid)
+                if timings is not None:
+                    response_headers.append("Server-Timing", timings.server_timing())
+            await send(message)
+
+        if reject is not None:
+            code, title, detail = reject
+            response = JSONResponse(
+                status_code=code,
+                content=problem_json_from_scope(scope, code, title, detail=detail),
+                media_type="application/problem+json",
+            )
+            await response(scope, receive, send_with_request_id)
+        elif timings is None:
+            await self.app(scope, _limit_body(receive), send_with_request_id)
+        else:
+            await self._profiled(scope, _limit_body(receive), send_with_request_id)
+
+        elapsed = time.perf_counter() - start
+        # Шаблон пути, а не сам путь: иначе кардинальность меток не ограничена
+        route = getattr(scope.get("route"), "path", "<unmatched>")
+        HTTP_REQUESTS.inc(method, route, str(status))
+        HTTP_LATENCY.observe(elapsed, method, route)
+
+        if sampled or status >= 500:
+            logger.log(
+                level,
+                "Response %s %s -> %s",
+                method,
+                path,
+                status,
+                extra={
+                    "method": method,
+                    "path": path,
+                    "status": status,
+                    "duration_ms": round(elapsed * 1000, 3),
+                    "request_id": rid,
+                },
+            )
+
+    async def _profiled(self, scope: Scope, receive: Receive, send: Send) -> None:
+        profiler = sampled_profiler()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            end_request()
+            if profiler is not None:
+                stop_profiler(profiler)
+                rid = scope["state"]["request_id"]
+                await run_in_threadpool(
+                    dump_profile, profiler, scope["method"], scope["path"], rid
+                )
+
+
+def _replay(messages: list[Message], receive: Receive) -> Receive:
+    async def replay() -> Message:
+        return messages.pop(0) if messages else await receive()
+
+    return replay
+
+
+def _limit_body(receive: Receive) -> Receive:
+    """Лимит на реально полученные байты — в том числе для chunked без Content-Length."""
+    received = 0
+
+    async def limited() -> Message:
+        nonlocal received
+        message = await receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > MAX_BODY_BYTES:
+                # FastAPI пробрасывает HTTPException из чтения тела как есть
+                raise HTTPException(status_code=413, detail=_too_large_detail())
+        return message
+
+    return limited
+
+
+app.add_middleware(RequestPipelineMiddleware)
 
 
 # ---- Глобальные обработчики ошибок (ADR-001) ----
@@ -187,64 +444,655 @@ async def unhandled_exc_handler(request: Request, exc: Exception) -> JSONRespons
     )
 
 
+# ---- Метрики Prometheus ----
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 # ===================== CRUD эндпоинты =====================
+# ---- Условные GET: поколение записей + кэш готовых ответов ----
+topic_reads = GenerationCache()
+# Пустое значение отключает проверку единственного процесса (ADR-005)
+PROCESS_LOCK: str = os.getenv("APP_PROCESS_LOCK", default_process_lock(engine.url))
+# Чтение без ORM: колонки сразу в dict, сериализация в байты за один проход.
+# Схема OpenAPI по-прежнему берётся из response_model=TopicResponse.
+TOPIC_COLUMNS = (Topic.id, Topic.title, Topic.deadline, Topic.progress)
+TOPIC_ROW = DictBundle("topic", *TOPIC_COLUMNS)
+_TOPIC_ITEM: TypeAdapter[TopicRow] = TypeAdapter(TopicRow)
+_TOPIC_LIST: TypeAdapter[list[TopicRow]] = TypeAdapter(list[TopicRow])
+# Ответ можно хранить, но перед использованием — перепроверять ETag
+REVALIDATE = "no-cache"
+
+
+def _topics_written() -> None:
+    """После commit записи в topics: новое поколение кэша и пробуждение SSE."""
+    topic_reads.bump()
+    change_notifier.notify()
+
+
+def _cached_read(request: Request, key: str) -> Response | None:
+    """304 или готовые байты текущего поколения; None — нужен запрос в БД."""
+    etag = topic_reads.etag(key)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(
+            status_code=304, headers={"etag": etag, "cache-control": REVALIDATE}
+        )
+    rendered = topic_reads.get(key)
+    if rendered is None:
+        return None
+    return Response(
+        rendered.body, media_type="application/json", headers=rendered.headers
+    )
+
+
+def _render_read(
+    key: str, generation: int, body: bytes, headers: dict[str, str] | None = None
+) -> Response:
+    rendered = Rendered(
+        body,
+        {
+            **(headers or {}),
+            "etag": topic_reads.etag(key, generation),
+            "cache-control": REVALIDATE,
+        },
+    )
+    topic_reads.put(key, generation, rendered)
+    return Response(
+        rendered.body, media_type="application/json", headers=rendered.headers
+    )
+
+
 @app.post("/topics", response_model=TopicResponse)
-def create_topic(data: TopicCreate, db: Session = Depends(get_db)) -> TopicResponse:
+async def create_topic(
+    data: TopicCreate,
+    slot: IdempotencyDep,
+    db: DbSession = Depends(get_db),
+) -> TopicResponse:
     # 🔒 Доп. доменная валидация
     if data.deadline and data.deadline < date.today():
         raise HTTPException(status_code=422, detail="Deadline cannot be in the past")
 
-    existing = (
-        db.query(Topic)
-        .filter(sa.and_(Topic.title == data.title, Topic.deadline == data.deadline))
-        .first()
+    # Один запрос: дубликат (uq_title_deadline) даёт пустой RETURNING
+    stmt = (
+        dialect_insert(Topic)
+        .values(title=data.title, deadline=data.deadline)
+        .on_conflict_do_nothing()
+        .returning(Topic)
     )
-    if existing:
+    topic = await db.scalar(stmt)
+    if topic is None:
         raise HTTPException(status_code=409, detail="Topic duplicate")
+    # Сериализуем до commit: после него атрибуты протухают и потребуют SELECT
+    result = TopicResponse.model_validate(topic)
+    await count_inserted(db, [(topic.deadline, topic.progress)])
+    await record_changes(db, Topic.__table__, Topic.id == topic.id, deleted=False)
+    if slot is not None:
+        # Ответ для повторов с тем же Idempotency-Key пишется в ту же транзакцию
+        await slot.save(db, 200, result.model_dump_json().encode())
+    await db.commit()
+    _topics_written()
+    if slot is not None:
+        slot.commit()
+    return result
+
+
+# ---- Пакетное создание ----
+MAX_BATCH_ITEMS: int = int(os.getenv("APP_MAX_BATCH_ITEMS", "500"))
+
+
+@app.post("/topics/batch", response_model=TopicBatchResponse)
+async def create_topics_batch(
+    items: Annotated[list[TopicCreate], Body(min_length=1, max_length=MAX_BATCH_ITEMS)],
+    db: DbSession = Depends(get_db),
+) -> TopicBatchResponse:
+    # Один multi-row INSERT в одной транзакции; конфликты uq_title_deadline гасит БД
+    stmt = (
+        dialect_insert(Topic)
+        .values([{"title": i.title, "deadline": i.deadline} for i in items])
+        .on_conflict_do_nothing()
+        .returning(Topic)
+    )
+    topics = list(await db.scalars(stmt))
+    inserted = {(t.title, t.deadline): t.id for t in topics}
+    await count_inserted(db, [(t.deadline, t.progress) for t in topics])
+    if topics:
+        created_ids = Topic.id.in_([t.id for t in topics])
+        await record_changes(db, Topic.__table__, created_ids, deleted=False)
+    await db.commit()
+    if inserted:
+        _topics_written()
+
+    results: list[TopicBatchItem] = []
+    for index, item in enumerate(items):
+        # Повтор внутри пакета: создан только первый экземпляр
+        topic_id = inserted.pop((item.title, item.deadline), None)
+        if topic_id is None:
+            results.append(TopicBatchItem(index=index, status="duplicate"))
+        else:
+            results.append(TopicBatchItem(index=index, status="created", id=topic_id))
+    created = sum(1 for r in results if r.status == "created")
+    return TopicBatchResponse(
+        created=created, duplicates=len(results) - created, items=results
+    )
+
+
+TopicSort = Literal["id", "deadline", "progress", "relevance"]
+
+
+@dataclass(frozen=True)
+class TopicFilters:
+    """Фильтры GET /topics; каждой форме запроса соответствует индекс в Topic."""
+
+    deadline_from: date | None = None
+    deadline_to: date | None = None
+    progress_min: int | None = None
+    progress_max: int | None = None
+    overdue: bool = False
+    q: str | None = None
+
+    def conditions(self, today: date) -> list[sa.ColumnElement[bool]]:
+        conds: list[sa.ColumnElement[bool]] = []
+        if self.deadline_from is not None:
+            conds.append(Topic.deadline >= self.deadline_from)
+        if self.deadline_to is not None:
+            conds.append(Topic.deadline <= self.deadline_to)
+        if self.progress_min is not None:
+            conds.append(Topic.progress >= self.progress_min)
+        if self.progress_max is not None:
+            conds.append(Topic.progress <= self.progress_max)
+        if self.overdue:
+            # Просрочена: дедлайн прошёл, а тема не закрыта
+            conds.extend([Topic.deadline < today, Topic.progress < 100])
+        return conds
+
+    def where(self, today: date) -> sa.ColumnElement[bool]:
+        """Все условия, включая поиск, одним выражением — для UPDATE/DELETE."""
+        conds = self.conditions(today)
+        if self.q is not None:
+            matches = title_matches(Topic.__table__, self.q)
+            conds.append(Topic.id.in_(sa.select(matches.c.id)))
+        return sa.and_(*conds)
+
+    def columns(self) -> set[str]:
+        """Колонки, по которым идёт отбор (а значит и поиск по индексу)."""
+        cols: set[str] = set()
+        if (
+            self.overdue
+            or self.deadline_from is not None
+            or self.deadline_to is not None
+        ):
+            cols.add("deadline")
+        if (
+            self.overdue
+            or self.progress_min is not None
+            or self.progress_max is not None
+        ):
+            cols.add("progress")
+        if self.q is not None:
+            cols.add("title")
+        return cols
+
+    def cache_key(self, today: date) -> str:
+        parts = [
+            self.deadline_from,
+            self.deadline_to,
+            self.progress_min,
+            self.progress_max,
+            # «Просрочено» зависит от даты, а не только от записей
+            today if self.overdue else None,
+            # Последним: в строке поиска может встретиться ':'
+            self.q,
+        ]
+        return ":".join("" if p is None else str(p) for p in parts)
+
+
+def topic_filters(
+    deadline_from: date | None = None,
+    deadline_to: date | None = None,
+    progress_min: int | None = Query(None, ge=0, le=100),
+    progress_max: int | None = Query(None, ge=0, le=100),
+    overdue: bool = False,
+    q: str | None = Query(None, min_length=1, max_length=50),
+) -> TopicFilters:
+    if deadline_from and deadline_to and deadline_from > deadline_to:
+        raise HTTPException(
+            status_code=422, detail="deadline_from is after deadline_to"
+        )
+    if progress_min is not None and progress_max is not None:
+        if progress_min > progress_max:
+            raise HTTPException(
+                status_code=422, detail="progress_min is greater than progress_max"
+            )
+    return TopicFilters(
+        deadline_from, deadline_to, progress_min, progress_max, overdue, q
+    )
+
+
+def _seek_after(
+    sort: TopicSort, cursor: str, rank: sa.ColumnElement[float] | None = None
+) -> sa.ColumnElement[bool]:
+    """Keyset-пагинация: условие «строго после последней строки прошлой страницы»."""
+    try:
+        state = decode_cursor(cursor)
+        if state.get("s") != sort:
+            raise ValueError("Cursor does not match sort order")
+        last_id = int(state["id"])
+        raw_deadline = state.get("d")
+        last_deadline = date.fromisoformat(raw_deadline) if raw_deadline else None
+        last_progress = int(state["p"]) if sort == "progress" else 0
+        last_rank = float(state["r"]) if sort == "relevance" else 0.0
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+    if sort == "id":
+        return Topic.id > last_id
+    if sort == "relevance":
+        assert rank is not None
+        return sa.or_(rank > last_rank, sa.and_(rank == last_rank, Topic.id > last_id))
+    if sort == "progress":
+        return sa.or_(
+            Topic.progress > last_progress,
+            sa.and_(Topic.progress == last_progress, Topic.id > last_id),
+        )
+    # NULL-дедлайны идут первыми (см. nulls_first в list_topics)
+    if last_deadline is None:
+        return sa.or_(
+            sa.and_(Topic.deadline.is_(None), Topic.id > last_id),
+            Topic.deadline.is_not(None),
+        )
+    return sa.or_(
+        Topic.deadline > last_deadline,
+        sa.and_(Topic.deadline == last_deadline, Topic.id > last_id),
+    )
+
+
+# Индекс под пару (колонка отбора, колонка сортировки). Без статистики SQLite
+# предпочитает идти по порядку сортировки с LIMIT, и селективный фильтр
+# («просрочено», «на этой неделе») превращается в полный скан; INDEXED BY
+# начинает план с диапазона фильтра, а сортировка берёт колонки из того же индекса
+_FILTER_SORT_INDEXES: dict[tuple[str, str], str] = {
+    ("deadline", "id"): "ix_topics_deadline_id",
+    ("deadline", "deadline"): "ix_topics_deadline_id",
+    ("deadline", "progress"): "ix_topics_deadline_progress_id",
+    ("progress", "id"): "ix_topics_progress_id",
+    ("progress", "progress"): "ix_topics_progress_id",
+    ("progress", "deadline"): "ix_topics_progress_deadline_id",
+}
 
-    topic = Topic(title=data.title, deadline=data.deadline)
-    db.add(topic)
-    db.commit()
-    db.refresh(topic)
-    return TopicResponse.model_validate(topic)
+
+def _filter_index(filters: TopicFilters, sort: TopicSort) -> str | None:
+    """Индекс для отбора по deadline/progress; при обоих — deadline (overdue)."""
+    columns = filters.columns()
+    if "title" in columns:
+        # Поиск: план начинается с FTS, темы берутся по rowid
+        return None
+    for column in ("deadline", "progress"):
+        if column in columns:
+            return _FILTER_SORT_INDEXES[column, sort]
+    return None
+
+
+def topics_query(
+    filters: TopicFilters, sort: TopicSort, today: date, cursor: str | None = None
+) -> sa.Select[tuple[dict[str, Any]]]:
+    rank: sa.ColumnElement[float] | None = None
+    if filters.q is None:
+        stmt = sa.select(TOPIC_ROW)
+    else:
+        matches = title_matches(Topic.__table__, filters.q)
+        rank = matches.c.rank
+        stmt = sa.select(DictBundle("topic", *TOPIC_COLUMNS, rank.label("rank"))).join(
+            matches, matches.c.id == Topic.id
+        )
+    stmt = stmt.where(*filters.conditions(today))
+    index = _filter_index(filters, sort)
+    if index is not None:
+        stmt = stmt.with_hint(Topic, f"INDEXED BY {index}", "sqlite")
+    if cursor:
+        stmt = stmt.where(_seek_after(sort, cursor, rank))
+
+    if sort == "relevance":
+        assert rank is not None
+        return stmt.order_by(rank.asc(), Topic.id.asc())
+    if sort == "deadline":
+        return stmt.order_by(Topic.deadline.asc().nulls_first(), Topic.id.asc())
+    if sort == "progress":
+        return stmt.order_by(Topic.progress.asc(), Topic.id.asc())
+    return stmt.order_by(Topic.id.asc())
 
 
 @app.get("/topics", response_model=list[TopicResponse])
-def list_topics(db: Session = Depends(get_db)) -> list[TopicResponse]:
-    rows = db.query(Topic).all()
-    return [TopicResponse.model_validate(r) for r in rows]
+async def list_topics(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    sort: TopicSort | None = None,
+    filters: TopicFilters = Depends(topic_filters),
+    db: DbSession = Depends(get_db),
+) -> Response:
+    # С q= по умолчанию — по релевантности, иначе по id
+    if sort is None:
+        sort = "id" if filters.q is None else "relevance"
+    elif sort == "relevance" and filters.q is None:
+        raise HTTPException(status_code=422, detail="sort=relevance requires q")
+    today = date.today()
+    key = f"list:{sort}:{limit}:{cursor or ''}:{filters.cache_key(today)}"
+    cached = _cached_read(request, key)
+    if cached is not None:
+        return cached
+    generation = topic_reads.generation
+    if sort == "progress" or "progress" in filters.columns():
+        # Read-your-writes для отбора/порядка по progress: индекс и курсор
+        # видят только БД, поэтому буфер сначала сбрасывается. Это единственный
+        # GET, который может писать; остальные накладывают snapshot() на строки
+        await progress_buffer.flush()
+
+    stmt = topics_query(filters, sort, today, cursor)
+
+    # Берём на одну строку больше, чтобы понять, есть ли следующая страница
+    rows: list[TopicRow] = list(await db.scalars(stmt.limit(limit + 1)))
+    headers: dict[str, str] = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        state: dict[str, object] = {"s": sort, "id": last["id"]}
+        if sort == "deadline":
+            state["d"] = last["deadline"].isoformat() if last["deadline"] else None
+        elif sort == "progress":
+            state["p"] = last["progress"]
+        elif sort == "relevance":
+            state["r"] = cast(TopicSearchRow, last)["rank"]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(state)
+    pending = progress_buffer.snapshot()
+    if pending:
+        for row in rows:
+            row["progress"] = pending.get(row["id"], row["progress"])
+    with measure("serialize"):
+        body = _TOPIC_LIST.dump_json(rows)
+    return _render_read(key, generation, body, headers)
+
+
+def _iter_export_rows() -> Iterator[Sequence[Any]]:
+    # Собственная сессия: зависимость get_db закрывается до отправки тела ответа
+    db = SessionLocal()
+    try:
+        query = (
+            db.query(Topic.id, Topic.title, Topic.deadline, Topic.progress)
+            .order_by(Topic.id)
+            .yield_per(EXPORT_CHUNK_ROWS)
+        )
+        yield from query
+    finally:
+        db.close()
+
+
+@app.get("/topics/export", response_class=StreamingResponse)
+def export_topics(format: ExportFormat = "ndjson") -> StreamingResponse:
+    return StreamingResponse(
+        iter_export(_iter_export_rows(), format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="topics.{format}"'},
+    )
+
+
+@app.get("/topics/stats", response_model=TopicStatsResponse)
+async def get_topic_stats(
+    request: Request, db: DbSession = Depends(get_db)
+) -> Response:
+    """Итоги для дашборда без выгрузки списка тем."""
+    today = date.today()
+    # Просрочка зависит от даты, поэтому она часть ключа
+    key = f"stats:{today}"
+    cached = _cached_read(request, key)
+    if cached is not None:
+        return cached
+    generation = topic_reads.generation
+
+    # Буферизованный progress накладывается при чтении: GET ничего не пишет
+    stats = await read_topic_stats(
+        db, Topic.__table__, today, progress_buffer.snapshot()
+    )
+    with measure("serialize"):
+        body = stats.model_dump_json().encode()
+    return _render_read(key, generation, body)
+
+
+# ---- Журнал изменений: синхронизация клиентов без перечитывания списка ----
+# Удаления до горизонта уже вычищены: клиент, отставший сильнее, начинает с since=0
+_CHANGES_EXPIRED = "Change log compacted, resync with since=0"
+
+
+@app.get("/topics/changes", response_model=TopicChangesResponse)
+async def get_topic_changes(
+    response: Response,
+    since: Annotated[int, Query(ge=0)] = 0,
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=CHANGES_PAGE_LIMIT)] = CHANGES_PAGE_LIMIT,
+    db: DbSession = Depends(get_db),
+) -> TopicChangesResponse:
+    """Изменения после версии since; since=0 — полная синхронизация.
+
+    Следующая страница — по курсору из X-Next-Cursor: он помнит горизонт на
+    начало синхронизации, поэтому полная выгрузка не упирается в 410 на
+    промежуточных версиях.
+    """
+    horizon = await changes_horizon(db)
+    if cursor is None:
+        started = horizon
+        expired = 0 < since < horizon
+    else:
+        try:
+            state = decode_cursor(cursor)
+            since, started = int(state["v"]), int(state["h"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail="Invalid cursor") from e
+        expired = since < horizon and started < horizon
+    if expired:
+        raise HTTPException(status_code=410, detail=_CHANGES_EXPIRED)
+    page = await read_changes(db, Topic.__table__, since, limit)
+    if page.has_more:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            {"v": page.version, "h": started}
+        )
+    return page
+
+
+@app.get("/topics/changes/stream", response_class=StreamingResponse)
+async def stream_topic_changes(
+    request: Request,
+    since: Annotated[int, Query(ge=0)] = 0,
+    last_event_id: Annotated[int | None, Header(ge=0)] = None,
+    db: DbSession = Depends(get_db),
+) -> StreamingResponse:
+    """Server-Sent Events; при переподключении браузер шлёт Last-Event-ID."""
+    if last_event_id is not None:
+        since = last_event_id
+    if 0 < since < await changes_horizon(db):
+        raise HTTPException(status_code=410, detail=_CHANGES_EXPIRED)
+    return StreamingResponse(
+        stream_changes(Topic.__table__, since, is_disconnected=request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"cache-control": "no-store"},
+    )
 
 
 @app.get("/topics/{topic_id}", response_model=TopicResponse)
-def get_topic(topic_id: int, db: Session = Depends(get_db)) -> TopicResponse:
-    topic = db.query(Topic).filter(Topic.id == topic_id).first()
-    if not topic:
+async def get_topic(
+    topic_id: int, request: Request, db: DbSession = Depends(get_db)
+) -> Response:
+    key = f"topic:{topic_id}"
+    cached = _cached_read(request, key)
+    if cached is not None:
+        return cached
+    generation = topic_reads.generation
+
+    row = await db.scalar(sa.select(TOPIC_ROW).where(Topic.id == topic_id))
+    if row is None:
         raise HTTPException(status_code=404, detail="Topic not found")
-    return TopicResponse.model_validate(topic)
+    pending = progress_buffer.lookup(topic_id)
+    if pending is not None:
+        row["progress"] = pending
+    with measure("serialize"):
+        body = _TOPIC_ITEM.dump_json(row)
+    return _render_read(key, generation, body)
 
 
 @app.put("/topics/{topic_id}/progress")
-def update_progress(
-    topic_id: int, data: ProgressUpdate, db: Session = Depends(get_db)
+async def update_progress(
+    topic_id: int, data: ProgressUpdate, db: DbSession = Depends(get_db)
 ) -> dict[str, str]:
-    topic = db.query(Topic).filter(Topic.id == topic_id).first()
-    if not topic:
+    if progress_buffer.enabled:
+        # Group commit: только проверка существования (чтение, без fsync);
+        # тема, уже лежащая в буфере, заведомо проверена
+        if progress_buffer.lookup(topic_id) is None:
+            exists = await db.scalar(sa.select(Topic.id).where(Topic.id == topic_id))
+            if exists is None:
+                raise HTTPException(status_code=404, detail="Topic not found")
+        progress_buffer.put(topic_id, data.progress)
+        # В журнал изменений значение попадёт при сбросе буфера
+        topic_reads.bump()
+        return {"status": "ok"}
+
+    await count_progress_change(db, Topic.__table__, topic_id, data.progress)
+    await record_changes(db, Topic.__table__, Topic.id == topic_id, deleted=False)
+    updated = await db.scalar(
+        sa.update(Topic)
+        .where(Topic.id == topic_id)
+        .values(progress=data.progress)
+        .returning(Topic.id)
+    )
+    if updated is None:
         raise HTTPException(status_code=404, detail="Topic not found")
-    topic.progress = data.progress
-    db.commit()
+    await db.commit()
+    _topics_written()
     return {"status": "ok"}
 
 
 @app.delete("/topics/{topic_id}")
-def delete_topic(topic_id: int, db: Session = Depends(get_db)) -> dict[str, str]:
-    topic = db.query(Topic).filter(Topic.id == topic_id).first()
-    if not topic:
+async def delete_topic(
+    topic_id: int, db: DbSession = Depends(get_db)
+) -> dict[str, str]:
+    # Запись из буфера не должна лечь поверх более поздней операции
+    await progress_buffer.flush()
+    await count_deleted(db, Topic.__table__, topic_id)
+    await record_changes(db, Topic.__table__, Topic.id == topic_id, deleted=True)
+    deleted = await db.scalar(
+        sa.delete(Topic).where(Topic.id == topic_id).returning(Topic.id)
+    )
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Topic not found")
-    db.delete(topic)
-    db.commit()
+    await db.commit()
+    _topics_written()
     return {"status": "deleted"}
 
 
+# ---- Массовые операции ----
+async def write_progress(db: DbSession, wanted: dict[int, int]) -> set[int]:
+    """Один UPDATE ... SET progress = CASE id ...; RETURNING — id, которые нашлись."""
+    where = Topic.id.in_(wanted)
+    progress = sa.case(wanted, value=Topic.id)
+    await count_change(db, Topic.__table__, where, progress)
+    await record_changes(db, Topic.__table__, where, deleted=False)
+    return set(
+        await db.scalars(
+            sa.update(Topic).where(where).values(progress=progress).returning(Topic.id)
+        )
+    )
+
+
+async def _flush_progress(batch: dict[int, int]) -> None:
+    async with session_scope() as db:
+        await write_progress(db, batch)
+        await db.commit()
+    _topics_written()
+
+
+# Group commit для частых PUT /topics/{id}/progress (APP_PROGRESS_BUFFER)
+progress_buffer = ProgressWriteBuffer(_flush_progress)
+
+
+@app.put("/topics/progress", response_model=TopicBulkResponse)
+async def bulk_update_progress(
+    items: Annotated[
+        list[TopicProgressItem], Body(min_length=1, max_length=MAX_BATCH_ITEMS)
+    ],
+    db: DbSession = Depends(get_db),
+) -> TopicBulkResponse:
+    # Повтор id в пакете — побеждает последнее значение
+    wanted = {item.id: item.progress for item in items}
+    await progress_buffer.flush()
+    updated = await write_progress(db, wanted)
+    await db.commit()
+    if updated:
+        _topics_written()
+    return TopicBulkResponse(
+        affected=len(updated), missing=sorted(wanted.keys() - updated)
+    )
+
+
+def _bulk_where(filters: TopicFilters) -> sa.ColumnElement[bool]:
+    if not filters.columns():
+        # Без фильтра UPDATE/DELETE задел бы всю таблицу
+        raise HTTPException(status_code=422, detail="At least one filter is required")
+    return filters.where(date.today())
+
+
+@app.patch("/topics", response_model=TopicBulkResponse)
+async def bulk_update_by_filter(
+    data: ProgressUpdate,
+    filters: TopicFilters = Depends(topic_filters),
+    db: DbSession = Depends(get_db),
+) -> TopicBulkResponse:
+    """Выставляет progress всем темам под фильтрами GET /topics одним UPDATE."""
+    where = _bulk_where(filters)
+    await progress_buffer.flush()
+    await count_change(db, Topic.__table__, where, data.progress)
+    await record_changes(db, Topic.__table__, where, deleted=False)
+    updated = list(
+        await db.scalars(
+            sa.update(Topic)
+            .where(where)
+            .values(progress=data.progress)
+            .returning(Topic.id)
+        )
+    )
+    await db.commit()
+    if updated:
+        _topics_written()
+    return TopicBulkResponse(affected=len(updated))
+
+
+@app.delete("/topics", response_model=TopicBulkResponse)
+async def bulk_delete_by_filter(
+    filters: TopicFilters = Depends(topic_filters),
+    db: DbSession = Depends(get_db),
+) -> TopicBulkResponse:
+    """Удаляет все темы под фильтрами GET /topics одним DELETE."""
+    where = _bulk_where(filters)
+    await progress_buffer.flush()
+    await count_change(db, Topic.__table__, where, None)
+    await record_changes(db, Topic.__table__, where, deleted=True)
+    deleted = list(await db.scalars(sa.delete(Topic).where(where).returning(Topic.id)))
+    await db.commit()
+    if deleted:
+        _topics_written()
+    return TopicBulkResponse(affected=len(deleted))
+
+
+@app.exception_handler(IdempotentReplay)
+async def idempotent_replay_handler(
+    request: Request, exc: IdempotentReplay
+) -> Response:
+    # Повтор запроса: сохранённый ответ байт в байт, без обращения к topics
+    return Response(
+        exc.stored.body,
+        status_code=exc.stored.status,
+        media_type="application/json",
+        headers={REPLAYED_HEADER: "true"},
+    )
+
+
 @app.exception_handler(HTTPException)
 async def http_exc_handler(request: Request, exc: HTTPException) -> JSONResponse:
     if exc.status_code == 422:
@@ -263,6 +1111,7 @@ async def http_exc_handler(request: Request, exc: HTTPException) -> JSONResponse
         status_code=exc.status_code,
         content=problem_json(request, exc.status_code, "HTTP Error", str(exc.detail)),
         media_type="application/problem+json",
+        headers=exc.headers,
     )
 
 
@@ -271,30 +1120,144 @@ UPLOAD_DIR = Path("./uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
 
-@app.post("/upload")
-async def upload_image(file: UploadFile = File(...)) -> dict[str, str]:
-    data = await file.read()
+# Тело разбирается потоково, поэтому схему multipart описываем вручную
+_UPLOAD_REQUEST_BODY: dict[str, Any] = {
+    "required": True,
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "required": ["file"],
+                "properties": {"file": {"type": "string", "format": "binary"}},
+            }
+        }
+    },
+}
+
+
+@app.post("/upload", openapi_extra={"requestBody": _UPLOAD_REQUEST_BODY})
+async def upload_image(
+    request: Request, db: DbSession = Depends(get_db)
+) -> dict[str, Any]:
+    writer = StreamingImageWriter(UPLOAD_DIR)
     try:
-        path = secure_save(UPLOAD_DIR, data)
-        return {"status": "ok", "path": str(path.name)}
+        if not await stream_file_field(request, "file", writer):
+            raise HTTPException(status_code=422, detail="Field 'file' is required")
+        staged = await writer.finish()
+        path, created = await commit_upload(db, writer, staged)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
+    finally:
+        # После link() — no-op; иначе удаляет недописанный временный файл
+        await writer.abort()
+    return {
+        "status": "ok",
+        # Как и до шардирования — имя файла; каталог вычисляется по sha256
+        "path": path.name,
+        "name": path.name,
+        "sha256": staged.sha256,
+        "width": staged.width,
+        "height": staged.height,
+        "deduplicated": not created,
+    }
 
 
-# ---- Логирование запроса/ответа (с маскированием) ----
-@app.middleware("http")
-async def log_requests(
-    request: Request,
-    call_next: Callable[[Request], Awaitable[Response]],
-) -> Response:
+def _seek_upload_after(cursor: str) -> sa.ColumnElement[bool]:
     try:
-        body = await request.json()
-    except Exception:
-        body = {}
-    safe_body = mask_sensitive(body if isinstance(body, dict) else {})
-    logger.info("Request %s %s body=%s", request.method, request.url.path, safe_body)
-    response = await call_next(request)
-    logger.info(
-        "Response %s %s -> %s", request.method, request.url.path, response.status_code
+        state = decode_cursor(cursor)
+        last_created = datetime.fromisoformat(state["c"])
+        last_sha256 = str(state["h"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+    return sa.or_(
+        UploadImage.created_at < last_created,
+        sa.and_(
+            UploadImage.created_at == last_created, UploadImage.sha256 < last_sha256
+        ),
+    )
+
+
+@app.get("/uploads", response_model=list[UploadResponse])
+async def list_uploads(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    mime: ImageMime | None = None,
+    min_width: int | None = Query(None, ge=1),
+    min_height: int | None = Query(None, ge=1),
+    max_size: int | None = Query(None, ge=1),
+    db: DbSession = Depends(get_db),
+) -> list[UploadResponse]:
+    """Листинг из индекса метаданных, новые сверху; файловая система не читается."""
+    stmt = (
+        sa.select(UploadImage)
+        .join(UploadBlob, UploadBlob.sha256 == UploadImage.sha256)
+        .where(UploadBlob.refcount > 0)
     )
-    return response
+    if mime is not None:
+        stmt = stmt.where(UploadImage.mime == mime)
+    if min_width is not None:
+        stmt = stmt.where(UploadImage.width >= min_width)
+    if min_height is not None:
+        stmt = stmt.where(UploadImage.height >= min_height)
+    if max_size is not None:
+        stmt = stmt.where(UploadImage.size <= max_size)
+    if cursor:
+        stmt = stmt.where(_seek_upload_after(cursor))
+    stmt = stmt.order_by(UploadImage.created_at.desc(), UploadImage.sha256.desc())
+
+    rows = (await db.scalars(stmt.limit(limit + 1))).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            {"c": last.created_at.isoformat(), "h": last.sha256}
+        )
+    return [UploadResponse.model_validate(r) for r in rows]
+
+
+_DOWNLOAD_RESPONSES: dict[int | str, dict[str, Any]] = {
+    200: {"content": {"image/png": {}, "image/jpeg": {}}},
+    206: {"description": "Partial Content"},
+    304: {"description": "Not Modified"},
+    416: {"description": "Range Not Satisfiable"},
+}
+
+
+@app.get("/uploads/{name}", response_class=Response, responses=_DOWNLOAD_RESPONSES)
+async def download_image(name: str, request: Request) -> Response:
+    parsed = parse_blob_name(name)
+    if parsed is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    # Сильный ETag — хэш содержимого: 304 отдаём, не трогая файловую систему
+    headers = {"etag": f'"{parsed[0]}"', "cache-control": IMMUTABLE_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), headers["etag"]):
+        return Response(status_code=304, headers=headers)
+
+    path = UPLOAD_DIR / blob_relpath(*parsed)
+    try:
+        stat_result = await run_in_threadpool(os.stat, path)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail="Upload not found") from e
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if if_range is None or if_range.strip() == headers["etag"]:
+        try:
+            byte_range = parse_range(request.headers.get("range"), stat_result.st_size)
+        except RangeNotSatisfiable as e:
+            raise HTTPException(
+                status_code=416,
+                detail="Range not satisfiable",
+                headers={"content-range": f"bytes */{stat_result.st_size}"},
+            ) from e
+    return RangeFileResponse(path, stat_result, byte_range, headers=headers)
+
+
+@app.delete("/uploads/{name}")
+async def release_image(name: str, db: DbSession = Depends(get_db)) -> dict[str, Any]:
+    parsed = parse_blob_name(name)
+    refcount = None if parsed is None else await release_upload(db, parsed[0])
+    if refcount is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return {"status": "released", "refcount": refcount}
@@ -0,0 +1,239 @@
+# app/metrics.py
+import abc
+import bisect
+import threading
+import time
+from collections.abc import Iterable, Sequence
+from typing import Any, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Секунды: от долей миллисекунды (кэш, 304) до медленных запросов
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+DB_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1, 0.5)
+
+Labels = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _series(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric(abc.ABC):
+    kind = ""
+
+    def __init__(self, name: str, help_: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_
+        self.labels = tuple(labels)
+        # Одна короткая критическая секция на наблюдение: события БД
+        # приходят и из пула потоков sync-фолбэка
+        self._lock = threading.Lock()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    @abc.abstractmethod
+    def render(self) -> list[str]:
+        """Строки экспозиции: HELP/TYPE и значения."""
+
+
+M = TypeVar("M", bound=_Metric)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help_, labels)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_series(self.labels, k)} {v:g}" for k, v in sorted(items)
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_, labels)
+        self.buckets = tuple(buckets)
+        # labels -> [счётчики по корзинам (+Inf последней), сумма]
+        self._values: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            state[0][index] += 1
+            state[1][0] += value
+
+    def count(self, *labels: str) -> int:
+        state = self._values.get(labels)
+        return sum(state[0]) if state else 0
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = [(k, list(c), s[0]) for k, (c, s) in self._values.items()]
+        lines = self.header()
+        for key, counts, total in sorted(items):
+            cumulative = 0
+            for bound, n in zip((*self.buckets, float("inf")), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                series = _series(self.labels, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{series} {cumulative}")
+            lines.append(f"{self.name}_sum{_series(self.labels, key)} {total:.6f}")
+            lines.append(f"{self.name}_count{_series(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: list[_Metric] = []
+
+    def register(self, metric: M) -> M:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> bytes:
+        lines: list[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return ("\n".join(lines) + "\n").encode()
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(
+    Counter("http_requests_total", "HTTP requests.", ("method", "route", "status"))
+)
+HTTP_LATENCY = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency.",
+        ("method", "route"),
+    )
+)
+DB_QUERIES = REGISTRY.register(
+    Histogram(
+        "db_query_duration_seconds",
+        "SQL statement execution time.",
+        ("engine", "operation"),
+        buckets=DB_BUCKETS,
+    )
+)
+DB_POOL_CHECKOUTS = REGISTRY.register(
+    Counter(
+        "db_pool_checkouts_total", "Connections checked out of the pool.", ("engine",)
+    )
+)
+DB_POOL_IN_USE = REGISTRY.register(
+    Gauge(
+        "db_pool_connections_in_use", "Connections currently checked out.", ("engine",)
+    )
+)
+RATE_LIMIT_REJECTS = REGISTRY.register(
+    Counter(
+        "ratelimit_rejected_total", "Requests rejected by the rate limiter.", ("rule",)
+    )
+)
+
+
+def _engine_label(engine: Engine) -> str:
+    url = engine.url
+    mode = "ro" if url.query.get("mode") == "ro" else "rw"
+    return f"{url.get_backend_name()}-{mode}"
+
+
+def instrument_engines(engines: Iterable[Engine]) -> None:
+    """Время и число SQL-запросов + статистика пула через события SQLAlchemy.
+
+    Вызывается один раз при старте: повторный вызов удвоит наблюдения.
+    """
+    for engine in engines:
+        label = _engine_label(engine)
+
+        def before(conn: Any, *args: Any) -> None:
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+        def after(
+            conn: Any, cursor: Any, statement: str, *args: Any, _label: str = label
+        ) -> None:
+            elapsed = time.perf_counter() - conn.info["query_start"].pop()
+            operation = (
+                statement.lstrip().split(None, 1)[0].upper() if statement else ""
+            )
+            DB_QUERIES.observe(elapsed, _label, operation)
+
+        def failed(context: Any) -> None:
+            # after_cursor_execute для упавшего запроса не вызывается
+            starts = (
+                context.connection.info.get("query_start")
+                if context.connection
+                else None
+            )
+            if starts:
+                starts.pop()
+
+        def checkout(*args: Any, _label: str = label) -> None:
+            DB_POOL_CHECKOUTS.inc(_label)
+            DB_POOL_IN_USE.inc(_label)
+
+        def checkin(*args: Any, _label: str = label) -> None:
+            DB_POOL_IN_USE.dec(_label)
+
+        event.listen(engine, "before_cursor_execute", before)
+        event.listen(engine, "after_cursor_execute", after)
+        event.listen(engine, "handle_error", failed)
+        event.listen(engine.pool, "checkout", checkout)
+        event.listen(engine.pool, "checkin", checkin)
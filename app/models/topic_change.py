@@ -0,0 +1,31 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class TopicChange(Base):
+    """Журнал изменений тем: последняя запись на тему, удаление — tombstone."""
+
+    __tablename__ = "topic_changes"
+    __table_args__ = (
+        sa.Index("ix_topic_changes_tombstones", "deleted", "changed_at"),
+        # AUTOINCREMENT: версия удалённой (вытесненной) записи не выдаётся повторно
+        {"sqlite_autoincrement": True},
+    )
+
+    version: Mapped[int] = mapped_column(primary_key=True)
+    topic_id: Mapped[int] = mapped_column(nullable=False, index=True)
+    deleted: Mapped[bool] = mapped_column(default=False, nullable=False)
+    changed_at: Mapped[datetime] = mapped_column(nullable=False)
+
+
+class TopicChangeHorizon(Base):
+    """До какой версии включительно tombstone уже вычищены: одна строка с id = 1."""
+
+    __tablename__ = "topic_change_horizon"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    pruned_through: Mapped[int] = mapped_column(default=0, nullable=False)
@@ -0,0 +1,28 @@
+from datetime import date
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class TopicStats(Base):
+    """Сводные счётчики по всем темам: одна строка с id = 1."""
+
+    __tablename__ = "topic_stats"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    total: Mapped[int] = mapped_column(default=0, nullable=False)
+    progress_sum: Mapped[int] = mapped_column(default=0, nullable=False)
+    completed: Mapped[int] = mapped_column(default=0, nullable=False)
+
+
+class TopicDeadlineStats(Base):
+    """Счётчики по дате дедлайна: из них считаются просрочка и гистограмма по неделям."""
+
+    __tablename__ = "topic_deadline_stats"
+
+    deadline: Mapped[date] = mapped_column(sa.Date, primary_key=True)
+    total: Mapped[int] = mapped_column(default=0, nullable=False)
+    # Темы с progress < 100
+    unfinished: Mapped[int] = mapped_column(default=0, nullable=False)
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.secure_files import MIME_EXTENSIONS
+
+
+class UploadBlob(Base):
+    """Индекс контентно-адресуемого хранилища: один blob на sha256 + счётчик ссылок."""
+
+    __tablename__ = "upload_blobs"
+
+    sha256: Mapped[str] = mapped_column(sa.String(64), primary_key=True)
+    ext: Mapped[str] = mapped_column(sa.String(8), nullable=False)
+    size: Mapped[int] = mapped_column(nullable=False)
+    refcount: Mapped[int] = mapped_column(default=0, nullable=False)
+    # Когда refcount упал до нуля; сборщик мусора ждёт grace-период
+    released_at: Mapped[datetime | None] = mapped_column(nullable=True, index=True)
+
+
+class UploadImage(Base):
+    """Метаданные изображения из заголовка: листинг и фильтры без чтения файлов."""
+
+    __tablename__ = "upload_images"
+    __table_args__ = (
+        # Keyset-пагинация листинга: новые сверху
+        sa.Index("ix_upload_images_created", "created_at", "sha256"),
+        sa.Index("ix_upload_images_mime_created", "mime", "created_at"),
+        sa.Index("ix_upload_images_dims", "width", "height"),
+        sa.Index("ix_upload_images_size", "size"),
+    )
+
+    sha256: Mapped[str] = mapped_column(sa.String(64), primary_key=True)
+    mime: Mapped[str] = mapped_column(sa.String(32), nullable=False)
+    width: Mapped[int | None] = mapped_column(nullable=True)
+    height: Mapped[int | None] = mapped_column(nullable=True)
+    size: Mapped[int] = mapped_column(nullable=False)
+    created_at: Mapped[datetime] = mapped_column(nullable=False)
+
+    @property
+    def name(self) -> str:
+        """Имя blob для /uploads/{name}."""
+        return f"{self.sha256}{MIME_EXTENSIONS[self.mime]}"
@@ -0,0 +1,71 @@
+# app/multipart_stream.py
+from typing import Protocol
+
+from fastapi import Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+
+class ChunkSink(Protocol):
+    async def write(self, chunk: bytes) -> None: ...
+
+
+async def stream_file_field(request: Request, field: str, sink: ChunkSink) -> bool:
+    """Разбирает multipart по мере прихода и отдаёт байты поля field в sink.
+
+    Тело целиком в памяти не держится: колбэки парсера синхронные, поэтому
+    данные копятся в пределах одного сетевого чанка и пишутся после него.
+    Возвращает False, если поле в запросе не найдено.
+    """
+    _, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise ValueError("Missing multipart boundary")
+
+    header_field = b""
+    header_value = b""
+    in_target = False
+    found = False
+    pending: list[bytes] = []
+
+    def on_part_begin() -> None:
+        nonlocal in_target
+        in_target = False
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        nonlocal header_field
+        header_field += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        nonlocal header_value
+        header_value += data[start:end]
+
+    def on_header_end() -> None:
+        nonlocal header_field, header_value, in_target, found
+        if header_field.lower() == b"content-disposition":
+            _, options = parse_options_header(header_value)
+            # Пишем только первое поле с нужным именем
+            if options.get(b"name") == field.encode() and not found:
+                in_target = found = True
+        header_field = header_value = b""
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        if in_target:
+            pending.append(data[start:end])
+
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_part_data": on_part_data,
+        },
+    )
+    async for chunk in request.stream():
+        parser.write(chunk)
+        if pending:
+            await sink.write(b"".join(pending))
+            pending.clear()
+    parser.finalize()
+    return found
@@ -0,0 +1,26 @@
+# app/pagination.py
+import base64
+import binascii
+import json
+from typing import Any
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(data: dict[str, Any]) -> str:
+    """Непрозрачный курсор: base64url от компактного JSON без паддинга."""
+    raw = json.dumps(data, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(token: str) -> dict[str, Any]:
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(data, dict):
+        raise ValueError("Invalid cursor")
+    return data
@@ -0,0 +1,238 @@
+# app/profiling.py
+import asyncio
+import cProfile
+import os
+import random
+import re
+import threading
+import time
+from collections.abc import Callable, Coroutine, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Any
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.responses import Response
+
+# off — выключено; header — только запросы с PROFILE_HEADER; all — каждый запрос
+PROFILE_MODE: str = os.getenv("APP_PROFILE_MODE", "off").lower()
+PROFILE_HEADER = "X-Profile"
+# Доля профилируемых запросов, для которых снимается cProfile
+PROFILE_SAMPLE_RATE: float = float(os.getenv("APP_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = Path(os.getenv("APP_PROFILE_DIR", "./profiles"))
+
+SERVER_TIMING_PHASES = ("db", "validate", "app", "serialize", "middleware", "total")
+
+
+class RequestTimings:
+    """Накопитель фаз одного запроса, миллисекунды считаются при выдаче заголовка."""
+
+    __slots__ = ("started", "phases", "endpoint_start", "endpoint_end", "nested")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = dict.fromkeys(SERVER_TIMING_PHASES, 0.0)
+        # Границы вызова самого обработчика (проставляет обёртка эндпоинта)
+        self.endpoint_start: float | None = None
+        self.endpoint_end: float | None = None
+        # Фазы, замеренные через measure() внутри обработчика: их вычитаем из app
+        self.nested = 0.0
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] += seconds
+
+    def server_timing(self) -> str:
+        """db — SQL; validate — разбор тела и зависимостей до обработчика;
+        app — обработчик без SQL; serialize — рендер ответа; middleware — остальное.
+        """
+        total = time.perf_counter() - self.started
+        phases = dict(self.phases)
+        phases["app"] = max(phases["app"] - phases["db"] - self.nested, 0.0)
+        routed = self.phases["validate"] + self.phases["app"] + self.phases["serialize"]
+        phases["middleware"] = max(total - routed, 0.0)
+        phases["total"] = total
+        return ", ".join(f"{name};dur={phases[name] * 1000:.3f}" for name in phases)
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def current_timings() -> RequestTimings | None:
+    return _current.get()
+
+
+def wants_profile(headers: Headers) -> bool:
+    if PROFILE_MODE == "all":
+        return True
+    return PROFILE_MODE == "header" and headers.get(PROFILE_HEADER) == "1"
+
+
+def begin_request() -> RequestTimings:
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+def end_request() -> None:
+    # Keep-alive: следующий запрос того же соединения идёт в той же задаче
+    _current.set(None)
+
+
+@contextmanager
+def measure(phase: str) -> Iterator[None]:
+    """Фаза внутри обработчика (например, ручная сериализация); без профиля — no-op."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timings.add(phase, elapsed)
+        timings.nested += elapsed
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute, отмечающий границы: до вызова обработчика — validate, после — serialize.
+
+    При выключенном профилировании добавляет одно чтение ContextVar на запрос.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        call = self.dependant.call
+        if call is not None and not getattr(call, "_profiled", False):
+            self.dependant.call = _timed_endpoint(call)
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            timings = _current.get()
+            if timings is None:
+                return await handler(request)
+            start = time.perf_counter()
+            timings.endpoint_start = timings.endpoint_end = None
+            try:
+                return await handler(request)
+            finally:
+                end = time.perf_counter()
+                # Ошибка валидации: обработчик не вызывался, всё время — validate
+                endpoint_start = timings.endpoint_start or end
+                endpoint_end = timings.endpoint_end or end
+                timings.add("validate", endpoint_start - start)
+                timings.add("app", endpoint_end - endpoint_start)
+                timings.add("serialize", end - endpoint_end)
+
+        return timed_handler
+
+
+def _mark_start() -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.endpoint_start = time.perf_counter()
+
+
+def _mark_end() -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.endpoint_end = time.perf_counter()
+
+
+def _timed_endpoint(call: Callable[..., Any]) -> Callable[..., Any]:
+    # FastAPI решает, запускать ли эндпоинт в пуле потоков, по типу call —
+    # поэтому обёртка сохраняет «корутинность» оригинала
+    if asyncio.iscoroutinefunction(call):
+
+        @wraps(call)
+        async def async_endpoint(*args: Any, **kwargs: Any) -> Any:
+            _mark_start()
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                _mark_end()
+
+        async_endpoint._profiled = True  # type: ignore[attr-defined]
+        return async_endpoint
+
+    @wraps(call)
+    def sync_endpoint(*args: Any, **kwargs: Any) -> Any:
+        _mark_start()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            _mark_end()
+
+    sync_endpoint._profiled = True  # type: ignore[attr-defined]
+    return sync_endpoint
+
+
+def _db_started(conn: Any, *args: Any) -> None:
+    if _current.get() is not None:
+        conn.info["profile_start"] = time.perf_counter()
+
+
+def _db_finished(conn: Any, *args: Any) -> None:
+    timings = _current.get()
+    started = conn.info.pop("profile_start", None)
+    if timings is not None and started is not None:
+        timings.add("db", time.perf_counter() - started)
+
+
+def instrument_db_timings(engines: Iterable[Engine]) -> None:
+    """Время SQL в фазу db текущего запроса.
+
+    Хуки срабатывают на каждый запрос к БД, поэтому main подключает их только
+    при APP_PROFILE_MODE != off. Повторный вызов для того же движка — no-op.
+    """
+    for engine in engines:
+        if not event.contains(engine, "before_cursor_execute", _db_started):
+            event.listen(engine, "before_cursor_execute", _db_started)
+            event.listen(engine, "after_cursor_execute", _db_finished)
+
+
+# ---- Сэмплированный cProfile ----
+# Одновременно активен только один профайлер на интерпретатор
+_profiler_lock = threading.Lock()
+
+
+def sampled_profiler() -> cProfile.Profile | None:
+    """Включённый профайлер или None (не выпал в выборку / уже профилируется другой).
+
+    cProfile пишет поток event loop от начала до конца запроса. Пока async-эндпоинт
+    ждёт (БД, тело запроса), loop выполняет корутины других запросов — они тоже
+    попадают в профиль. Тело sync-эндпоинта, наоборот, идёт в пуле потоков и в
+    профиль не попадает. Чистый профиль одного запроса — при нагрузке в один поток.
+    """
+    # Не криптография: выборка профилей
+    if PROFILE_SAMPLE_RATE <= 0 or random.random() >= PROFILE_SAMPLE_RATE:  # nosec B311
+        return None
+    if not _profiler_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def stop_profiler(profiler: cProfile.Profile) -> None:
+    """Вызывать в том же потоке, где профайлер включён."""
+    profiler.disable()
+    _profiler_lock.release()
+
+
+def dump_profile(profiler: cProfile.Profile, method: str, path: str, rid: str) -> Path:
+    """Пишет .prof остановленного профайлера (смотреть через pstats/snakeviz)."""
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+    safe_rid = re.sub(r"[^A-Za-z0-9-]", "", rid)[:64]
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    dest = PROFILE_DIR / f"{stamp}-{method}-{slug}-{safe_rid}.prof"
+    profiler.dump_stats(dest)
+    return dest
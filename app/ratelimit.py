@@ -0,0 +1,92 @@
+# app/ratelimit.py
+import time
+from collections import OrderedDict
+
+from app.utils.routes import longest_prefix, parse_prefix_map
+
+
+class SlidingWindowLimiter:
+    """Sliding-window counter (ADR-003): O(1) времени и памяти на ключ.
+
+    Для каждого ключа храним только счётчики текущего и предыдущего окна.
+    Оценка числа запросов за последние window секунд:
+    prev * (1 - доля прошедшего текущего окна) + curr.
+    Ключи лежат в LRU-порядке: простаивающие вычищаются периодически,
+    а при превышении max_keys вытесняется самый давний.
+    """
+
+    def __init__(
+        self,
+        window: float = 60.0,
+        max_keys: int = 100_000,
+        sweep_interval: float = 10.0,
+    ) -> None:
+        self.window = window
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        # key -> [начало текущего окна, счётчик прошлого окна, счётчик текущего, last_seen]
+        self._state: OrderedDict[str, list[float]] = OrderedDict()
+        self._next_sweep = 0.0
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def hit(self, key: str, limit: int, now: float | None = None) -> bool:
+        """Засчитывает запрос и возвращает False, если лимит за окно исчерпан."""
+        now = time.monotonic() if now is None else now
+        if now >= self._next_sweep:
+            self.evict_idle(now)
+
+        state = self._state.get(key)
+        if state is None:
+            state = [now, 0.0, 0.0, now]
+            self._state[key] = state
+            if len(self._state) > self.max_keys:
+                self._state.popitem(last=False)
+        else:
+            self._state.move_to_end(key)
+
+        start, prev, curr, _ = state
+        elapsed = now - start
+        if elapsed >= self.window:
+            # Сдвигаем окно; если простаивали дольше двух окон — прошлое окно пустое
+            windows = int(elapsed // self.window)
+            prev = curr if windows == 1 else 0.0
+            curr = 0.0
+            start += windows * self.window
+            elapsed = now - start
+
+        estimate = prev * (1.0 - elapsed / self.window) + curr
+        allowed = estimate < limit
+        if allowed:
+            curr += 1
+        state[:] = [start, prev, curr, now]
+        return allowed
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """Удаляет ключи без запросов дольше двух окон; O(числа удалённых)."""
+        now = time.monotonic() if now is None else now
+        self._next_sweep = now + self.sweep_interval
+        evicted = 0
+        while self._state:
+            key, state = next(iter(self._state.items()))
+            if now - state[3] < 2 * self.window:
+                break
+            del self._state[key]
+            evicted += 1
+        return evicted
+
+
+def parse_route_limits(raw: str) -> dict[str, int]:
+    """'/upload=10,/topics/batch=30' -> {'/upload': 10, '/topics/batch': 30}."""
+    return parse_prefix_map(raw, int)
+
+
+def match_route_limit(
+    path: str, route_limits: dict[str, int], default_rpm: int
+) -> tuple[str, int]:
+    """Лимит по самому длинному совпавшему префиксу пути, иначе общий ('*')."""
+    prefix = longest_prefix(path, route_limits)
+    if prefix is None:
+        return "*", default_rpm
+    return prefix, route_limits[prefix]
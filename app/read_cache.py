@@ -0,0 +1,108 @@
+# app/read_cache.py
+import fcntl
+import hashlib
+import os
+import secrets
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO
+
+from sqlalchemy.engine import URL, make_url
+
+READ_CACHE_ENTRIES: int = int(os.getenv("APP_READ_CACHE_ENTRIES", "1024"))
+READ_CACHE_MAX_BYTES: int = int(os.getenv("APP_READ_CACHE_MAX_BYTES", str(32 << 20)))
+
+
+@dataclass(frozen=True)
+class Rendered:
+    """Готовый ответ: байты тела и заголовки (ETag, курсор и т.п.)."""
+
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+class GenerationCache:
+    """Поколение записей + LRU готовых ответов текущего поколения.
+
+    Каждая успешная запись вызывает bump(): ETag всех чтений меняется, кэш
+    очищается. ETag = эпоха процесса + поколение + хэш ключа, поэтому
+    If-None-Match проверяется без обращения к БД.
+
+    Поколение знает только о записях через API этого процесса. ETag верны,
+    пока процесс на базе один (lock_single_process) и в обход API не пишут;
+    после такой записи процесс перезапускают (ADR-005).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = READ_CACHE_ENTRIES,
+        max_bytes: int = READ_CACHE_MAX_BYTES,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.epoch = secrets.token_hex(4)
+        self.generation = 0
+        self._entries: OrderedDict[str, Rendered] = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def bump(self) -> int:
+        """Вызывать после commit записи."""
+        self.generation += 1
+        self._entries.clear()
+        self._bytes = 0
+        return self.generation
+
+    def etag(self, key: str, generation: int | None = None) -> str:
+        gen = self.generation if generation is None else generation
+        digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+        return f'"{self.epoch}-{gen}-{digest}"'
+
+    def get(self, key: str) -> Rendered | None:
+        rendered = self._entries.get(key)
+        if rendered is not None:
+            self._entries.move_to_end(key)
+        return rendered
+
+    def put(self, key: str, generation: int, rendered: Rendered) -> None:
+        """Кладёт ответ, если за время запроса к БД поколение не сменилось."""
+        if generation != self.generation or len(rendered.body) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old.body)
+        self._entries[key] = rendered
+        self._bytes += len(rendered.body)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.body)
+
+
+# ---- Один процесс на базу (ADR-005) ----
+def default_process_lock(database_url: str | URL) -> str:
+    """Файл блокировки рядом с файлом SQLite, иначе в рабочем каталоге."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database not in (
+        None,
+        "",
+        ":memory:",
+    ):
+        return f"{url.database}.lock"
+    return "studyplan.lock"
+
+
+def lock_single_process(path: str) -> IO[bytes]:
+    """Эксклюзивный flock на path до закрытия файла; занят — RuntimeError."""
+    handle = Path(path).open("ab")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        handle.close()
+        raise RuntimeError(
+            f"{path} is locked by another process: ETag generations are per-process, "
+            "run a single worker per database"
+        ) from None
+    return handle
@@ -0,0 +1,93 @@
+# app/request_logging.py
+import json
+import logging
+import os
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
+from starlette.datastructures import Headers
+
+from app.utils.routes import longest_prefix, parse_prefix_map
+
+logger = logging.getLogger("studyplan")
+
+LOG_BODY_MAX_BYTES: int = int(os.getenv("APP_LOG_BODY_MAX_BYTES", "4096"))
+# Доля запросов, попадающих в лог (ответы 5xx логируются всегда)
+LOG_SAMPLE_RATE: float = float(os.getenv("APP_LOG_SAMPLE_RATE", "1.0"))
+
+
+def parse_route_levels(raw: str) -> dict[str, int]:
+    """'/topics=INFO, /upload=10' -> {префикс: уровень}; неизвестные уровни пропускаются."""
+    levels: dict[str, int] = {}
+    for prefix, name in parse_prefix_map(raw, str.upper).items():
+        # getLevelName() на неизвестное имя отвечает строкой "Level FOO"
+        level = int(name) if name.isdigit() else logging.getLevelName(name)
+        if isinstance(level, int):
+            levels[prefix] = level
+        else:
+            logger.warning(
+                "APP_LOG_ROUTE_LEVELS: unknown level %r for %s ignored", name, prefix
+            )
+    return levels
+
+
+# Уровни по префиксам путей, например "/topics=INFO,/upload=DEBUG"
+LOG_ROUTE_LEVELS: dict[str, int] = parse_route_levels(
+    os.getenv("APP_LOG_ROUTE_LEVELS", "")
+)
+
+_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+_listener: QueueListener | None = None
+_listener_running = False
+
+
+def start_queue_logging(level: int = logging.INFO) -> None:
+    """Корневой логгер пишет в очередь, в поток/файл пишет фоновый QueueListener."""
+    global _listener, _listener_running
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _listener is None:
+        sink = logging.StreamHandler()
+        sink.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+        _listener = QueueListener(_queue, sink, respect_handler_level=True)
+        root.addHandler(QueueHandler(_queue))
+    if not _listener_running:
+        _listener.start()
+        _listener_running = True
+
+
+def stop_queue_logging() -> None:
+    """Дописывает всё, что осталось в очереди, и останавливает поток."""
+    global _listener_running
+    if _listener is not None and _listener_running:
+        _listener.stop()
+        _listener_running = False
+
+
+def route_log_level(path: str) -> int:
+    prefix = longest_prefix(path, LOG_ROUTE_LEVELS)
+    return logging.INFO if prefix is None else LOG_ROUTE_LEVELS[prefix]
+
+
+def is_sampled() -> bool:
+    # Не криптография: выборка логов
+    return LOG_SAMPLE_RATE >= 1.0 or random.random() < LOG_SAMPLE_RATE  # nosec B311
+
+
+def wants_body(headers: Headers) -> bool:
+    """Тело разбираем только для JSON с известной длиной не больше LOG_BODY_MAX_BYTES."""
+    content_type = headers.get("content-type", "").split(";")[0].strip()
+    if content_type != "application/json" and not content_type.endswith("+json"):
+        return False
+    length = headers.get("content-length", "")
+    return length.isdigit() and int(length) <= LOG_BODY_MAX_BYTES
+
+
+def decode_body(raw: bytes) -> dict[str, Any]:
+    try:
+        body = json.loads(raw)
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
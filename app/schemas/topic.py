@@ -2,9 +2,10 @@ from __future__ import annotations
 
 from datetime import date, datetime, timezone
 from decimal import Decimal
-from typing import Annotated, Optional
+from typing import Annotated, Literal, Optional
 
 from pydantic import BaseModel, Field, StringConstraints, field_validator
+from typing_extensions import TypedDict
 
 Title = Annotated[
     str, StringConstraints(strip_whitespace=True, min_length=1, max_length=50)
@@ -33,10 +34,76 @@ class TopicResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class TopicRow(TypedDict):
+    """Строка topics для чтения без ORM; поля и порядок — как у TopicResponse."""
+
+    id: int
+    title: str
+    deadline: Optional[date]
+    progress: int
+
+
+class TopicSearchRow(TopicRow, total=False):
+    """Строка выдачи поиска: rank нужен курсору, в ответ не сериализуется."""
+
+    rank: float
+
+
+class TopicBatchItem(BaseModel):
+    index: int
+    status: Literal["created", "duplicate"]
+    id: Optional[int] = None
+
+
+class TopicBatchResponse(BaseModel):
+    created: int
+    duplicates: int
+    items: list[TopicBatchItem]
+
+
+class TopicWeekCount(BaseModel):
+    week_start: date
+    count: int
+
+
+class TopicStatsResponse(BaseModel):
+    total: int
+    completed: int
+    overdue: int
+    undated: int
+    avg_progress: float
+    deadlines_per_week: list[TopicWeekCount]
+
+
+class TopicChangeItem(BaseModel):
+    version: int
+    id: int
+    deleted: bool
+    # Текущее состояние темы; у удалённой — null
+    topic: Optional[TopicResponse] = None
+
+
+class TopicChangesResponse(BaseModel):
+    # Передать как since в следующий запрос
+    version: int
+    has_more: bool
+    changes: list[TopicChangeItem]
+
+
 class ProgressUpdate(BaseModel):
     progress: int = Field(..., ge=0, le=100)
 
 
+class TopicProgressItem(BaseModel):
+    id: int
+    progress: int = Field(..., ge=0, le=100)
+
+
+class TopicBulkResponse(BaseModel):
+    affected: int
+    missing: list[int] = []
+
+
 class Payment(BaseModel):
     amount: Decimal = Field(gt=0, max_digits=10, decimal_places=2)
     currency: Currency
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+ImageMime = Literal["image/png", "image/jpeg"]
+
+
+class UploadResponse(BaseModel):
+    name: str
+    sha256: str
+    mime: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+    size: int
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,86 @@
+# app/search.py
+import logging
+
+import sqlalchemy as sa
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("search")
+
+FTS_TABLE = "topics_fts"
+# Триграммы не находят подстроки короче трёх символов — для них LIKE
+FTS_MIN_QUERY = 3
+
+# Внешнее содержимое: текст хранится только в topics, FTS держит индекс триграмм.
+# Триггеры синхронизируют индекс в той же транзакции, что и запись в topics.
+# DDL строкой — проверенное исключение NFR-04 (REVIEWED_DDL_MODULES в
+# tests/test_nfr04_db_security.py): только константы, без ввода пользователя.
+_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS topics_fts USING fts5("
+    "title, content='topics', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS topics_fts_ai AFTER INSERT ON topics BEGIN "
+    "INSERT INTO topics_fts(rowid, title) VALUES (new.id, new.title); END",
+    "CREATE TRIGGER IF NOT EXISTS topics_fts_ad AFTER DELETE ON topics BEGIN "
+    "INSERT INTO topics_fts(topics_fts, rowid, title) "
+    "VALUES ('delete', old.id, old.title); END",
+    "CREATE TRIGGER IF NOT EXISTS topics_fts_au AFTER UPDATE OF title ON topics BEGIN "
+    "INSERT INTO topics_fts(topics_fts, rowid, title) "
+    "VALUES ('delete', old.id, old.title); "
+    "INSERT INTO topics_fts(rowid, title) VALUES (new.id, new.title); END",
+)
+_FTS_REBUILD = "INSERT INTO topics_fts(topics_fts) VALUES ('rebuild')"
+
+_fts = sa.table(FTS_TABLE, sa.column("rowid", sa.Integer), sa.column("rank", sa.Float))
+fts_enabled = False
+
+
+def install_fts(engine: Engine) -> bool:
+    """Создаёт FTS5-индекс и триггеры, если их нет; уже существующие строки индексирует.
+
+    Возвращает False, если СУБД не SQLite или SQLite собран без FTS5/trigram —
+    тогда поиск работает через LIKE.
+    """
+    global fts_enabled
+    if engine.dialect.name != "sqlite":
+        return False
+    try:
+        with engine.begin() as conn:
+            existed = sa.inspect(conn).has_table(FTS_TABLE)
+            for ddl in _FTS_DDL:
+                conn.exec_driver_sql(ddl)
+            if not existed:
+                conn.exec_driver_sql(_FTS_REBUILD)
+    except sa.exc.OperationalError:
+        logger.warning("FTS5 trigram is unavailable, falling back to LIKE search")
+        return False
+    fts_enabled = True
+    return True
+
+
+def fts_phrase(q: str) -> str:
+    """Запрос как одна фраза FTS5: операторы и кавычки из ввода не работают."""
+    return '"' + q.replace('"', '""') + '"'
+
+
+def escape_like(q: str) -> str:
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def title_matches(topics: sa.FromClause, q: str) -> sa.Subquery:
+    """Подзапрос (id, rank) тем, чей заголовок содержит q; меньший rank — релевантнее.
+
+    FTS5 ранжирует по bm25; LIKE-фолбэк ставит совпадения с начала заголовка первыми.
+    """
+    if fts_enabled and len(q) >= FTS_MIN_QUERY:
+        return (
+            sa.select(_fts.c.rowid.label("id"), _fts.c.rank.label("rank"))
+            .where(sa.literal_column(FTS_TABLE).op("MATCH")(fts_phrase(q)))
+            .subquery("matches")
+        )
+    title = topics.c.title
+    pattern = escape_like(q)
+    prefix = sa.case((title.ilike(f"{pattern}%", escape="\\"), 0.0), else_=1.0)
+    return (
+        sa.select(topics.c.id, prefix.label("rank"))
+        .where(title.ilike(f"%{pattern}%", escape="\\"))
+        .subquery("matches")
+    )
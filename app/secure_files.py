@@ -1,10 +1,21 @@
 # app/secure_files.py
-import uuid
+import hashlib
+import os
+import re
+import tempfile
+from dataclasses import dataclass
 from pathlib import Path
+from typing import IO
+
+from starlette.concurrency import run_in_threadpool
+
+from app.image_meta import ImageHeaderParser
 
 MAX_SIZE = 2 * 1024 * 1024  # 2 MB
 PNG = b"\x89PNG\r\n\x1a\n"
 SOI, EOI = b"\xff\xd8", b"\xff\xd9"
+SNIFF_BYTES = len(PNG)
+_BLOB_NAME = re.compile(r"^(?P<sha256>[0-9a-f]{64})(?P<ext>\.png|\.jpg)$")
 
 
 def detect_type(data: bytes) -> str | None:
@@ -15,6 +26,42 @@ def detect_type(data: bytes) -> str | None:
     return None
 
 
+def sniff_type(head: bytes) -> str | None:
+    """Тип по первым байтам потока; конец JPEG (EOI) проверяется после записи."""
+    if head.startswith(PNG):
+        return "image/png"
+    if head.startswith(SOI):
+        return "image/jpeg"
+    return None
+
+
+def _safe_dest(root: Path, name: str) -> Path:
+    dest = (root / name).resolve()
+    if not str(dest).startswith(str(root)):
+        raise ValueError("Path traversal detected")
+    if any(p.is_symlink() for p in dest.parents):
+        raise ValueError("Symlink parent forbidden")
+    return dest
+
+
+MIME_EXTENSIONS = {"image/png": ".png", "image/jpeg": ".jpg"}
+
+
+def _ext(mime: str) -> str:
+    return MIME_EXTENSIONS[mime]
+
+
+def blob_relpath(sha256: str, ext: str) -> str:
+    """Fan-out по префиксу хэша: ab/cd/<sha256>.<ext>."""
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+
+def parse_blob_name(name: str) -> tuple[str, str] | None:
+    """'<sha256>.png' -> (sha256, '.png'); всё остальное — None."""
+    match = _BLOB_NAME.match(name)
+    return (match["sha256"], match["ext"]) if match else None
+
+
 def secure_save(root: Path, data: bytes) -> Path:
     if len(data) > MAX_SIZE:
         raise ValueError("File too large")
@@ -22,11 +69,126 @@ def secure_save(root: Path, data: bytes) -> Path:
     if not mime:
         raise ValueError("Invalid file type")
     root = root.resolve(strict=True)
-    ext = ".png" if mime == "image/png" else ".jpg"
-    dest = (root / f"{uuid.uuid4()}{ext}").resolve()
-    if not str(dest).startswith(str(root)):
-        raise ValueError("Path traversal detected")
-    if any(p.is_symlink() for p in dest.parents):
-        raise ValueError("Symlink parent forbidden")
-    dest.write_bytes(data)
+    dest = _safe_dest(root, blob_relpath(hashlib.sha256(data).hexdigest(), _ext(mime)))
+    if not dest.exists():
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_bytes(data)
     return dest
+
+
+@dataclass(frozen=True)
+class StagedBlob:
+    """Дописанная и проверенная загрузка во временном файле."""
+
+    sha256: str
+    mime: str
+    ext: str
+    size: int
+    tmp_path: Path
+    width: int | None = None
+    height: int | None = None
+
+
+class StreamingImageWriter:
+    """Потоковая запись загрузки во временный файл в root с хэшированием на лету.
+
+    Сигнатура проверяется по первым байтам, лимит — по реально полученным,
+    запись и sha256 считаются в пуле потоков, а не в event loop.
+    """
+
+    def __init__(self, root: Path, max_size: int = MAX_SIZE) -> None:
+        self.root = root.resolve(strict=True)
+        self.max_size = max_size
+        self.size = 0
+        self.mime: str | None = None
+        self._head = b""
+        self._tail = b""
+        self._file: IO[bytes] | None = None
+        self._tmp_path: Path | None = None
+        self._hash = hashlib.sha256()
+        self._meta: ImageHeaderParser | None = None
+
+    async def write(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise ValueError("File too large")
+        self._tail = (self._tail + chunk[-len(EOI) :])[-len(EOI) :]
+        if self.mime is None:
+            # Копим начало, пока не наберётся сигнатура
+            self._head += chunk
+            if len(self._head) < SNIFF_BYTES:
+                return
+            await self._start(self._head)
+            return
+        await run_in_threadpool(self._write, chunk)
+
+    def _write(self, chunk: bytes) -> None:
+        assert self._file is not None
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        if self._meta is not None:
+            self._meta.feed(chunk)
+
+    async def _start(self, head: bytes) -> None:
+        self.mime = sniff_type(head)
+        if self.mime is None:
+            raise ValueError("Invalid file type")
+        self._meta = ImageHeaderParser(self.mime)
+        self._file, self._tmp_path = await run_in_threadpool(self._open_tmp)
+        await run_in_threadpool(self._write, head)
+        self._head = b""
+
+    def _open_tmp(self) -> tuple[IO[bytes], Path]:
+        fd, name = tempfile.mkstemp(dir=self.root, prefix=".upload-", suffix=".part")
+        return os.fdopen(fd, "wb"), Path(name)
+
+    async def finish(self) -> StagedBlob:
+        """Закрывает временный файл; переносом в хранилище занимается вызывающий."""
+        if self.mime is None:
+            # Поток короче сигнатуры
+            if not self._head or detect_type(self._head) is None:
+                raise ValueError("Invalid file type")
+            await self._start(self._head)
+        if self.mime == "image/jpeg" and self._tail != EOI:
+            raise ValueError("Invalid file type")
+        assert self._file is not None and self._tmp_path is not None and self.mime
+        await run_in_threadpool(self._file.close)
+        self._file = None
+        return StagedBlob(
+            sha256=self._hash.hexdigest(),
+            mime=self.mime,
+            ext=_ext(self.mime),
+            size=self.size,
+            tmp_path=self._tmp_path,
+            width=self._meta.width if self._meta else None,
+            height=self._meta.height if self._meta else None,
+        )
+
+    async def link(self, staged: StagedBlob) -> tuple[Path, bool]:
+        """Атомарно кладёт blob по его адресу; дубликат не пишется повторно.
+
+        Возвращает (путь, создан ли новый файл).
+        """
+        dest = _safe_dest(self.root, blob_relpath(staged.sha256, staged.ext))
+        created = await run_in_threadpool(_link_or_discard, staged.tmp_path, dest)
+        self._tmp_path = None
+        return dest, created
+
+    async def abort(self) -> None:
+        """Удаляет недописанный временный файл."""
+        if self._file is not None:
+            await run_in_threadpool(self._file.close)
+        if self._tmp_path is not None:
+            await run_in_threadpool(self._tmp_path.unlink, True)
+        self._file = self._tmp_path = None
+
+
+def _link_or_discard(tmp_path: Path, dest: Path) -> bool:
+    if dest.exists():
+        tmp_path.unlink()
+        return False
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(tmp_path, dest)
+    return True
@@ -0,0 +1,271 @@
+# app/topic_changes.py
+import asyncio
+import logging
+import os
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+
+import sqlalchemy as sa
+from sqlalchemy.engine import Engine
+
+from app.database import DbSession, DictBundle, dialect_insert, session_scope
+from app.models.topic_change import TopicChange, TopicChangeHorizon
+from app.schemas.topic import TopicChangeItem, TopicChangesResponse, TopicResponse
+
+logger = logging.getLogger("studyplan.changes")
+
+# Размер страницы GET /topics/changes и одного события SSE
+CHANGES_PAGE_LIMIT: int = int(os.getenv("APP_CHANGES_PAGE_LIMIT", "500"))
+# Сколько хранятся tombstone: клиент, отставший сильнее, получает 410 и
+# синхронизируется заново с since=0
+CHANGES_TOMBSTONE_DAYS: int = int(os.getenv("APP_CHANGES_TOMBSTONE_DAYS", "7"))
+CHANGES_GC_INTERVAL_SECONDS: int = int(
+    os.getenv("APP_CHANGES_GC_INTERVAL_SECONDS", "3600")
+)
+# SSE: как часто перепроверять журнал без уведомления (записи из других
+# процессов) и слать keepalive
+CHANGES_POLL_SECONDS: float = float(os.getenv("APP_CHANGES_POLL_SECONDS", "15"))
+_HORIZON_ID = 1
+
+# В SQLite журнал ведут триггеры: запись в той же транзакции без лишних
+# запросов из приложения, и изменения в обход API тоже попадают в журнал.
+# Прежняя запись темы удаляется — на тему остаётся одна, последняя.
+# DDL строкой — проверенное исключение NFR-04 (REVIEWED_DDL_MODULES в
+# tests/test_nfr04_db_security.py).
+_CHANGE_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS topic_changes_ai AFTER INSERT ON topics BEGIN "
+    "DELETE FROM topic_changes WHERE topic_id = new.id; "
+    "INSERT INTO topic_changes(topic_id, deleted, changed_at) "
+    "VALUES (new.id, 0, CURRENT_TIMESTAMP); END",
+    "CREATE TRIGGER IF NOT EXISTS topic_changes_au AFTER UPDATE ON topics BEGIN "
+    "DELETE FROM topic_changes WHERE topic_id = new.id; "
+    "INSERT INTO topic_changes(topic_id, deleted, changed_at) "
+    "VALUES (new.id, 0, CURRENT_TIMESTAMP); END",
+    "CREATE TRIGGER IF NOT EXISTS topic_changes_ad AFTER DELETE ON topics BEGIN "
+    "DELETE FROM topic_changes WHERE topic_id = old.id; "
+    "INSERT INTO topic_changes(topic_id, deleted, changed_at) "
+    "VALUES (old.id, 1, CURRENT_TIMESTAMP); END",
+)
+change_triggers = False
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class ChangeNotifier:
+    """Будит SSE-подписчиков после commit записи в этом процессе."""
+
+    def __init__(self) -> None:
+        self._event: asyncio.Event | None = None
+        # Приложение останавливается: потоки SSE завершаются
+        self.closed = False
+
+    def open(self) -> None:
+        self.closed = False
+
+    def close(self) -> None:
+        """Из lifespan при остановке: будит подписчиков, чтобы они вышли."""
+        self.closed = True
+        self.notify()
+
+    def subscribe(self) -> asyncio.Event:
+        """Событие брать до чтения журнала, иначе commit между ними потеряется."""
+        if self._event is None:
+            self._event = asyncio.Event()
+        return self._event
+
+    def notify(self) -> None:
+        if self._event is not None:
+            self._event.set()
+            self._event = None
+
+
+change_notifier = ChangeNotifier()
+
+
+def install_change_log(engine: Engine, topics: sa.FromClause) -> None:
+    """Триггеры журнала (SQLite); пустой журнал при непустой topics — по записи на тему.
+
+    На других СУБД журнал ведёт record_changes(); ей нужна строка горизонта
+    для блокировки, она создаётся здесь.
+    """
+    global change_triggers
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            for ddl in _CHANGE_TRIGGERS:
+                conn.exec_driver_sql(ddl)
+            change_triggers = True
+        else:
+            conn.execute(
+                dialect_insert(TopicChangeHorizon)
+                .values(id=_HORIZON_ID, pruned_through=0)
+                .on_conflict_do_nothing()
+            )
+        if conn.scalar(sa.select(TopicChange.version).limit(1)) is not None:
+            return
+        conn.execute(
+            sa.insert(TopicChange).from_select(
+                ["topic_id", "deleted", "changed_at"],
+                sa.select(topics.c.id, sa.false(), sa.literal(_utcnow())).order_by(
+                    topics.c.id
+                ),
+            )
+        )
+
+
+def version_lock() -> sa.Select[tuple[int]]:
+    """SELECT ... FOR UPDATE строки горизонта: версии выдаются по очереди."""
+    return (
+        sa.select(TopicChangeHorizon.pruned_through)
+        .where(TopicChangeHorizon.id == _HORIZON_ID)
+        .with_for_update()
+    )
+
+
+async def record_changes(
+    db: DbSession, topics: sa.FromClause, where: sa.ColumnElement[bool], deleted: bool
+) -> None:
+    """Без триггеров: новая версия для тем под where; до UPDATE/DELETE, после INSERT.
+
+    Версия выдаётся при INSERT, а видна после commit. Чтобы N+1 не стал виден
+    раньше N (клиент с since=N+1 пропустил бы N), версии выдаются под
+    блокировкой строки горизонта, которая держится до commit транзакции.
+    """
+    if change_triggers:
+        return
+    await db.execute(version_lock())
+    ids = sa.select(topics.c.id).where(where)
+    await db.execute(sa.delete(TopicChange).where(TopicChange.topic_id.in_(ids)))
+    await db.execute(
+        sa.insert(TopicChange).from_select(
+            ["topic_id", "deleted", "changed_at"],
+            sa.select(topics.c.id, sa.literal(deleted), sa.literal(_utcnow()))
+            .where(where)
+            .order_by(topics.c.id),
+        )
+    )
+
+
+async def changes_horizon(db: DbSession) -> int:
+    """since меньше этого значения пропустил бы вычищенные удаления."""
+    pruned = await db.scalar(
+        sa.select(TopicChangeHorizon.pruned_through).where(
+            TopicChangeHorizon.id == _HORIZON_ID
+        )
+    )
+    return pruned or 0
+
+
+async def read_changes(
+    db: DbSession, topics: sa.FromClause, since: int, limit: int = CHANGES_PAGE_LIMIT
+) -> TopicChangesResponse:
+    """Записи журнала после since с текущим состоянием тем; диапазон по PK."""
+    rows = list(
+        await db.scalars(
+            sa.select(
+                DictBundle(
+                    "change",
+                    TopicChange.version,
+                    TopicChange.topic_id,
+                    topics.c.id.label("live_id"),
+                    topics.c.title,
+                    topics.c.deadline,
+                    topics.c.progress,
+                )
+            )
+            .select_from(TopicChange)
+            .outerjoin(topics, topics.c.id == TopicChange.topic_id)
+            .where(TopicChange.version > since)
+            .order_by(TopicChange.version)
+            .limit(limit + 1)
+        )
+    )
+    has_more = len(rows) > limit
+    changes: list[TopicChangeItem] = []
+    for row in rows[:limit]:
+        # Темы нет — удалена (в том числе в обход API)
+        topic = None
+        if row["live_id"] is not None:
+            topic = TopicResponse(
+                id=row["live_id"],
+                title=row["title"],
+                deadline=row["deadline"],
+                progress=row["progress"],
+            )
+        changes.append(
+            TopicChangeItem(
+                version=row["version"],
+                id=row["topic_id"],
+                deleted=topic is None,
+                topic=topic,
+            )
+        )
+    version = changes[-1].version if changes else since
+    return TopicChangesResponse(version=version, has_more=has_more, changes=changes)
+
+
+async def stream_changes(
+    topics: sa.FromClause,
+    since: int,
+    poll: float = CHANGES_POLL_SECONDS,
+    is_disconnected: Callable[[], Awaitable[bool]] | None = None,
+) -> AsyncIterator[str]:
+    """События SSE: страница изменений на событие, id — версия для Last-Event-ID.
+
+    Поток заканчивается, когда клиент отключился (is_disconnected —
+    Request.is_disconnected) или приложение останавливается.
+    """
+    while not change_notifier.closed:
+        if is_disconnected is not None and await is_disconnected():
+            return
+        wakeup = change_notifier.subscribe()
+        async with session_scope() as db:
+            page = await read_changes(db, topics, since)
+        if page.changes:
+            since = page.version
+            yield f"id: {since}\nevent: changes\ndata: {page.model_dump_json()}\n\n"
+            if page.has_more:
+                continue
+        try:
+            await asyncio.wait_for(wakeup.wait(), poll)
+        except asyncio.TimeoutError:
+            yield ": keepalive\n\n"
+
+
+async def compact_changes(db: DbSession, max_age: timedelta) -> int:
+    """Удаляет tombstone старше max_age и сдвигает горизонт since."""
+    pruned = list(
+        await db.scalars(
+            sa.delete(TopicChange)
+            .where(TopicChange.deleted, TopicChange.changed_at < _utcnow() - max_age)
+            .returning(TopicChange.version)
+        )
+    )
+    if pruned:
+        stmt = dialect_insert(TopicChangeHorizon).values(
+            id=_HORIZON_ID, pruned_through=max(pruned)
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TopicChangeHorizon.id],
+            set_={"pruned_through": stmt.excluded.pruned_through},
+        )
+        await db.execute(stmt)
+    await db.commit()
+    return len(pruned)
+
+
+async def run_change_gc(
+    interval: int = CHANGES_GC_INTERVAL_SECONDS,
+    max_age: timedelta = timedelta(days=CHANGES_TOMBSTONE_DAYS),
+) -> None:
+    """Фоновая задача из lifespan: периодическая чистка старых tombstone."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_scope() as db:
+                removed = await compact_changes(db, max_age)
+            if removed:
+                logger.info("Change log GC removed %d tombstones", removed)
+        except Exception:
+            logger.exception("Change log GC failed")
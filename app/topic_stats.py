@@ -0,0 +1,264 @@
+# app/topic_stats.py
+import os
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Sequence
+from datetime import date, timedelta
+from typing import Any
+
+import sqlalchemy as sa
+from sqlalchemy.engine import Engine
+
+from app.database import DbSession, DictBundle, dialect_insert
+from app.models.topic_stats import TopicDeadlineStats, TopicStats
+from app.schemas.topic import TopicStatsResponse, TopicWeekCount
+
+# query — GROUP BY по topics на каждый запрос; summary — счётчики в topic_stats и
+# topic_deadline_stats, которые меняются в той же транзакции, что и сами темы.
+# Цена summary — лишние запросы на запись: создание +1 (+1 upsert даты с
+# дедлайном), изменение progress и удаление +2. Проверяется в
+# tests/test_topic_stats.py::test_summary_write_statement_counts
+TOPIC_STATS_SUMMARY: bool = os.getenv("APP_TOPIC_STATS", "query").lower() == "summary"
+_STATS_ID = 1
+
+
+def _summarize(
+    total: int,
+    progress_sum: int,
+    completed: int,
+    per_deadline: Iterable[dict[str, Any]],
+    today: date,
+) -> TopicStatsResponse:
+    weeks: defaultdict[date, int] = defaultdict(int)
+    dated = overdue = 0
+    for row in per_deadline:
+        deadline: date = row["deadline"]
+        dated += row["total"]
+        if deadline < today:
+            overdue += row["unfinished"]
+        weeks[deadline - timedelta(days=deadline.weekday())] += row["total"]
+    return TopicStatsResponse(
+        total=total,
+        completed=completed,
+        overdue=overdue,
+        undated=total - dated,
+        avg_progress=round(progress_sum / total, 2) if total else 0.0,
+        deadlines_per_week=[
+            TopicWeekCount(week_start=week, count=count)
+            for week, count in sorted(weeks.items())
+            if count
+        ],
+    )
+
+
+def _totals_query(topics: sa.FromClause) -> sa.Select[Any]:
+    progress = topics.c.progress
+    return sa.select(
+        DictBundle(
+            "totals",
+            sa.func.count().label("total"),
+            sa.func.coalesce(sa.func.sum(progress), 0).label("progress_sum"),
+            sa.func.count(sa.case((progress == 100, 1))).label("completed"),
+        )
+    ).select_from(topics)
+
+
+def _per_deadline_query(topics: sa.FromClause) -> sa.Select[Any]:
+    deadline = topics.c.deadline
+    return (
+        sa.select(
+            DictBundle(
+                "deadline",
+                deadline,
+                sa.func.count().label("total"),
+                sa.func.count(sa.case((topics.c.progress < 100, 1))).label(
+                    "unfinished"
+                ),
+            )
+        )
+        .where(deadline.is_not(None))
+        .group_by(deadline)
+    )
+
+
+async def read_topic_stats(
+    db: DbSession,
+    topics: sa.FromClause,
+    today: date,
+    pending: dict[int, int] | None = None,
+) -> TopicStatsResponse:
+    """Сводка по темам: из счётчиков (summary) или двумя GROUP BY по topics.
+
+    pending — ещё не записанный progress (буфер записи): накладывается поверх
+    сводки по прежним значениям этих тем, без сброса буфера в БД.
+    """
+    if TOPIC_STATS_SUMMARY:
+        stats = await db.scalar(sa.select(TopicStats).where(TopicStats.id == _STATS_ID))
+        if stats is None:
+            return _summarize(0, 0, 0, [], today)
+        total, progress_sum, completed = (
+            stats.total,
+            stats.progress_sum,
+            stats.completed,
+        )
+        per_deadline = list(
+            await db.scalars(
+                sa.select(
+                    DictBundle(
+                        "deadline",
+                        TopicDeadlineStats.deadline,
+                        TopicDeadlineStats.total,
+                        TopicDeadlineStats.unfinished,
+                    )
+                ).where(TopicDeadlineStats.total > 0)
+            )
+        )
+    else:
+        totals = await db.scalar(_totals_query(topics))
+        assert totals is not None
+        total, progress_sum, completed = (
+            totals["total"],
+            totals["progress_sum"],
+            totals["completed"],
+        )
+        per_deadline = list(await db.scalars(_per_deadline_query(topics)))
+    if pending:
+        by_deadline = {row["deadline"]: row for row in per_deadline}
+        current = await db.scalars(
+            sa.select(
+                DictBundle("topic", topics.c.id, topics.c.deadline, topics.c.progress)
+            ).where(topics.c.id.in_(pending))
+        )
+        for row in current:
+            old, new = row["progress"], pending[row["id"]]
+            progress_sum += new - old
+            completed += (new == 100) - (old == 100)
+            if row["deadline"] in by_deadline:
+                by_deadline[row["deadline"]]["unfinished"] += (new < 100) - (old < 100)
+    return _summarize(total, progress_sum, completed, per_deadline, today)
+
+
+def rebuild_topic_stats(engine: Engine, topics: sa.FromClause) -> None:
+    """Пересчёт счётчиков из topics: при старте и после записей в обход API."""
+    totals = _totals_query(topics).subquery()
+    per_deadline = _per_deadline_query(topics).subquery()
+    with engine.begin() as conn:
+        conn.execute(sa.delete(TopicDeadlineStats))
+        conn.execute(sa.delete(TopicStats))
+        conn.execute(
+            sa.insert(TopicStats).from_select(
+                ["id", "total", "progress_sum", "completed"],
+                sa.select(sa.literal(_STATS_ID), *totals.c),
+            )
+        )
+        conn.execute(
+            sa.insert(TopicDeadlineStats).from_select(
+                ["deadline", "total", "unfinished"], sa.select(*per_deadline.c)
+            )
+        )
+
+
+async def count_inserted(
+    db: DbSession, rows: Sequence[tuple[date | None, int]]
+) -> None:
+    """Новые темы (deadline, progress) — до commit той же транзакции."""
+    if not TOPIC_STATS_SUMMARY or not rows:
+        return
+    await db.execute(
+        sa.update(TopicStats)
+        .where(TopicStats.id == _STATS_ID)
+        .values(
+            total=TopicStats.total + len(rows),
+            progress_sum=TopicStats.progress_sum + sum(p for _, p in rows),
+            completed=TopicStats.completed + sum(p == 100 for _, p in rows),
+        )
+    )
+    totals = Counter(d for d, _ in rows if d is not None)
+    unfinished = Counter(d for d, p in rows if d is not None and p < 100)
+    if not totals:
+        return
+    stmt = dialect_insert(TopicDeadlineStats).values(
+        [
+            {"deadline": d, "total": n, "unfinished": unfinished[d]}
+            for d, n in totals.items()
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TopicDeadlineStats.deadline],
+        set_={
+            "total": TopicDeadlineStats.total + stmt.excluded.total,
+            "unfinished": TopicDeadlineStats.unfinished + stmt.excluded.unfinished,
+        },
+    )
+    await db.execute(stmt)
+
+
+async def count_change(
+    db: DbSession,
+    topics: sa.FromClause,
+    where: sa.ColumnElement[bool],
+    progress: int | sa.ColumnElement[int] | None,
+) -> None:
+    """Дельта счётчиков для строк topics под where; вызывать до UPDATE/DELETE тем.
+
+    progress — новое значение (число или выражение по строке, например CASE по id),
+    None — строки удаляются. Старые значения читаются подзапросами внутри самих
+    UPDATE счётчиков: это запись, она идёт через writer и берёт блокировку, так
+    что параллельная запись не вклинится между чтением и изменением.
+    """
+    if not TOPIC_STATS_SUMMARY:
+        return
+    old = topics.c.progress
+
+    def delta(expr: Any, *correlate: sa.ColumnElement[bool]) -> Any:
+        # Нет подходящих строк — подзапрос пустой, дельта 0
+        inner = sa.select(expr).where(where, *correlate).scalar_subquery()
+        return sa.func.coalesce(inner, 0)
+
+    def count_if(condition: Any) -> Any:
+        return sa.func.count(sa.case((condition, 1)))
+
+    total: Any
+    progress_sum: Any
+    if progress is None:
+        total = -sa.func.count()
+        progress_sum = -sa.func.sum(old)
+        completed = -count_if(old == 100)
+        unfinished = -count_if(old < 100)
+    else:
+        new = sa.literal(progress) if isinstance(progress, int) else progress
+        total = sa.literal(0)
+        progress_sum = sa.func.sum(new - old)
+        completed = count_if(new == 100) - count_if(old == 100)
+        unfinished = count_if(new < 100) - count_if(old < 100)
+
+    await db.execute(
+        sa.update(TopicStats)
+        .where(TopicStats.id == _STATS_ID)
+        .values(
+            total=TopicStats.total + delta(total),
+            progress_sum=TopicStats.progress_sum + delta(progress_sum),
+            completed=TopicStats.completed + delta(completed),
+        )
+    )
+    # Коррелированные подзапросы: дельта по строкам с тем же дедлайном
+    same_deadline = topics.c.deadline == TopicDeadlineStats.deadline
+    await db.execute(
+        sa.update(TopicDeadlineStats)
+        .where(
+            TopicDeadlineStats.deadline.in_(sa.select(topics.c.deadline).where(where))
+        )
+        .values(
+            total=TopicDeadlineStats.total + delta(total, same_deadline),
+            unfinished=TopicDeadlineStats.unfinished + delta(unfinished, same_deadline),
+        )
+    )
+
+
+async def count_progress_change(
+    db: DbSession, topics: sa.FromClause, topic_id: int, progress: int
+) -> None:
+    await count_change(db, topics, topics.c.id == topic_id, progress)
+
+
+async def count_deleted(db: DbSession, topics: sa.FromClause, topic_id: int) -> None:
+    await count_change(db, topics, topics.c.id == topic_id, None)
@@ -0,0 +1,131 @@
+# app/upload_store.py
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import sqlalchemy as sa
+from starlette.concurrency import run_in_threadpool
+
+from app.database import DbSession, dialect_insert, session_scope
+from app.models.upload import UploadBlob, UploadImage
+from app.secure_files import StagedBlob, StreamingImageWriter, blob_relpath
+
+logger = logging.getLogger("studyplan.uploads")
+
+# Сколько blob с нулём ссылок живёт до удаления и как часто идёт сборка
+UPLOAD_GC_GRACE_SECONDS: int = int(os.getenv("APP_UPLOAD_GC_GRACE_SECONDS", "3600"))
+UPLOAD_GC_INTERVAL_SECONDS: int = int(
+    os.getenv("APP_UPLOAD_GC_INTERVAL_SECONDS", "300")
+)
+# Брошенные временные файлы (оборванные загрузки) старше этого возраста удаляются
+STALE_PART_SECONDS = 3600
+
+# Привязка blob к индексу и сборка мусора не должны пересекаться: иначе GC
+# может удалить файл, на который только что появилась новая ссылка
+_store_lock = asyncio.Lock()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def commit_upload(
+    db: DbSession, writer: StreamingImageWriter, staged: StagedBlob
+) -> tuple[Path, bool]:
+    """Перенос blob по адресу и +1 ссылка в индексе; дубликат не переписывается.
+
+    Файл кладётся до commit: строка индекса не ссылается на отсутствующий blob.
+    Если запись в БД не удалась, новый файл удаляется. Метаданные из заголовка
+    пишутся в той же транзакции.
+    """
+    meta = dialect_insert(UploadImage).values(
+        sha256=staged.sha256,
+        mime=staged.mime,
+        width=staged.width,
+        height=staged.height,
+        size=staged.size,
+        created_at=_utcnow(),
+    )
+    stmt = dialect_insert(UploadBlob).values(
+        sha256=staged.sha256, ext=staged.ext, size=staged.size, refcount=1
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UploadBlob.sha256],
+        set_={"refcount": UploadBlob.refcount + 1, "released_at": None},
+    )
+    async with _store_lock:
+        path, created = await writer.link(staged)
+        try:
+            await db.execute(stmt)
+            await db.execute(meta.on_conflict_do_nothing())
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            if created:
+                await run_in_threadpool(path.unlink, True)
+            raise
+        return path, created
+
+
+async def release_upload(db: DbSession, sha256: str) -> int | None:
+    """-1 ссылка; None, если такого blob нет. Файл удалит сборщик мусора."""
+    refcount = await db.scalar(
+        sa.update(UploadBlob)
+        .where(UploadBlob.sha256 == sha256, UploadBlob.refcount > 0)
+        .values(
+            refcount=UploadBlob.refcount - 1,
+            released_at=sa.case((UploadBlob.refcount == 1, _utcnow()), else_=None),
+        )
+        .returning(UploadBlob.refcount)
+    )
+    await db.commit()
+    return refcount
+
+
+def _unlink_blobs(root: Path, blobs: list[tuple[str, str]]) -> None:
+    for sha256, ext in blobs:
+        (root / blob_relpath(sha256, ext)).unlink(missing_ok=True)
+    cutoff = time.time() - STALE_PART_SECONDS
+    for part in root.glob(".upload-*.part"):
+        if part.stat().st_mtime < cutoff:
+            part.unlink(missing_ok=True)
+
+
+async def collect_garbage(
+    db: DbSession, root: Path, grace_seconds: int = UPLOAD_GC_GRACE_SECONDS
+) -> int:
+    """Удаляет blob без ссылок дольше grace_seconds; возвращает их число."""
+    cutoff = _utcnow() - timedelta(seconds=grace_seconds)
+    async with _store_lock:
+        rows = await db.scalars(
+            sa.delete(UploadBlob)
+            .where(UploadBlob.refcount == 0, UploadBlob.released_at <= cutoff)
+            .returning(UploadBlob)
+        )
+        blobs = [(row.sha256, row.ext) for row in rows]
+        if blobs:
+            await db.execute(
+                sa.delete(UploadImage).where(
+                    UploadImage.sha256.in_([sha256 for sha256, _ in blobs])
+                )
+            )
+        await db.commit()
+        if root.is_dir():
+            await run_in_threadpool(_unlink_blobs, root, blobs)
+    return len(blobs)
+
+
+async def run_upload_gc(root: Path, interval: int = UPLOAD_GC_INTERVAL_SECONDS) -> None:
+    """Фоновая задача из lifespan: периодическая сборка мусора в хранилище."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_scope() as db:
+                removed = await collect_garbage(db, root)
+            if removed:
+                logger.info("Upload GC removed %d blobs", removed)
+        except Exception:
+            logger.exception("Upload GC failed")
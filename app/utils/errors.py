@@ -2,21 +2,34 @@ from typing import Any
 from uuid import uuid4
 
 from fastapi import Request
+from starlette.datastructures import URL
+from starlette.types import Scope
 
 
-def problem_json(
-    request: Request,
+def problem_json_from_scope(
+    scope: Scope,
     status: int,
     title: str,
     detail: Any | None = None,
     type_: str = "about:blank",
 ) -> dict[str, Any]:
-    cid = getattr(request.state, "request_id", str(uuid4()))
+    """RFC 7807 без объекта Request — для ответов из ASGI-middleware."""
+    cid = scope.get("state", {}).get("request_id") or str(uuid4())
     return {
         "type": type_,
         "title": title,
         "status": status,
         "detail": detail,
-        "instance": str(request.url),
+        "instance": str(URL(scope=scope)),
         "correlation_id": cid,
     }
+
+
+def problem_json(
+    request: Request,
+    status: int,
+    title: str,
+    detail: Any | None = None,
+    type_: str = "about:blank",
+) -> dict[str, Any]:
+    return problem_json_from_scope(request.scope, status, title, detail, type_)
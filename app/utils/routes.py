@@ -0,0 +1,25 @@
+from typing import Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+
+
+def parse_prefix_map(raw: str, convert: Callable[[str], T]) -> dict[str, T]:
+    """'/upload=10, /topics=30' -> {'/upload': convert('10'), '/topics': convert('30')}."""
+    result: dict[str, T] = {}
+    for item in raw.split(","):
+        prefix, sep, value = item.strip().partition("=")
+        prefix = prefix.strip()
+        if sep and prefix.startswith("/"):
+            result[prefix] = convert(value.strip())
+    return result
+
+
+def longest_prefix(path: str, prefixes: Iterable[str]) -> str | None:
+    """Самый длинный префикс, совпадающий с путём по границе сегмента."""
+    best: str | None = None
+    for prefix in prefixes:
+        if (best is None or len(prefix) > len(best)) and (
+            path == prefix or path.startswith(prefix.rstrip("/") + "/")
+        ):
+            best = prefix
+    return best
@@ -0,0 +1,111 @@
+# app/write_buffer.py
+import asyncio
+import contextlib
+import logging
+import os
+from collections.abc import Awaitable, Callable
+
+from app.database import _env_flag
+
+logger = logging.getLogger("studyplan.write_buffer")
+
+# Group commit для PUT /topics/{id}/progress: записи копятся в памяти и уходят
+# в БД одной транзакцией раз в FLUSH_MS или по набору FLUSH_ENTRIES тем
+PROGRESS_BUFFER: bool = _env_flag("APP_PROGRESS_BUFFER", default=False)
+PROGRESS_FLUSH_MS: int = int(os.getenv("APP_PROGRESS_FLUSH_MS", "50"))
+PROGRESS_FLUSH_ENTRIES: int = int(os.getenv("APP_PROGRESS_FLUSH_ENTRIES", "500"))
+
+ProgressWriter = Callable[[dict[int, int]], Awaitable[None]]
+
+
+class ProgressWriteBuffer:
+    """Последняя запись на тему побеждает; сброс — фоновой задачей.
+
+    Пока значения не в БД, их видно через lookup()/snapshot(): и ещё не
+    отправленные, и те, что пишутся прямо сейчас. Чтения накладывают их на
+    строки из БД; только GET /topics с отбором или сортировкой по progress
+    сначала вызывает flush() — индекс и курсор видят лишь БД.
+
+    Подтверждённая клиенту запись может потеряться только при падении процесса
+    в окне до сброса; при штатной остановке close() дописывает всё.
+    """
+
+    def __init__(
+        self,
+        write: ProgressWriter,
+        enabled: bool = PROGRESS_BUFFER,
+        interval_ms: int = PROGRESS_FLUSH_MS,
+        max_entries: int = PROGRESS_FLUSH_ENTRIES,
+    ) -> None:
+        self.write = write
+        self.enabled = enabled
+        self.interval = interval_ms / 1000
+        self.max_entries = max_entries
+        self.pending: dict[int, int] = {}
+        self._inflight: dict[int, int] = {}
+        self._lock = asyncio.Lock()
+        self._has_pending = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    def put(self, topic_id: int, progress: int) -> None:
+        self.pending[topic_id] = progress
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        self._has_pending.set()
+        if len(self.pending) >= self.max_entries:
+            self._full.set()
+
+    def lookup(self, topic_id: int) -> int | None:
+        if topic_id in self.pending:
+            return self.pending[topic_id]
+        return self._inflight.get(topic_id)
+
+    def snapshot(self) -> dict[int, int]:
+        """Все ещё не закоммиченные значения — для наложения на строки из БД."""
+        if not self.pending and not self._inflight:
+            return {}
+        return {**self._inflight, **self.pending}
+
+    async def flush(self) -> int:
+        """Пишет накопленное одной транзакцией; возвращает число тем."""
+        if not self.pending and not self._inflight:
+            return 0
+        async with self._lock:
+            if not self.pending:
+                return 0
+            self._inflight, self.pending = self.pending, {}
+            try:
+                await self.write(self._inflight)
+            except BaseException:
+                # Новые значения, пришедшие во время записи, важнее возвращаемых
+                for topic_id, progress in self._inflight.items():
+                    self.pending.setdefault(topic_id, progress)
+                raise
+            finally:
+                flushed = len(self._inflight)
+                self._inflight = {}
+            return flushed
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_pending.wait()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._full.wait(), self.interval)
+            self._has_pending.clear()
+            self._full.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Progress flush failed, will retry")
+            if self.pending:
+                self._has_pending.set()
+
+    async def close(self) -> None:
+        """Останавливает фоновый сброс и дописывает остаток."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
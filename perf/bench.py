@@ -0,0 +1,280 @@
+"""Воспроизводимый бенчмарк: засеянные БД, реальный uvicorn, смешанные сценарии, базовые линии.
+
+    python -m perf.bench                       # 10k/100k/1M, все сценарии
+    python -m perf.bench --sizes 10000 --requests 2000
+    python -m perf.bench --update-baseline     # перезаписать perf/baselines.json
+
+Код возврата 1, если p95/p99 выросли или RPS упал больше допуска.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from perf.loadgen import ROOT, Step, drive, start_server, stop_server, summarize
+
+PERF_DIR = ROOT / "perf"
+DATA_DIR = PERF_DIR / ".data"
+RESULTS_DIR = PERF_DIR / "results"
+BASELINE_PATH = PERF_DIR / "baselines.json"
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+SEED = 20240917
+# Как в compose.yaml: продовый профиль SQLite, без логов каждого запроса
+DEFAULT_SERVER_ENV = {"APP_SQLITE_TUNED": "1", "APP_LOG_SAMPLE_RATE": "0"}
+# Допуск относительно базовой линии: шум на одной машине — порядка 10–15%
+DEFAULT_TOLERANCE = 0.25
+
+_SCHEMA = (
+    "CREATE TABLE topics (id INTEGER NOT NULL PRIMARY KEY, title VARCHAR NOT NULL, "
+    "deadline DATE, progress INTEGER NOT NULL, "
+    "CONSTRAINT uq_title_deadline UNIQUE (title, deadline))"
+)
+
+
+def seed_database(size: int) -> Path:
+    """Детерминированно засеянная БД на size тем; собирается один раз и кэшируется.
+
+    Схему (индексы и остальные таблицы) дальше досоздаёт само приложение при старте.
+    """
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    path = DATA_DIR / f"topics_{size}.db"
+    if path.exists():
+        return path
+    tmp = path.with_suffix(".tmp")
+    tmp.unlink(missing_ok=True)
+    rng = random.Random(SEED)
+    start = date(2030, 1, 1)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.execute(_SCHEMA)
+        rows = (
+            (
+                i,
+                f"topic-{i}",
+                (
+                    (start + timedelta(days=rng.randrange(3650))).isoformat()
+                    if rng.random() < 0.8
+                    else None
+                ),
+                rng.randrange(101),
+            )
+            for i in range(1, size + 1)
+        )
+        conn.executemany("INSERT INTO topics VALUES (?, ?, ?, ?)", rows)
+        conn.commit()
+    finally:
+        conn.close()
+    tmp.replace(path)
+    return path
+
+
+def scenarios(size: int) -> dict[str, list[Step]]:
+    """Смеси запросов; id и страницы выбираются по всему диапазону засеянных тем."""
+
+    async def list_first(
+        c: httpx.AsyncClient, rng: random.Random, i: int
+    ) -> httpx.Response:
+        return await c.get("/topics", params={"limit": 50})
+
+    async def list_by_deadline(
+        c: httpx.AsyncClient, rng: random.Random, i: int
+    ) -> httpx.Response:
+        return await c.get("/topics", params={"limit": 100, "sort": "deadline"})
+
+    async def get_item(
+        c: httpx.AsyncClient, rng: random.Random, i: int
+    ) -> httpx.Response:
+        return await c.get(f"/topics/{rng.randint(1, size)}")
+
+    async def update(
+        c: httpx.AsyncClient, rng: random.Random, i: int
+    ) -> httpx.Response:
+        return await c.put(
+            f"/topics/{rng.randint(1, size)}/progress",
+            json={"progress": rng.randrange(101)},
+        )
+
+    async def create(
+        c: httpx.AsyncClient, rng: random.Random, i: int
+    ) -> httpx.Response:
+        return await c.post(
+            "/topics", json={"title": f"bench-{i}-{rng.getrandbits(40)}"}
+        )
+
+    return {
+        "read_heavy": [
+            Step("list", 45, list_first),
+            Step("list_deadline", 10, list_by_deadline),
+            Step("get", 40, get_item),
+            Step("create", 5, create),
+        ],
+        "mixed": [
+            Step("list", 35, list_first),
+            Step("get", 35, get_item),
+            Step("update", 20, update),
+            Step("create", 10, create),
+        ],
+        "write_heavy": [
+            Step("get", 20, get_item),
+            Step("update", 50, update),
+            Step("create", 30, create),
+        ],
+    }
+
+
+def run_size(
+    size: int,
+    selected: list[str],
+    requests: int,
+    concurrency: int,
+    env: dict[str, str],
+) -> dict[str, dict[str, float]]:
+    source = seed_database(size)
+    results: dict[str, dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in selected:
+            # Каждый сценарий — на чистой копии: записи прошлых прогонов не влияют
+            db_path = Path(tmp) / f"{name}.db"
+            shutil.copyfile(source, db_path)
+            proc, base_url = start_server(db_path, **env)
+            try:
+                steps = scenarios(size)[name]
+                raw = asyncio.run(
+                    drive(
+                        base_url,
+                        steps,
+                        requests,
+                        concurrency,
+                        seed=SEED,
+                        warmup=min(200, requests // 5),
+                    )
+                )
+                results[name] = summarize(*raw)
+            finally:
+                stop_server(proc)
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    """Регрессии относительно базовой линии: рост латентности или падение RPS."""
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        for metric in ("p95_ms", "p99_ms"):
+            if current[metric] > base[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{key}: {metric} {current[metric]:.1f} > {base[metric]:.1f} baseline"
+                )
+        if current["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(
+                f"{key}: rps {current['rps']:.1f} < {base['rps']:.1f} baseline"
+            )
+        if current["errors"] > base["errors"]:
+            regressions.append(
+                f"{key}: errors {current['errors']:g} > {base['errors']:g}"
+            )
+    return regressions
+
+
+def format_table(results: dict[str, dict[str, float]]) -> str:
+    header = f"{'size/scenario':<24}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'err':>6}"
+    lines = [header, "-" * len(header)]
+    for key, r in results.items():
+        lines.append(
+            f"{key:<24}{r['rps']:>9.1f}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}"
+            f"{r['p99_ms']:>9.2f}{r['errors']:>6g}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--scenarios", default="read_heavy,mixed,write_heavy")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="переменные окружения сервера поверх DEFAULT_SERVER_ENV, например APP_DB_ASYNC=0",
+    )
+    args = parser.parse_args(argv)
+    env = {**DEFAULT_SERVER_ENV, **dict(item.split("=", 1) for item in args.env)}
+    selected = args.scenarios.split(",")
+
+    results: dict[str, dict[str, float]] = {}
+    for size in (int(s) for s in args.sizes.split(",")):
+        for name, r in run_size(
+            size, selected, args.requests, args.concurrency, env
+        ).items():
+            results[f"{size}/{name}"] = r
+    print(format_table(results))
+
+    report: dict[str, Any] = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "params": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "env": env,
+            "seed": SEED,
+        },
+        "results": results,
+    }
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    (RESULTS_DIR / f"{time.strftime('%Y%m%dT%H%M%S')}.json").write_text(
+        json.dumps(report, indent=2)
+    )
+
+    if args.update_baseline:
+        baseline_report = report
+        if args.baseline.exists():
+            # Обновляем только прогнанные ключи, остальные сохраняем
+            baseline_report = json.loads(args.baseline.read_text())
+            baseline_report["results"].update(results)
+            baseline_report.update(
+                {k: report[k] for k in ("created", "machine", "params")}
+            )
+        args.baseline.write_text(json.dumps(baseline_report, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("No baseline; run with --update-baseline to create one")
+        return 0
+    regressions = compare(
+        results, json.loads(args.baseline.read_text())["results"], args.tolerance
+    )
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
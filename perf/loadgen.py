@@ -0,0 +1,157 @@
+"""Генератор нагрузки: реальный uvicorn + asyncio-клиенты со взвешенными сценариями."""
+
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+
+Action = Callable[[httpx.AsyncClient, random.Random, int], Awaitable[httpx.Response]]
+
+
+@dataclass(frozen=True)
+class Step:
+    """Тип запроса в сценарии и его вес."""
+
+    name: str
+    weight: int
+    action: Action
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(db_path: Path, **env_overrides: str) -> tuple[subprocess.Popen, str]:
+    port = free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "APP_RATE_LIMIT_RPM": "0",
+        **env_overrides,
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/topics?limit=1").status_code == 200:
+                return proc, base_url
+        except httpx.TransportError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+def stop_server(proc: subprocess.Popen) -> None:
+    proc.terminate()
+    proc.wait(timeout=10)
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank перцентиль по отсортированной выборке."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(
+    durations: list[float], errors: int, total_time: float
+) -> dict[str, float]:
+    durations = sorted(durations)
+    return {
+        "requests": len(durations),
+        "rps": len(durations) / total_time if total_time else 0.0,
+        "p50_ms": percentile(durations, 50) * 1000,
+        "p95_ms": percentile(durations, 95) * 1000,
+        "p99_ms": percentile(durations, 99) * 1000,
+        "errors": errors,
+    }
+
+
+async def drive(
+    base_url: str,
+    steps: Sequence[Step],
+    total: int,
+    concurrency: int,
+    seed: int = 0,
+    warmup: int = 0,
+) -> tuple[list[float], int, float]:
+    """total запросов по весам steps; порядок запросов воспроизводим по seed."""
+    rng = random.Random(seed)
+    plan = rng.choices(steps, weights=[s.weight for s in steps], k=warmup + total)
+    # У каждого запроса свой генератор: параметры не зависят от порядка выполнения
+    seeds = [rng.getrandbits(32) for _ in plan]
+    sem = asyncio.Semaphore(concurrency)
+    durations: list[float] = []
+    errors = 0
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=60, limits=limits
+    ) as client:
+
+        async def one(i: int, measured: bool) -> None:
+            nonlocal errors
+            async with sem:
+                start = time.perf_counter()
+                try:
+                    r = await plan[i].action(client, random.Random(seeds[i]), i)
+                    failed = r.status_code >= 400
+                except httpx.TransportError:
+                    # Сервер оборвал соединение — это ошибка, а не падение прогона
+                    failed = True
+                if measured:
+                    durations.append(time.perf_counter() - start)
+                    errors += failed
+
+        await asyncio.gather(*(one(i, False) for i in range(warmup)))
+        start_total = time.perf_counter()
+        await asyncio.gather(*(one(i, True) for i in range(warmup, warmup + total)))
+        total_time = time.perf_counter() - start_total
+    return durations, errors, total_time
+
+
+async def _post_topic(
+    client: httpx.AsyncClient, rng: random.Random, i: int
+) -> httpx.Response:
+    return await client.post(
+        "/topics", json={"title": f"load-{i}-{rng.getrandbits(32)}"}
+    )
+
+
+async def _list_topics(
+    client: httpx.AsyncClient, rng: random.Random, i: int
+) -> httpx.Response:
+    return await client.get("/topics", params={"limit": 20})
+
+
+def run_mixed_load(
+    base_url: str, total: int = 500, concurrency: int = 50, write_every: int = 10
+) -> dict[str, float]:
+    """Доля write_every-х запросов — POST /topics, остальные — GET /topics?limit=20."""
+    steps = [
+        Step("create", 1, _post_topic),
+        Step("list", write_every - 1, _list_topics),
+    ]
+    return summarize(*asyncio.run(drive(base_url, steps, total, concurrency)))
@@ -3,14 +3,19 @@
 - Перенастраиваем БД на test-экземпляр через ENV (до импорта app.main)
 - Перед КАЖДЫМ тестом очищаем таблицу topics (autouse=True)
 - Добавляем корень репозитория в sys.path для стабильного импорта
+- count_statements: SQL, ушедший в БД внутри блока with
+- collect_pages: все страницы GET /topics по курсору
+- changes_head: текущая версия журнала GET /topics/changes
 """
 
 import os
 import sys
+from contextlib import contextmanager
 from pathlib import Path
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 
 # --- Настройка окружения и sys.path ---
 ROOT = Path(__file__).resolve().parents[1]
@@ -18,10 +23,13 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 os.environ.setdefault("DATABASE_URL", "sqlite:///./test_studyplan.db")
+# NFR-07 запускает вложенный pytest на той же базе, пока сессия держит lifespan
+os.environ.setdefault("APP_PROCESS_LOCK", "")
 
 # --- Теперь можно импортировать приложение и БД ---
-from app.database import Base, SessionLocal, engine  # noqa: E402
-from app.main import Topic, app  # noqa: E402
+from app.database import Base, SessionLocal, engine, serving_engines  # noqa: E402
+from app.main import Topic, app, topic_reads  # noqa: E402
+from app.pagination import NEXT_CURSOR_HEADER  # noqa: E402
 
 
 # --- Инициализация схемы и очистка данных ---
@@ -36,6 +44,8 @@ def _truncate_topics():
     try:
         db.query(Topic).delete()
         db.commit()
+        # Запись мимо обработчиков: сбрасываем поколение вручную
+        topic_reads.bump()
     finally:
         db.close()
 
@@ -54,3 +64,66 @@ def client():
     """Общий TestClient на сессию тестов."""
     with TestClient(app) as c:
         yield c
+
+
+# --- Счётчик SQL-запросов ---
+@contextmanager
+def _count_statements():
+    statements: list[str] = []
+
+    def _before(conn, cursor, statement, params, context, executemany):
+        statements.append(statement)
+
+    engines = serving_engines()
+    for serving in engines:
+        event.listen(serving, "before_cursor_execute", _before)
+    try:
+        yield statements
+    finally:
+        for serving in engines:
+            event.remove(serving, "before_cursor_execute", _before)
+
+
+@pytest.fixture
+def count_statements():
+    """`with count_statements() as sql:` — тексты запросов ко всем движкам."""
+    return _count_statements
+
+
+# --- Обход страниц GET /topics ---
+@pytest.fixture
+def collect_pages(client):
+    """Проходит курсоры X-Next-Cursor и склеивает страницы."""
+
+    def _collect(params: dict) -> list[dict]:
+        items, cursor = [], None
+        while True:
+            query = dict(params)
+            if cursor:
+                query["cursor"] = cursor
+            r = client.get("/topics", params=query)
+            assert r.status_code == 200
+            page = r.json()
+            assert len(page) <= params["limit"]
+            items.extend(page)
+            cursor = r.headers.get(NEXT_CURSOR_HEADER)
+            if not cursor:
+                return items
+
+    return _collect
+
+
+# --- Журнал изменений ---
+@pytest.fixture
+def changes_head(client):
+    """Текущая версия журнала — с неё тест читает только свои изменения."""
+
+    def _head() -> int:
+        r = client.get("/topics/changes")
+        while NEXT_CURSOR_HEADER in r.headers:
+            r = client.get(
+                "/topics/changes", params={"cursor": r.headers[NEXT_CURSOR_HEADER]}
+            )
+        return r.json()["version"]
+
+    return _head
@@ -1,6 +1,169 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import sqlalchemy as sa
+
+import app.idempotency as idem
+from app.database import SessionLocal, session_scope
+from app.models.idempotency import IdempotencyRecord
+
+
 def test_duplicate_conflict(client):
     r1 = client.post("/topics", json={"title": "ADR", "deadline": None})
     assert r1.status_code == 200
     r2 = client.post("/topics", json={"title": "ADR", "deadline": None})
     assert r2.status_code == 409
     assert r2.headers.get("content-type", "").startswith("application/problem+json")
+
+
+def test_retry_replays_stored_response_without_db(client, count_statements):
+    headers = {"Idempotency-Key": "retry-1"}
+    r1 = client.post("/topics", json={"title": "Idem"}, headers=headers)
+    assert r1.status_code == 200
+    assert "Idempotent-Replayed" not in r1.headers
+
+    with count_statements() as statements:
+        r2 = client.post("/topics", json={"title": "Idem"}, headers=headers)
+    assert r2.status_code == 200
+    assert r2.content == r1.content
+    assert r2.headers["Idempotent-Replayed"] == "true"
+    assert statements == []
+
+    # Без ключа — обычная обработка и 409 на дубликат
+    assert client.post("/topics", json={"title": "Idem"}).status_code == 409
+
+
+def test_key_reuse_with_other_body_is_rejected(client):
+    headers = {"Idempotency-Key": "reuse-1"}
+    assert (
+        client.post("/topics", json={"title": "A1"}, headers=headers).status_code == 200
+    )
+    r = client.post("/topics", json={"title": "B1"}, headers=headers)
+    assert r.status_code == 422
+    assert r.headers["content-type"].startswith("application/problem+json")
+    assert len(client.get("/topics").json()) == 1
+
+
+def test_failed_request_is_not_stored(client):
+    assert client.post("/topics", json={"title": "Dup"}).status_code == 200
+    headers = {"Idempotency-Key": "failed-1"}
+    body = {"title": "Dup"}
+    assert client.post("/topics", json=body, headers=headers).status_code == 409
+    r = client.post("/topics", json=body, headers=headers)
+    assert r.status_code == 409
+    assert "Idempotent-Replayed" not in r.headers
+
+
+def test_concurrent_same_key_creates_once(client):
+    headers = {"Idempotency-Key": "burst-1"}
+
+    def send(_):
+        return client.post("/topics", json={"title": "Burst"}, headers=headers)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(send, range(16)))
+    assert {r.status_code for r in responses} == {200}
+    assert len({r.json()["id"] for r in responses}) == 1
+    assert len(client.get("/topics").json()) == 1
+
+
+def test_persisted_response_survives_memory_eviction(
+    client, monkeypatch, count_statements
+):
+    monkeypatch.setattr(idem, "IDEMPOTENCY_PERSIST", True)
+    headers = {"Idempotency-Key": "persist-1"}
+    r1 = client.post("/topics", json={"title": "Persist"}, headers=headers)
+    assert r1.status_code == 200
+
+    monkeypatch.setattr(idem, "idempotency_store", idem.IdempotencyStore())
+    with count_statements() as statements:
+        r2 = client.post("/topics", json={"title": "Persist"}, headers=headers)
+    assert r2.content == r1.content
+    assert r2.headers["Idempotent-Replayed"] == "true"
+    assert statements and all("topics" not in s for s in statements)
+
+
+def _age_record(key: str) -> None:
+    """Сдвигает created_at записи за пределы TTL."""
+    with SessionLocal() as db:
+        db.execute(
+            sa.update(IdempotencyRecord)
+            .where(IdempotencyRecord.key == key)
+            .values(
+                created_at=IdempotencyRecord.created_at
+                - timedelta(seconds=idem.IDEMPOTENCY_TTL_SECONDS + 1)
+            )
+        )
+        db.commit()
+
+
+def _record_hash(key: str) -> str | None:
+    with SessionLocal() as db:
+        return db.scalar(
+            sa.select(IdempotencyRecord.request_hash).where(
+                IdempotencyRecord.key == key
+            )
+        )
+
+
+async def _purge() -> int:
+    async with session_scope() as db:
+        return await idem.purge_expired(db)
+
+
+def test_expired_persisted_key_is_replaced_and_purged(client, monkeypatch):
+    monkeypatch.setattr(idem, "IDEMPOTENCY_PERSIST", True)
+    key = f"expire-{time.time_ns()}"
+    scoped = f"POST /topics:{key}"
+    headers = {"Idempotency-Key": key}
+    assert client.post("/topics", json={"title": "Old"}, headers=headers).is_success
+    first_hash = _record_hash(scoped)
+    _age_record(scoped)
+
+    # Просроченный ключ — новый запрос, его ответ заменяет старую запись
+    monkeypatch.setattr(idem, "idempotency_store", idem.IdempotencyStore())
+    r = client.post("/topics", json={"title": "New"}, headers=headers)
+    assert r.status_code == 200 and "Idempotent-Replayed" not in r.headers
+    assert _record_hash(scoped) not in (None, first_hash)
+
+    # Живую запись чистка не трогает, просроченную удаляет
+    client.portal.call(_purge)
+    assert _record_hash(scoped) is not None
+    _age_record(scoped)
+    assert client.portal.call(_purge) >= 1
+    assert _record_hash(scoped) is None
+
+
+def test_store_lru_and_ttl():
+    store = idem.IdempotencyStore(max_keys=2, ttl=10)
+    store.put("a", "h", 200, b"a")
+    store.put("b", "h", 200, b"b")
+    assert store.get("a") is not None  # a теперь самый свежий
+    store.put("c", "h", 200, b"c")
+    assert store.get("b") is None and len(store) == 2
+    expires = store.get("a").expires_at
+    assert store.get("a", now=expires) is None
+
+
+def test_store_waiters_follow_first_request():
+    async def scenario():
+        store = idem.IdempotencyStore()
+        assert await store.acquire("k", timeout=1) is None
+        waiter = asyncio.ensure_future(store.acquire("k", timeout=1))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        store.put("k", "h", 200, b"{}")
+        store.release("k")
+        assert (await waiter).body == b"{}"
+
+        # Первый упал: ключ достаётся следующему
+        assert await store.acquire("x", timeout=1) is None
+        waiter = asyncio.ensure_future(store.acquire("x", timeout=1))
+        await asyncio.sleep(0)
+        store.release("x")
+        assert await waiter is None
+        store.release("x")
+
+    asyncio.run(scenario())
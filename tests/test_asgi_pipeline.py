@@ -0,0 +1,36 @@
+import app.main as appmod
+from app.main import MAX_BODY_BYTES, REQUEST_ID_HEADER
+
+
+def test_request_id_propagates_to_errors_and_headers(client):
+    r = client.get("/topics/424242", headers={REQUEST_ID_HEADER: "rid-123"})
+    assert r.status_code == 404
+    assert r.headers[REQUEST_ID_HEADER] == "rid-123"
+    assert r.json()["correlation_id"] == "rid-123"
+
+    generated = client.get("/topics")
+    assert generated.headers[REQUEST_ID_HEADER]
+
+
+def test_early_rejections_carry_request_id(client, monkeypatch):
+    monkeypatch.setattr(appmod, "RATE_LIMIT_RPM", 1)
+    monkeypatch.setattr(appmod, "_limiter", appmod.SlidingWindowLimiter())
+    client.get("/topics")
+    r = client.get("/topics", headers={REQUEST_ID_HEADER: "limited"})
+    assert r.status_code == 429
+    assert r.headers[REQUEST_ID_HEADER] == "limited"
+    assert r.json()["correlation_id"] == "limited"
+
+
+def test_chunked_body_over_limit_rejected(client):
+    def chunks():
+        piece = b"x" * 65536
+        for _ in range(MAX_BODY_BYTES // len(piece) + 2):
+            yield piece
+
+    r = client.post(
+        "/topics", content=chunks(), headers={"Content-Type": "application/json"}
+    )
+    assert r.status_code == 413
+    assert r.headers["content-type"].startswith("application/problem+json")
+    assert "too large" in r.json()["detail"].lower()
@@ -0,0 +1,75 @@
+import logging
+
+import sqlalchemy as sa
+
+import app.main as appmod
+from app.database import SessionLocal, create_missing_indexes, engine
+
+
+def test_batch_reports_created_and_duplicates(client):
+    assert client.post("/topics", json={"title": "Existing"}).status_code == 200
+
+    r = client.post(
+        "/topics/batch",
+        json=[
+            {"title": "A"},
+            {"title": "Existing"},
+            {"title": "B", "deadline": "2999-01-01"},
+            {"title": "A"},
+        ],
+    )
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["created"] == 2 and body["duplicates"] == 2
+    assert [i["status"] for i in body["items"]] == [
+        "created",
+        "duplicate",
+        "created",
+        "duplicate",
+    ]
+    assert body["items"][1]["id"] is None
+
+    created_id = body["items"][0]["id"]
+    assert client.get(f"/topics/{created_id}").json()["title"] == "A"
+    assert len(client.get("/topics").json()) == 3
+
+
+def test_batch_validates_whole_list(client):
+    r = client.post(
+        "/topics/batch",
+        json=[{"title": "ok"}, {"title": "old", "deadline": "2000-01-01"}],
+    )
+    assert r.status_code == 422
+    assert client.get("/topics").json() == []
+
+
+def test_batch_size_limits(client, monkeypatch):
+    assert client.post("/topics/batch", json=[]).status_code == 422
+    too_many = [{"title": f"T{i}"} for i in range(appmod.MAX_BATCH_ITEMS + 1)]
+    assert client.post("/topics/batch", json=too_many).status_code == 422
+
+
+def test_unique_index_over_existing_duplicates_does_not_break_startup(caplog):
+    index = next(
+        i for i in appmod.Topic.__table__.indexes if i.name == "uq_title_null_deadline"
+    )
+    index.drop(bind=engine)
+    db = SessionLocal()
+    try:
+        # Дубликаты, накопленные до появления индекса
+        db.add_all([appmod.Topic(title="Twin"), appmod.Topic(title="Twin")])
+        db.commit()
+
+        with caplog.at_level(logging.ERROR, logger="database"):
+            create_missing_indexes(appmod.Topic.__table__)
+        assert "uq_title_null_deadline was not created" in caplog.text
+        assert "Twin" in caplog.text
+
+        db.query(appmod.Topic).delete()
+        db.commit()
+    finally:
+        db.close()
+        create_missing_indexes(appmod.Topic.__table__)
+        appmod.topic_reads.bump()
+    names = {i["name"] for i in sa.inspect(engine).get_indexes("topics")}
+    assert "uq_title_null_deadline" in names
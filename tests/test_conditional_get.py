@@ -0,0 +1,107 @@
+import pytest
+
+from app.main import topic_reads
+from app.read_cache import (
+    GenerationCache,
+    Rendered,
+    default_process_lock,
+    lock_single_process,
+)
+
+
+@pytest.fixture()
+def topic_id(client):
+    r = client.post("/topics", json={"title": f"Etag {topic_reads.generation}"})
+    assert r.status_code == 200
+    return r.json()["id"]
+
+
+def test_item_304_and_cached_bytes_skip_db(client, topic_id, count_statements):
+    first = client.get(f"/topics/{topic_id}")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    with count_statements() as sql:
+        r = client.get(f"/topics/{topic_id}", headers={"If-None-Match": etag})
+        assert r.status_code == 304 and r.content == b""
+        again = client.get(f"/topics/{topic_id}")
+    assert sql == []
+    assert again.content == first.content
+    assert again.headers["etag"] == etag
+
+
+@pytest.mark.parametrize(
+    "write",
+    [
+        lambda c, tid: c.put(f"/topics/{tid}/progress", json={"progress": 55}),
+        lambda c, tid: c.post("/topics", json={"title": f"Other {tid}"}),
+        lambda c, tid: c.post("/topics/batch", json=[{"title": f"Batch {tid}"}]),
+    ],
+)
+def test_writes_invalidate_etags(client, topic_id, write):
+    list_etag = client.get("/topics", params={"limit": 1000}).headers["etag"]
+    item_etag = client.get(f"/topics/{topic_id}").headers["etag"]
+    assert write(client, topic_id).status_code == 200
+
+    r = client.get(
+        "/topics", params={"limit": 1000}, headers={"If-None-Match": list_etag}
+    )
+    assert r.status_code == 200 and r.headers["etag"] != list_etag
+    r = client.get(f"/topics/{topic_id}", headers={"If-None-Match": item_etag})
+    assert r.status_code == 200
+
+
+def test_delete_invalidates_and_failed_writes_do_not(client, topic_id):
+    etag = client.get(f"/topics/{topic_id}").headers["etag"]
+    assert (
+        client.put("/topics/999999999/progress", json={"progress": 1}).status_code
+        == 404
+    )
+    assert (
+        client.get(f"/topics/{topic_id}", headers={"If-None-Match": etag}).status_code
+        == 304
+    )
+    assert client.delete(f"/topics/{topic_id}").status_code == 200
+    assert (
+        client.get(f"/topics/{topic_id}", headers={"If-None-Match": etag}).status_code
+        == 404
+    )
+
+
+def test_list_pages_have_distinct_etags(client, topic_id):
+    client.post("/topics", json={"title": f"Page two {topic_id}"})
+    a = client.get("/topics", params={"limit": 1})
+    b = client.get("/topics", params={"limit": 2})
+    assert a.headers["etag"] != b.headers["etag"]
+    assert "x-next-cursor" in a.headers
+    # Курсор тоже отдаётся из кэша
+    assert client.get("/topics", params={"limit": 1}).headers["x-next-cursor"] == (
+        a.headers["x-next-cursor"]
+    )
+
+
+def test_cache_bounds_and_stale_puts():
+    cache = GenerationCache(max_entries=2, max_bytes=10)
+    cache.put("a", 0, Rendered(b"1234"))
+    cache.put("b", 0, Rendered(b"1234"))
+    cache.put("c", 0, Rendered(b"1234"))
+    assert cache.get("a") is None and len(cache) == 2
+    # Ответ, посчитанный до записи, не попадает в новое поколение
+    cache.bump()
+    cache.put("d", 0, Rendered(b"x"))
+    assert cache.get("d") is None
+    assert cache.etag("k", 0) != cache.etag("k")
+
+
+def test_second_process_on_same_database_is_refused(tmp_path):
+    """ETag-поколение в памяти: второй воркер на той же базе не стартует."""
+    path = default_process_lock(f"sqlite:///{tmp_path / 'app.db'}")
+    assert path == f"{tmp_path / 'app.db'}.lock"
+    held = lock_single_process(path)
+    try:
+        with pytest.raises(RuntimeError, match="single worker"):
+            lock_single_process(path)
+    finally:
+        held.close()
+    # После остановки первого процесса база снова свободна
+    lock_single_process(path).close()
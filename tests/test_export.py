@@ -0,0 +1,39 @@
+import csv
+import io
+import json
+
+from app.export import iter_export
+
+
+def test_export_ndjson_streams_all_rows(client):
+    for i in range(3):
+        assert client.post("/topics", json={"title": f"Exp{i}"}).status_code == 200
+
+    r = client.get("/topics/export")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["title"] for row in rows] == ["Exp0", "Exp1", "Exp2"]
+    assert set(rows[0]) == {"id", "title", "deadline", "progress"}
+
+
+def test_export_csv_has_header_and_escapes_formulas(client):
+    client.post("/topics", json={"title": "=HYPERLINK(1)"})
+
+    r = client.get("/topics/export", params={"format": "csv"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    assert "topics.csv" in r.headers["content-disposition"]
+    rows = list(csv.reader(io.StringIO(r.text)))
+    assert rows[0] == ["id", "title", "deadline", "progress"]
+    assert rows[1][1] == "'=HYPERLINK(1)"
+
+
+def test_export_unknown_format_rejected(client):
+    assert client.get("/topics/export", params={"format": "xml"}).status_code == 422
+
+
+def test_iter_export_yields_fixed_size_chunks():
+    rows = [(i, f"T{i}", None, 0) for i in range(5)]
+    chunks = list(iter_export(iter(rows), "ndjson", chunk_rows=2))
+    assert [c.count(b"\n") for c in chunks] == [2, 2, 1]
@@ -0,0 +1,77 @@
+import re
+
+import app.main as appmod
+from app.metrics import Counter, Histogram
+from app.ratelimit import SlidingWindowLimiter
+
+
+def _sample(text: str, name: str, **labels: str) -> float:
+    """Значение серии с заданными метками (порядок меток не важен)."""
+    for line in text.splitlines():
+        if line.startswith("#") or not line.startswith(name + "{"):
+            continue
+        series, value = line.rsplit(" ", 1)
+        found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', series))
+        if all(found.get(k) == v for k, v in labels.items()):
+            return float(value)
+    return 0.0
+
+
+def test_metrics_exposes_route_db_and_pool_stats(client):
+    tid = client.post("/topics", json={"title": "Metrics"}).json()["id"]
+    before = client.get("/metrics").text
+    for _ in range(3):
+        assert client.get(f"/topics/{tid}").status_code == 200
+    client.put(f"/topics/{tid}/progress", json={"progress": 10})
+    client.get("/topics/999999999")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = r.text
+
+    route = "/topics/{topic_id}"
+    get = {"method": "GET", "route": route}
+    assert _sample(text, "http_requests_total", **get, status="200") >= 3
+    assert _sample(text, "http_requests_total", **get, status="404") >= 1
+    bucket = {"method": "GET", "route": route, "le": "+Inf"}
+    assert _sample(text, "http_request_duration_seconds_bucket", **bucket) >= (
+        _sample(before, "http_request_duration_seconds_bucket", **bucket) + 4
+    )
+    assert _sample(text, "db_query_duration_seconds_count", operation="UPDATE") >= 1
+    assert _sample(text, "db_pool_checkouts_total") > 0
+    assert _sample(text, "db_pool_connections_in_use") == 0
+    # Неизвестные пути не раздувают кардинальность
+    client.get("/no/such/path/123")
+    assert "/no/such/path/123" not in client.get("/metrics").text
+
+
+def test_rate_limit_rejects_are_counted(client, monkeypatch):
+    monkeypatch.setattr(appmod, "RATE_LIMIT_RPM", 0)
+    monkeypatch.setattr(appmod, "RATE_LIMIT_ROUTES", {"/topics/export": 1})
+    monkeypatch.setattr(appmod, "_limiter", SlidingWindowLimiter())
+    before = _sample(
+        client.get("/metrics").text, "ratelimit_rejected_total", rule="/topics/export"
+    )
+    client.get("/topics/export")
+    assert client.get("/topics/export").status_code == 429
+    text = client.get("/metrics").text
+    assert (
+        _sample(text, "ratelimit_rejected_total", rule="/topics/export") == before + 1
+    )
+    assert _sample(text, "http_requests_total", route="<unmatched>", status="429") >= 1
+
+
+def test_histogram_and_counter_render():
+    h = Histogram("h", "help", ("route",), buckets=(0.1, 1.0))
+    h.observe(0.05, "/a")
+    h.observe(0.5, "/a")
+    h.observe(5.0, "/a")
+    lines = h.render()
+    assert 'h_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'h_bucket{route="/a",le="1"} 2' in lines
+    assert 'h_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'h_count{route="/a"} 3' in lines
+    c = Counter("c", "help", ("path",))
+    c.inc('we"ird\n')
+    assert 'c{path="we\\"ird\\n"} 1' in c.render()
@@ -1,12 +1,131 @@
+import ast
 import re
+from collections import Counter
+from collections.abc import Iterator
 from pathlib import Path
 
+EXECUTE_PATTERN = r"\.execute\("
+# Ищем SQL, собранный строками. Исключение одно: execute(), чей аргумент по AST
+# — конструкция SQLAlchemy (см. _verified_execute_lines)
 SUSPICIOUS_PATTERNS = [
-    r"\.execute\(",
+    EXECUTE_PATTERN,
     r"\.executescript\(",
     r"text\(",
     r"f[\"'].*(SELECT|INSERT|UPDATE|DELETE).*?[\"']",
 ]
+# Служебный DDL, который SQLAlchemy не строит (FTS5, триггеры, PRAGMA), и
+# строки напрямую драйверу. Допустимы только в модулях из REVIEWED_DDL_MODULES
+DDL_PATTERNS = [
+    r"CREATE\s+VIRTUAL\s+TABLE",
+    r"CREATE\s+TRIGGER",
+    r"PRAGMA\s",
+    r"\.exec_driver_sql\(",
+]
+# Проверенные исключения: модуль -> почему ему можно DDL строкой. Только
+# константы без пользовательского ввода; DML по-прежнему через SQLAlchemy
+REVIEWED_DDL_MODULES = {
+    # PRAGMA без bind-параметров: имя и значение проверяются по
+    # _SQLITE_PRAGMA_CHOICES до подстановки (apply_sqlite_pragmas)
+    "app/database.py": "SQLite pragmas from a fixed whitelist",
+    # FTS5-таблица с триггерами синхронизации и 'rebuild' — синтаксис FTS5,
+    # которого нет в SQLAlchemy; строки — константы модуля
+    "app/search.py": "FTS5 index DDL",
+    # Триггеры журнала изменений (только SQLite): SQLAlchemy не строит
+    # CREATE TRIGGER; тела триггеров — константы модуля
+    "app/topic_changes.py": "change log triggers",
+}
+
+
+_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)
+
+
+def _own_nodes(scope: ast.AST) -> Iterator[ast.AST]:
+    """Узлы области видимости без тел вложенных функций и классов."""
+    stack = list(ast.iter_child_nodes(scope))
+    while stack:
+        node = stack.pop()
+        yield node
+        if not isinstance(node, _SCOPES):
+            stack.extend(ast.iter_child_nodes(node))
+
+
+def _is_sql_construct(
+    node: ast.expr, assigned: dict[str, list[ast.expr]], seen: frozenset[str]
+) -> bool:
+    """Вызов вида sa.insert(T).values(...) без text() в цепочке или локальная
+    переменная, которой присваиваются только такие вызовы.
+
+    Строки, f-строки, параметры функций и "...".format() не проходят.
+    """
+    if isinstance(node, ast.Name):
+        if node.id in seen:
+            # stmt = stmt.where(...): решают остальные присваивания
+            return True
+        values = assigned.get(node.id)
+        return bool(values) and all(
+            _is_sql_construct(value, assigned, seen | {node.id}) for value in values
+        )
+    if not isinstance(node, ast.Call):
+        return False
+    func = node.func
+    while isinstance(func, ast.Attribute | ast.Call):
+        if isinstance(func, ast.Call):
+            func = func.func
+        elif func.attr == "text":
+            return False
+        else:
+            func = func.value
+    if not isinstance(func, ast.Name) or func.id == "text":
+        return False
+    # Глобальные имена (sa, select, dialect_insert) — фабрики конструкций
+    return func.id not in assigned or _is_sql_construct(func, assigned, seen)
+
+
+def _verified_execute_lines(source: str) -> Counter[int]:
+    """Строки, где .execute( получает конструкцию SQLAlchemy, а не строку."""
+    tree = ast.parse(source)
+    verified: Counter[int] = Counter()
+    for scope in [tree, *(n for n in ast.walk(tree) if isinstance(n, _SCOPES))]:
+        nodes = list(_own_nodes(scope))
+        assigned: dict[str, list[ast.expr]] = {}
+        if isinstance(scope, ast.FunctionDef | ast.AsyncFunctionDef | ast.Lambda):
+            for arg in ast.walk(scope.args):
+                if isinstance(arg, ast.arg):
+                    assigned[arg.arg] = []
+        for node in nodes:
+            if isinstance(node, ast.Assign):
+                targets = node.targets
+            elif isinstance(node, ast.AnnAssign | ast.AugAssign) and node.value:
+                targets = [node.target]
+            else:
+                continue
+            for target in targets:
+                if isinstance(target, ast.Name):
+                    assigned.setdefault(target.id, []).append(node.value)
+        for node in nodes:
+            if (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Attribute)
+                and node.func.attr == "execute"
+                and len(node.args) == 1
+                and _is_sql_construct(node.args[0], assigned, frozenset())
+            ):
+                verified[node.func.end_lineno or node.lineno] += 1
+    return verified
+
+
+def _violations(source: str, patterns: list[str]) -> list[tuple[int, str]]:
+    """(строка, шаблон) для каждого совпадения, кроме проверенных execute()."""
+    verified = _verified_execute_lines(source)
+    found = []
+    for pattern in patterns:
+        for match in re.finditer(pattern, source, flags=re.IGNORECASE):
+            line = source.count("\n", 0, match.start()) + 1
+            if pattern == EXECUTE_PATTERN and verified[line]:
+                verified[line] -= 1
+                continue
+            found.append((line, pattern))
+    return found
 
 
 def test_no_raw_sql_in_app_code():
@@ -17,9 +136,11 @@ def test_no_raw_sql_in_app_code():
 
     for file_path in py_files:
         text = file_path.read_text(encoding="utf-8")
-        for pattern in SUSPICIOUS_PATTERNS:
-            if re.search(pattern, text, flags=re.IGNORECASE):
-                violations.append(f"{file_path}: содержит {pattern}")
+        patterns = list(SUSPICIOUS_PATTERNS)
+        if file_path.as_posix() not in REVIEWED_DDL_MODULES:
+            patterns += DDL_PATTERNS
+        for line, pattern in _violations(text, patterns):
+            violations.append(f"{file_path}:{line}: содержит {pattern}")
 
     if violations:
         print("\n Найдены потенциально небезопасные SQL-вызовы:")
@@ -27,3 +148,46 @@ def test_no_raw_sql_in_app_code():
             print("  -", v)
 
     assert not violations, "Обнаружены небезопасные SQL-вызовы!"
+
+
+def test_reviewed_ddl_modules_still_need_exception():
+    """Исключение, которое больше ничего не покрывает, удаляется из списка."""
+    for module in REVIEWED_DDL_MODULES:
+        text = Path(module).read_text(encoding="utf-8")
+        assert any(
+            re.search(p, text, flags=re.IGNORECASE) for p in DDL_PATTERNS
+        ), module
+
+
+def test_patterns_catch_raw_sql():
+    """Сам детектор: строковый SQL ловится, конструкции SQLAlchemy — нет."""
+    raw = [
+        'db.execute("SELECT 1")',
+        "conn.execute(f'DELETE FROM t WHERE id={i}')",
+        'session.execute(text("SELECT 1"))',
+        'cur.executescript("DROP TABLE t")',
+        'q = "DELETE FROM t WHERE id=" + i\ndb.execute(q)',
+        'q = "SELECT 1"\ndb.execute(q.strip())',
+        "def run(db, q):\n    db.execute(q)",
+        'conn.execute("SELECT {}".format(name))',
+        "stmt = sa.select(T)\nstmt = 'SELECT 1'\nconn.execute(stmt)",
+    ]
+    ddl = [
+        'conn.exec_driver_sql(f"PRAGMA {name}={value}")',
+        "CREATE TRIGGER IF NOT EXISTS t_ai AFTER INSERT ON t BEGIN SELECT 1; END",
+    ]
+    allowed = [
+        "await db.execute(sa.update(Topic).values(progress=1))",
+        "stmt = sa.select(T)\nstmt = stmt.where(T.id == 1)\nconn.execute(stmt)",
+        "meta = dialect_insert(T).values(id=1)\ndb.execute(meta.on_conflict_do_nothing())",
+    ]
+
+    def flagged(source: str) -> bool:
+        return bool(_violations(source, SUSPICIOUS_PATTERNS))
+
+    assert all(flagged(line) for line in raw)
+    assert all(
+        any(re.search(p, line, flags=re.IGNORECASE) for p in DDL_PATTERNS)
+        for line in ddl
+    )
+    assert not any(flagged(line) for line in allowed)
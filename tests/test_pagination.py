@@ -0,0 +1,48 @@
+from datetime import date, timedelta
+
+from app.pagination import NEXT_CURSOR_HEADER
+
+
+def _seed(client, n: int) -> list[int]:
+    base = date.today() + timedelta(days=1)
+    ids = []
+    for i in range(n):
+        deadline = None if i % 3 == 0 else (base + timedelta(days=i % 4)).isoformat()
+        r = client.post("/topics", json={"title": f"T{i}", "deadline": deadline})
+        assert r.status_code == 200, r.text
+        ids.append(r.json()["id"])
+    return ids
+
+
+def test_keyset_by_id_walks_all_rows_once(client, collect_pages):
+    ids = _seed(client, 7)
+    items = collect_pages({"limit": 3})
+    assert [t["id"] for t in items] == sorted(ids)
+
+
+def test_keyset_by_deadline_orders_nulls_first(client, collect_pages):
+    _seed(client, 10)
+    items = collect_pages({"limit": 4, "sort": "deadline"})
+    assert len(items) == 10
+    keys = [(t["deadline"] is not None, t["deadline"] or "", t["id"]) for t in items]
+    assert keys == sorted(keys)
+
+
+def test_last_page_has_no_cursor(client):
+    _seed(client, 2)
+    r = client.get("/topics", params={"limit": 5})
+    assert len(r.json()) == 2
+    assert NEXT_CURSOR_HEADER not in r.headers
+
+
+def test_invalid_cursor_and_limit(client):
+    r = client.get("/topics", params={"cursor": "not-a-cursor"})
+    assert r.status_code == 400
+    assert r.headers.get("content-type", "").startswith("application/problem+json")
+
+    _seed(client, 2)
+    cursor = client.get("/topics", params={"limit": 1}).headers[NEXT_CURSOR_HEADER]
+    mixed = client.get("/topics", params={"cursor": cursor, "sort": "deadline"})
+    assert mixed.status_code == 400
+
+    assert client.get("/topics", params={"limit": 0}).status_code == 422
@@ -0,0 +1,27 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+N = 50
+
+
+def test_batch_vs_single_posts():
+    start = time.perf_counter()
+    for i in range(N):
+        assert client.post("/topics", json={"title": f"single-{i}"}).status_code == 200
+    single = time.perf_counter() - start
+
+    items = [{"title": f"batch-{i}"} for i in range(N)]
+    start = time.perf_counter()
+    r = client.post("/topics/batch", json=items)
+    batch = time.perf_counter() - start
+    assert r.status_code == 200
+    assert r.json()["created"] == N
+
+    print(f"\n{N} x POST /topics: {single * 1000:.1f} ms")
+    print(f"1 x POST /topics/batch ({N}): {batch * 1000:.1f} ms")
+    assert batch < single
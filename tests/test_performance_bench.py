@@ -0,0 +1,35 @@
+"""Смоук-прогон бенчмарк-сьюта (perf/bench.py) на маленькой БД."""
+
+import sqlite3
+
+import perf.bench as bench
+
+
+def test_bench_suite_smoke(tmp_path, monkeypatch):
+    monkeypatch.setattr(bench, "DATA_DIR", tmp_path)
+    db = bench.seed_database(2000)
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT count(*) FROM topics").fetchone() == (2000,)
+    conn.close()
+    # Повторный вызов берёт готовую БД из кэша
+    assert bench.seed_database(2000) == db
+
+    results = bench.run_size(
+        2000, ["mixed"], requests=300, concurrency=16, env=bench.DEFAULT_SERVER_ENV
+    )
+    mixed = results["mixed"]
+    print(f"\n{bench.format_table({'2000/mixed': mixed})}")
+    assert mixed["requests"] == 300 and mixed["errors"] == 0
+    assert mixed["p50_ms"] <= mixed["p95_ms"] <= mixed["p99_ms"]
+
+
+def test_compare_flags_regressions():
+    base = {"10/mixed": {"rps": 100.0, "p95_ms": 10.0, "p99_ms": 20.0, "errors": 0}}
+    same = {"10/mixed": {"rps": 95.0, "p95_ms": 11.0, "p99_ms": 21.0, "errors": 0}}
+    assert bench.compare(same, base, tolerance=0.25) == []
+    worse = {"10/mixed": {"rps": 50.0, "p95_ms": 30.0, "p99_ms": 21.0, "errors": 2}}
+    flagged = bench.compare(worse, base, tolerance=0.25)
+    assert len(flagged) == 3
+    assert any("p95_ms" in f for f in flagged) and any("rps" in f for f in flagged)
+    # Ключи без базовой линии не сравниваются
+    assert bench.compare({"99/new": worse["10/mixed"]}, base, 0.25) == []
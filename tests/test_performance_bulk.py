@@ -0,0 +1,39 @@
+import time
+
+import pytest
+
+N = 100
+
+pytestmark = pytest.mark.perf
+
+
+def test_bulk_progress_vs_single_puts(client, count_statements):
+    r = client.post("/topics/batch", json=[{"title": f"bulk-{i}"} for i in range(N)])
+    ids = [item["id"] for item in r.json()["items"]]
+
+    start = time.perf_counter()
+    with count_statements() as single_sql:
+        for topic_id in ids:
+            r = client.put(f"/topics/{topic_id}/progress", json={"progress": 50})
+            assert r.status_code == 200
+    single = time.perf_counter() - start
+
+    body = [{"id": topic_id, "progress": 100} for topic_id in ids]
+    start = time.perf_counter()
+    with count_statements() as bulk_sql:
+        r = client.put("/topics/progress", json=body)
+    bulk = time.perf_counter() - start
+    assert r.json()["affected"] == N
+
+    start = time.perf_counter()
+    with count_statements() as filter_sql:
+        r = client.delete("/topics", params={"progress_min": 100})
+    by_filter = time.perf_counter() - start
+    assert r.json()["affected"] == N
+
+    print(f"\n{N} x PUT /topics/{{id}}/progress: {single * 1000:.1f} ms")
+    print(f"1 x PUT /topics/progress ({N}): {bulk * 1000:.1f} ms")
+    print(f"1 x DELETE /topics?progress_min=100 ({N}): {by_filter * 1000:.1f} ms")
+    # Выигрыш — в числе запросов: по одному на тему против одного на пакет
+    assert len(single_sql) == N
+    assert len(bulk_sql) == len(filter_sql) == 1
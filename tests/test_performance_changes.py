@@ -0,0 +1,35 @@
+import time
+
+import pytest
+
+N = 1000
+ROUNDS = 50
+
+pytestmark = pytest.mark.perf
+
+
+def test_change_feed_poll_vs_full_list(client, changes_head):
+    ids: list[int] = []
+    for start in range(0, N, 500):
+        items = [{"title": f"sync-{i}"} for i in range(start, start + 500)]
+        r = client.post("/topics/batch", json=items)
+        ids += [item["id"] for item in r.json()["items"]]
+    since = changes_head()
+
+    # Между опросами меняется одна тема: список пересобирается целиком,
+    # журнал отдаёт одну запись
+    full = feed = 0.0
+    for i in range(ROUNDS):
+        client.put(f"/topics/{ids[i]}/progress", json={"progress": 50})
+        start = time.perf_counter()
+        assert len(client.get("/topics", params={"limit": 100}).json()) == 100
+        full += time.perf_counter() - start
+        start = time.perf_counter()
+        page = client.get("/topics/changes", params={"since": since}).json()
+        feed += time.perf_counter() - start
+        assert [c["id"] for c in page["changes"]] == [ids[i]]
+        since = page["version"]
+
+    print(f"\n{ROUNDS} x GET /topics?limit=100 after a write: {full * 1000:.1f} ms")
+    print(f"{ROUNDS} x GET /topics/changes after a write: {feed * 1000:.1f} ms")
+    assert feed < full
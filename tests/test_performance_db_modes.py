@@ -0,0 +1,36 @@
+"""Сравнение async- и sync-режима БД под конкурентной нагрузкой (реальный uvicorn)."""
+
+import httpx
+import pytest
+
+from perf.loadgen import run_mixed_load, start_server, stop_server
+
+TOTAL_REQUESTS = 500
+
+pytestmark = pytest.mark.perf
+
+
+def _run_mode(tmp_path, db_async: bool) -> dict[str, float]:
+    proc, base_url = start_server(
+        tmp_path / f"bench_{db_async}.db", APP_DB_ASYNC="1" if db_async else "0"
+    )
+    try:
+        seed = [{"title": f"seed-{i}"} for i in range(200)]
+        assert httpx.post(f"{base_url}/topics/batch", json=seed).status_code == 200
+        return run_mixed_load(base_url, total=TOTAL_REQUESTS)
+    finally:
+        stop_server(proc)
+
+
+def test_async_vs_sync_db_mode(tmp_path):
+    results = {
+        "async": _run_mode(tmp_path, db_async=True),
+        "sync": _run_mode(tmp_path, db_async=False),
+    }
+    for mode, r in results.items():
+        print(
+            f"\n{mode:>5}: {r['rps']:.1f} RPS, p95 = {r['p95_ms']:.1f} ms, "
+            f"errors = {r['errors']}"
+        )
+    # NFR-06 обязателен для режима по умолчанию; sync — фолбэк, только отчёт
+    assert results["async"]["errors"] / TOTAL_REQUESTS <= 0.02
@@ -0,0 +1,19 @@
+import time
+
+from app.metrics import Counter, Histogram
+
+N = 100_000
+
+
+def test_metrics_observation_cost():
+    counter = Counter("bench_total", "bench", ("method", "route", "status"))
+    histogram = Histogram("bench_seconds", "bench", ("method", "route"))
+
+    start = time.perf_counter()
+    for i in range(N):
+        counter.inc("GET", "/topics", "200")
+        histogram.observe(i * 1e-6, "GET", "/topics")
+    per_request = (time.perf_counter() - start) / N
+
+    print(f"\ncounter.inc + histogram.observe: {per_request * 1e6:.2f} µs")
+    assert per_request < 20e-6
@@ -0,0 +1,79 @@
+"""Накладные расходы middleware: 4 x BaseHTTPMiddleware против одного ASGI-слоя."""
+
+import asyncio
+import time
+import uuid
+
+import httpx
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+import app.request_logging as reqlog
+from app.main import RequestPipelineMiddleware
+
+REQUESTS = 2000
+
+
+async def _ok(_request):
+    return PlainTextResponse("ok")
+
+
+def _legacy_app() -> Starlette:
+    """Структура прежнего стека: четыре слоя @app.middleware("http")."""
+
+    async def request_id(request, call_next):
+        request.state.request_id = request.headers.get(
+            "X-Request-ID", str(uuid.uuid4())
+        )
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request.state.request_id
+        return response
+
+    async def body_limit(request, call_next):
+        cl = request.headers.get("content-length")
+        if cl and cl.isdigit() and int(cl) > 2 * 1024 * 1024:
+            return PlainTextResponse("too large", status_code=413)
+        return await call_next(request)
+
+    async def rate_limit(request, call_next):
+        return await call_next(request)
+
+    async def log_requests(request, call_next):
+        return await call_next(request)
+
+    app = Starlette(routes=[Route("/", _ok)])
+    for dispatch in (request_id, body_limit, rate_limit, log_requests):
+        app.add_middleware(BaseHTTPMiddleware, dispatch=dispatch)
+    return app
+
+
+def _pipeline_app() -> Starlette:
+    app = Starlette(routes=[Route("/", _ok)])
+    app.add_middleware(RequestPipelineMiddleware)
+    return app
+
+
+async def _per_request_us(app: Starlette) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        for _ in range(100):
+            await client.get("/")
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            assert (await client.get("/")).status_code == 200
+        return (time.perf_counter() - start) / REQUESTS * 1e6
+
+
+def test_pipeline_overhead_below_legacy_stack(monkeypatch):
+    # Логирование выключено в обоих вариантах: меряем только middleware
+    monkeypatch.setattr(reqlog, "LOG_SAMPLE_RATE", 0.0)
+    legacy = asyncio.run(_per_request_us(_legacy_app()))
+    pipeline = asyncio.run(_per_request_us(_pipeline_app()))
+    print(
+        f"\n4 x BaseHTTPMiddleware: {legacy:.0f} us/req, ASGI pipeline: {pipeline:.0f} us/req"
+    )
+    assert pipeline < legacy
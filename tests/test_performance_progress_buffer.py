@@ -0,0 +1,43 @@
+import time
+
+import pytest
+
+from app.main import progress_buffer
+
+N = 100
+
+pytestmark = pytest.mark.perf
+
+
+def _writes(statements: list[str]) -> list[str]:
+    return [s for s in statements if not s.startswith("SELECT")]
+
+
+def test_buffered_progress_puts(client, monkeypatch, count_statements):
+    r = client.post("/topics/batch", json=[{"title": f"buf-{i}"} for i in range(N)])
+    ids = [item["id"] for item in r.json()["items"]]
+
+    def _puts(value: int) -> tuple[float, list[str]]:
+        start = time.perf_counter()
+        with count_statements() as statements:
+            for topic_id in ids:
+                r = client.put(f"/topics/{topic_id}/progress", json={"progress": value})
+                assert r.status_code == 200
+        return time.perf_counter() - start, statements
+
+    direct, direct_sql = _puts(50)
+    monkeypatch.setattr(progress_buffer, "enabled", True)
+    monkeypatch.setattr(progress_buffer, "interval", 3600.0)
+    buffered, buffered_sql = _puts(60)
+    start = time.perf_counter()
+    with count_statements() as flush_sql:
+        assert client.portal.call(progress_buffer.flush) == N
+    flush = time.perf_counter() - start
+
+    print(f"\n{N} x PUT /topics/{{id}}/progress, direct: {direct * 1000:.1f} ms")
+    print(f"{N} x PUT /topics/{{id}}/progress, buffered: {buffered * 1000:.1f} ms")
+    print(f"flush ({N} topics, 1 transaction): {flush * 1000:.1f} ms")
+    # Выигрыш — в записях: UPDATE на каждый PUT против одного UPDATE на сброс
+    assert len(_writes(direct_sql)) == N
+    assert _writes(buffered_sql) == []
+    assert [s.split()[0] for s in flush_sql] == ["UPDATE"]
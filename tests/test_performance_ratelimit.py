@@ -0,0 +1,22 @@
+import time
+
+from app.ratelimit import SlidingWindowLimiter
+
+CALLS = 20_000
+
+
+def _cost_per_hit(rpm: int) -> float:
+    limiter = SlidingWindowLimiter(window=60.0)
+    start = time.perf_counter()
+    for i in range(CALLS):
+        limiter.hit("client", rpm, now=i * 0.001)
+    return (time.perf_counter() - start) / CALLS
+
+
+def test_limiter_cost_is_flat_in_rpm():
+    low = _cost_per_hit(60)
+    high = _cost_per_hit(1_000_000)
+    print(f"\nrpm=60: {low * 1e6:.2f} us/hit, rpm=1e6: {high * 1e6:.2f} us/hit")
+    # Старый list + pop(0) деградировал линейно от RPM; теперь цена одна и та же
+    assert high < low * 3
+    assert high < 50e-6
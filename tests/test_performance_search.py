@@ -0,0 +1,55 @@
+import random
+import string
+import time
+from datetime import date
+
+import pytest
+
+import app.search as search
+from app.database import SessionLocal
+from app.main import Topic, TopicFilters, topics_query
+
+N = 50_000
+QUERIES = ["zqx", "abcd", "mno", "topic-12"]
+
+pytestmark = pytest.mark.perf
+
+
+def _titles(n: int) -> list[str]:
+    rng = random.Random(7)
+    letters = string.ascii_lowercase
+    return [
+        f"topic-{i} " + "".join(rng.choice(letters) for _ in range(12))
+        for i in range(n)
+    ]
+
+
+def _timed(db, q: str) -> tuple[float, list[int]]:
+    stmt = topics_query(TopicFilters(q=q), "relevance", date.today()).limit(20)
+    start = time.perf_counter()
+    ids = sorted(row["id"] for row in db.scalars(stmt))
+    return time.perf_counter() - start, ids
+
+
+def test_fts_trigram_vs_like_scan(monkeypatch):
+    assert search.fts_enabled
+    db = SessionLocal()
+    try:
+        db.bulk_insert_mappings(Topic, [{"title": t} for t in _titles(N)])
+        db.commit()
+        fts = like = 0.0
+        for q in QUERIES:
+            elapsed, fts_ids = _timed(db, q)
+            fts += elapsed
+            with monkeypatch.context() as m:
+                m.setattr(search, "fts_enabled", False)
+                elapsed, like_ids = _timed(db, q)
+            like += elapsed
+            # Выдача может отличаться только порядком ранжирования внутри LIMIT
+            assert len(fts_ids) == len(like_ids)
+    finally:
+        db.close()
+
+    print(f"\n{N} topics, {len(QUERIES)} queries, FTS5 trigram: {fts * 1000:.1f} ms")
+    print(f"{N} topics, {len(QUERIES)} queries, LIKE scan: {like * 1000:.1f} ms")
+    assert fts < like
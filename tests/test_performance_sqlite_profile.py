@@ -0,0 +1,36 @@
+"""Смешанная нагрузка чтение/запись: SQLite по умолчанию против продового профиля."""
+
+import httpx
+import pytest
+
+from perf.loadgen import run_mixed_load, start_server, stop_server
+
+TOTAL_REQUESTS = 600
+
+pytestmark = pytest.mark.perf
+
+
+def _run_profile(tmp_path, tuned: bool) -> dict[str, float]:
+    proc, base_url = start_server(
+        tmp_path / f"profile_{tuned}.db", APP_SQLITE_TUNED="1" if tuned else "0"
+    )
+    try:
+        seed = [{"title": f"seed-{i}"} for i in range(200)]
+        assert httpx.post(f"{base_url}/topics/batch", json=seed).status_code == 200
+        # Каждый 4-й запрос — запись
+        return run_mixed_load(base_url, total=TOTAL_REQUESTS, write_every=4)
+    finally:
+        stop_server(proc)
+
+
+def test_tuned_sqlite_profile_under_mixed_load(tmp_path):
+    results = {
+        "default": _run_profile(tmp_path, tuned=False),
+        "tuned": _run_profile(tmp_path, tuned=True),
+    }
+    for profile, r in results.items():
+        print(
+            f"\n{profile:>7}: {r['rps']:.1f} RPS, p95 = {r['p95_ms']:.1f} ms, "
+            f"errors = {r['errors']}"
+        )
+    assert results["tuned"]["errors"] == 0
@@ -0,0 +1,79 @@
+import pstats
+
+import pytest
+from sqlalchemy import event
+
+import app.profiling as profiling
+from app.database import serving_engines
+
+
+@pytest.fixture()
+def profile_mode(monkeypatch):
+    """Как APP_PROFILE_MODE при старте: режим и хуки времени SQL."""
+
+    def enable(mode: str, sample_rate: float = 0.0, directory=None):
+        monkeypatch.setattr(profiling, "PROFILE_MODE", mode)
+        monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", sample_rate)
+        if directory is not None:
+            monkeypatch.setattr(profiling, "PROFILE_DIR", directory)
+        profiling.instrument_db_timings(serving_engines())
+
+    yield enable
+    for engine in serving_engines():
+        if event.contains(engine, "before_cursor_execute", profiling._db_started):
+            event.remove(engine, "before_cursor_execute", profiling._db_started)
+            event.remove(engine, "after_cursor_execute", profiling._db_finished)
+
+
+def test_db_timings_are_off_by_default():
+    """APP_PROFILE_MODE=off: на движках нет хуков before/after_cursor_execute."""
+    assert profiling.PROFILE_MODE == "off"
+    assert not any(
+        event.contains(engine, "before_cursor_execute", profiling._db_started)
+        for engine in serving_engines()
+    )
+
+
+def _phases(header: str) -> dict[str, float]:
+    parts = (item.strip().split(";dur=") for item in header.split(","))
+    return {name: float(ms) for name, ms in parts}
+
+
+def test_server_timing_off_by_default(client):
+    r = client.get("/topics", headers={"X-Profile": "1"})
+    assert "server-timing" not in r.headers
+
+
+def test_header_mode_reports_phases(client, profile_mode):
+    profile_mode("header")
+    client.post("/topics", json={"title": "Timed"})
+    assert "server-timing" not in client.get("/topics").headers
+
+    r = client.post("/topics", json={"title": "Timed 2"}, headers={"X-Profile": "1"})
+    phases = _phases(r.headers["server-timing"])
+    assert set(phases) == {"db", "validate", "app", "serialize", "middleware", "total"}
+    assert phases["db"] > 0
+    assert phases["total"] >= phases["db"] + phases["validate"]
+
+    r = client.get("/topics", params={"limit": 7}, headers={"X-Profile": "1"})
+    assert _phases(r.headers["server-timing"])["serialize"] > 0
+
+
+def test_validation_errors_are_timed_as_validate(client, profile_mode):
+    profile_mode("all")
+    r = client.post("/topics", json={"title": ""})
+    assert r.status_code == 422
+    phases = _phases(r.headers["server-timing"])
+    assert phases["validate"] > 0 and phases["db"] == 0
+
+
+def test_sampled_cprofile_written(client, profile_mode, tmp_path):
+    profile_mode("all", sample_rate=1.0, directory=tmp_path)
+    r = client.get("/topics", headers={"X-Request-ID": "abc/../x"})
+    assert r.status_code == 200
+    (dump,) = tmp_path.glob("*.prof")
+    assert "GET-topics-abcx" in dump.name
+    assert pstats.Stats(str(dump)).total_calls > 0
+    # Профайлер освобождён — следующий запрос снова профилируется
+    client.get("/topics")
+    assert len(list(tmp_path.glob("*.prof"))) == 2
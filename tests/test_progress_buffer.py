@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+import app.topic_stats as topic_stats
+from app.database import engine
+from app.main import Topic, progress_buffer
+from app.write_buffer import ProgressWriteBuffer
+from tests.test_topic_stats import _create, _insert_overdue
+
+
+@pytest.fixture
+def buffered(client, monkeypatch):
+    """Group commit без фонового сброса по таймеру — сбрасываем вручную."""
+    monkeypatch.setattr(progress_buffer, "enabled", True)
+    monkeypatch.setattr(progress_buffer, "interval", 3600.0)
+    yield progress_buffer
+    client.portal.call(progress_buffer.flush)
+
+
+def _db_progress(client, topic_id: int) -> int:
+    # Фильтр по progress сбрасывает буфер — значение берётся уже из БД
+    rows = client.get("/topics", params={"progress_min": 0}).json()
+    return {t["id"]: t["progress"] for t in rows}[topic_id]
+
+
+def test_updates_coalesce_into_one_write(client, buffered, count_statements):
+    a = _create(client, "A")
+    b = _create(client, "B")
+    with count_statements() as statements:
+        for value in (10, 20, 30):
+            assert client.put(f"/topics/{a}/progress", json={"progress": value}).json()
+        assert (
+            client.put(f"/topics/{b}/progress", json={"progress": 5}).status_code == 200
+        )
+    assert not [s for s in statements if s.startswith("UPDATE")]
+    assert buffered.pending == {a: 30, b: 5}
+
+    # Чтения видят ещё не записанные значения
+    assert client.get(f"/topics/{a}").json()["progress"] == 30
+    assert {t["id"]: t["progress"] for t in client.get("/topics").json()} == {
+        a: 30,
+        b: 5,
+    }
+
+    with count_statements() as statements:
+        assert client.portal.call(buffered.flush) == 2
+    assert [s.split()[0] for s in statements] == ["UPDATE"]
+    assert buffered.pending == {}
+    assert client.get(f"/topics/{a}").json()["progress"] == 30
+
+
+def test_unknown_topic_is_404(client, buffered):
+    r = client.put("/topics/999999/progress", json={"progress": 10})
+    assert r.status_code == 404
+    assert buffered.pending == {}
+
+
+def test_progress_filter_sees_buffered_writes(client, buffered):
+    a = _create(client, "A")
+    _create(client, "B")
+    client.put(f"/topics/{a}/progress", json={"progress": 100})
+    done = client.get("/topics", params={"progress_min": 100}).json()
+    assert [t["id"] for t in done] == [a]
+    assert buffered.pending == {}
+
+
+@pytest.mark.parametrize("summary", [False, True])
+def test_stats_overlay_buffered_writes_without_flushing(
+    client, buffered, count_statements, monkeypatch, summary
+):
+    a = _insert_overdue(0)
+    _insert_overdue(10)
+    monkeypatch.setattr(topic_stats, "TOPIC_STATS_SUMMARY", summary)
+    topic_stats.rebuild_topic_stats(engine, Topic.__table__)
+    client.put(f"/topics/{a}/progress", json={"progress": 100})
+    with count_statements() as statements:
+        stats = client.get("/topics/stats").json()
+    assert not [s for s in statements if not s.startswith("SELECT")]
+    assert buffered.pending == {a: 100}
+    assert stats["completed"] == 1 and stats["overdue"] == 1
+    assert stats["avg_progress"] == 55.0
+
+    client.portal.call(buffered.flush)
+    assert client.get("/topics/stats").json() == stats
+
+
+def test_delete_and_bulk_flush_first(client, buffered):
+    a = _create(client, "A")
+    b = _create(client, "B")
+    client.put(f"/topics/{a}/progress", json={"progress": 40})
+    r = client.put("/topics/progress", json=[{"id": a, "progress": 70}])
+    assert r.json() == {"affected": 1, "missing": []}
+    # Буфер не перезаписал более позднее значение из пакета
+    assert buffered.pending == {}
+    assert _db_progress(client, a) == 70
+
+    client.put(f"/topics/{b}/progress", json={"progress": 10})
+    assert client.delete(f"/topics/{b}").status_code == 200
+    assert buffered.pending == {}
+    assert client.get(f"/topics/{b}").status_code == 404
+
+
+def test_flush_by_entries_and_interval(client, buffered, monkeypatch):
+    ids = [_create(client, f"T{i}") for i in range(3)]
+    monkeypatch.setattr(buffered, "max_entries", 3)
+    for i in ids:
+        client.put(f"/topics/{i}/progress", json={"progress": 50})
+
+    async def _drained() -> None:
+        while buffered.snapshot():
+            await asyncio.sleep(0.01)
+
+    client.portal.call(asyncio.wait_for, _drained(), 5)
+    assert all(_db_progress(client, i) == 50 for i in ids)
+
+    monkeypatch.setattr(buffered, "interval", 0.02)
+    client.put(f"/topics/{ids[0]}/progress", json={"progress": 60})
+    client.portal.call(asyncio.wait_for, _drained(), 5)
+    assert _db_progress(client, ids[0]) == 60
+
+
+def test_close_flushes_and_failed_write_is_requeued():
+    written: list[dict[int, int]] = []
+    fail = True
+
+    async def write(batch: dict[int, int]) -> None:
+        nonlocal fail
+        if fail:
+            fail = False
+            raise RuntimeError("db is down")
+        written.append(dict(batch))
+
+    async def scenario() -> None:
+        buffer = ProgressWriteBuffer(write, enabled=True, interval_ms=3_600_000)
+        buffer.put(1, 10)
+        buffer.put(2, 20)
+        with pytest.raises(RuntimeError):
+            await buffer.flush()
+        # Значение, пришедшее после неудачной попытки, важнее возвращённого
+        buffer.put(1, 15)
+        assert buffer.snapshot() == {1: 15, 2: 20}
+        await buffer.close()
+        assert buffer.pending == {}
+
+    asyncio.run(scenario())
+    assert written == [{1: 15, 2: 20}]
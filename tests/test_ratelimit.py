@@ -0,0 +1,43 @@
+import app.main as appmod
+from app.ratelimit import SlidingWindowLimiter, match_route_limit, parse_route_limits
+
+
+def test_sliding_window_blocks_and_recovers():
+    limiter = SlidingWindowLimiter(window=60.0)
+    assert all(limiter.hit("ip", 3, now=0.0) for _ in range(3))
+    assert not limiter.hit("ip", 3, now=1.0)
+    # Через окно прошлые запросы учитываются с весом: 3 * (1 - 30/60) = 1.5 < 3
+    assert limiter.hit("ip", 3, now=90.0)
+    # После двух окон простоя состояние пустое
+    assert all(limiter.hit("ip", 3, now=300.0) for _ in range(3))
+
+
+def test_idle_keys_evicted_and_total_bounded():
+    limiter = SlidingWindowLimiter(window=60.0, max_keys=3, sweep_interval=10.0)
+    for i in range(5):
+        limiter.hit(f"ip{i}", 10, now=0.0)
+    assert len(limiter) == 3
+
+    limiter.hit("fresh", 10, now=130.0)
+    assert len(limiter) == 1
+
+
+def test_route_limits_parsing_and_matching():
+    routes = parse_route_limits("/upload=10, /topics/batch=30,bad")
+    assert routes == {"/upload": 10, "/topics/batch": 30}
+    assert match_route_limit("/upload", routes, 60) == ("/upload", 10)
+    assert match_route_limit("/topics/batch", routes, 60) == ("/topics/batch", 30)
+    assert match_route_limit("/topics", routes, 60) == ("*", 60)
+    assert match_route_limit("/uploads", routes, 60) == ("*", 60)
+
+
+def test_per_route_limit_applies_without_global(client, monkeypatch):
+    monkeypatch.setattr(appmod, "RATE_LIMIT_RPM", 0)
+    monkeypatch.setattr(appmod, "RATE_LIMIT_ROUTES", {"/topics/export": 1})
+    monkeypatch.setattr(appmod, "_limiter", SlidingWindowLimiter())
+
+    assert client.get("/topics/export").status_code == 200
+    limited = client.get("/topics/export")
+    assert limited.status_code == 429
+    assert "1/min" in limited.json()["detail"]
+    assert client.get("/topics").status_code == 200
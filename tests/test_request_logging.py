@@ -0,0 +1,56 @@
+import json
+import logging
+from logging.handlers import QueueHandler
+
+import app.request_logging as reqlog
+
+
+def _messages(caplog) -> list[str]:
+    return [r.getMessage() for r in caplog.records if r.name == "studyplan"]
+
+
+def test_root_logger_writes_through_queue():
+    assert any(isinstance(h, QueueHandler) for h in logging.getLogger().handlers)
+
+
+def test_json_body_logged_and_masked(client, caplog):
+    caplog.set_level(logging.INFO, logger="studyplan")
+    client.post("/topics", json={"title": "Log me", "token": "s3cret"})
+    request_logs = [m for m in _messages(caplog) if m.startswith("Request POST")]
+    assert request_logs and "Log me" in request_logs[0]
+    assert "s3cret" not in request_logs[0] and "****" in request_logs[0]
+
+
+def test_large_or_non_json_body_not_parsed(client, caplog, monkeypatch):
+    caplog.set_level(logging.INFO, logger="studyplan")
+    monkeypatch.setattr(reqlog, "LOG_BODY_MAX_BYTES", 10)
+    client.post("/topics", json={"title": "Too long for the log cap"})
+    client.post("/upload", files={"file": ("a.json", json.dumps({"k": "v"}))})
+    request_logs = [m for m in _messages(caplog) if m.startswith("Request POST")]
+    assert len(request_logs) == 2
+    assert all(m.endswith("body={}") for m in request_logs)
+
+
+def test_sampling_and_route_levels(client, caplog, monkeypatch):
+    caplog.set_level(logging.INFO, logger="studyplan")
+    monkeypatch.setattr(reqlog, "LOG_SAMPLE_RATE", 0.0)
+    client.get("/topics")
+    assert not _messages(caplog)
+
+    monkeypatch.setattr(reqlog, "LOG_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(reqlog, "LOG_ROUTE_LEVELS", {"/topics": logging.DEBUG})
+    client.get("/topics")
+    assert not _messages(caplog)
+
+    caplog.set_level(logging.DEBUG, logger="studyplan")
+    client.get("/topics")
+    records = [r for r in caplog.records if r.name == "studyplan"]
+    assert records and all(r.levelno == logging.DEBUG for r in records)
+    assert records[-1].status == 200 and records[-1].duration_ms >= 0
+
+
+def test_unknown_route_level_is_ignored_with_warning(caplog):
+    caplog.set_level(logging.WARNING, logger="studyplan")
+    levels = reqlog.parse_route_levels("/topics=debug, /upload=LOUD, /stats=30")
+    assert levels == {"/topics": logging.DEBUG, "/stats": logging.WARNING}
+    assert any("LOUD" in m and "/upload" in m for m in _messages(caplog))
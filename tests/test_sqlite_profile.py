@@ -0,0 +1,67 @@
+import pytest
+import sqlalchemy as sa
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+from app.database import (
+    SQLITE_READ_PRAGMAS,
+    SQLITE_WRITE_PRAGMAS,
+    RoutingSession,
+    apply_sqlite_pragmas,
+    sqlite_readonly_url,
+)
+
+_items = sa.Table(
+    "items",
+    sa.MetaData(),
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("name", sa.String),
+)
+
+
+@pytest.fixture()
+def engines(tmp_path):
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    writer = create_engine(url)
+    apply_sqlite_pragmas(writer, SQLITE_WRITE_PRAGMAS)
+    _items.metadata.create_all(writer)
+    reader = create_engine(sqlite_readonly_url(url))
+    apply_sqlite_pragmas(reader, SQLITE_READ_PRAGMAS)
+    yield writer, reader
+    writer.dispose()
+    reader.dispose()
+
+
+def test_writer_pragmas_applied(engines):
+    writer, _ = engines
+    with writer.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+
+
+def test_routing_session_splits_reads_and_writes(engines):
+    writer, reader = engines
+    with RoutingSession(writer=writer, reader=reader) as s:
+        new_id = s.scalar(sa.insert(_items).values(name="a").returning(_items.c.id))
+        s.commit()
+        assert s.scalar(sa.select(_items.c.name).where(_items.c.id == new_id)) == "a"
+
+    with reader.connect() as conn, pytest.raises(OperationalError):
+        conn.exec_driver_sql("DELETE FROM items")
+
+
+@pytest.mark.parametrize(
+    "pragmas",
+    [
+        {"journal_mode": "WAL; DROP TABLE items"},
+        {"busy_timeout": "5000"},
+        {"cache_size": True},
+        {"foreign_keys; DROP TABLE items": 1},
+    ],
+)
+def test_pragmas_outside_whitelist_are_rejected(tmp_path, pragmas):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bad.db'}")
+    with pytest.raises(ValueError):
+        apply_sqlite_pragmas(engine, pragmas)
+    engine.dispose()
@@ -0,0 +1,90 @@
+from datetime import date, timedelta
+
+import pytest
+
+import app.topic_stats as topic_stats
+from app.database import engine
+from app.main import Topic
+from tests.test_topic_stats import _create, _insert_overdue, _live, _stats
+
+TODAY = date.today()
+
+
+def _progress(client) -> dict[str, int]:
+    return {t["title"]: t["progress"] for t in client.get("/topics").json()}
+
+
+def test_bulk_progress_pairs(client, count_statements):
+    a = _create(client, "A", 1)
+    b = _create(client, "B", 2)
+    c = _create(client, "C")
+    body = [
+        {"id": a, "progress": 10},
+        {"id": b, "progress": 100},
+        {"id": 999998, "progress": 5},
+        {"id": a, "progress": 60},
+        {"id": 999999, "progress": 5},
+    ]
+    with count_statements() as statements:
+        r = client.put("/topics/progress", json=body)
+    assert r.status_code == 200, r.text
+    assert r.json() == {"affected": 2, "missing": [999998, 999999]}
+    assert _progress(client) == {"A": 60, "B": 100, "C": 0}
+    # Один set-based UPDATE вместо SELECT + UPDATE на каждую тему
+    assert [s.split()[0] for s in statements] == ["UPDATE"]
+    assert client.get(f"/topics/{c}").json()["progress"] == 0
+
+
+@pytest.mark.parametrize(
+    "body", [[], [{"id": 1, "progress": 101}], [{"id": 1}]], ids=str
+)
+def test_bulk_progress_validation(client, body):
+    assert client.put("/topics/progress", json=body).status_code == 422
+
+
+def test_update_and_delete_by_filter(client):
+    soon = (TODAY + timedelta(2)).isoformat()
+    for i, days in enumerate([1, 2, 5, None]):
+        _create(client, f"T{i}", days)
+    _insert_overdue(40)
+
+    r = client.patch("/topics", params={"deadline_to": soon}, json={"progress": 100})
+    assert r.json() == {"affected": 3, "missing": []}
+    assert _progress(client) == {"T0": 100, "T1": 100, "T2": 0, "T3": 0, "Late 40": 100}
+
+    etag = client.get("/topics").headers["ETag"]
+    r = client.delete(
+        "/topics", params={"progress_min": 100, "deadline_to": TODAY.isoformat()}
+    )
+    assert r.json() == {"affected": 1, "missing": []}
+    assert set(_progress(client)) == {"T0", "T1", "T2", "T3"}
+    assert client.get("/topics").headers["ETag"] != etag
+
+    assert client.delete("/topics", params={"q": "T1"}).json()["affected"] == 1
+    assert client.delete("/topics", params={"overdue": True}).json()["affected"] == 0
+
+
+def test_filter_is_required(client):
+    _create(client, "Keep")
+    assert client.delete("/topics").status_code == 422
+    assert client.patch("/topics", json={"progress": 5}).status_code == 422
+    assert _progress(client) == {"Keep": 0}
+
+
+def test_bulk_writes_keep_summary_in_sync(client, monkeypatch):
+    monkeypatch.setattr(topic_stats, "TOPIC_STATS_SUMMARY", True)
+    ids = [_create(client, f"S{i}", i % 3 or None) for i in range(6)]
+    _insert_overdue(10)
+    topic_stats.rebuild_topic_stats(engine, Topic.__table__)
+
+    client.put(
+        "/topics/progress",
+        json=[{"id": ids[0], "progress": 100}, {"id": ids[1], "progress": 30}],
+    )
+    assert _stats(client) == _live(client, monkeypatch)
+    client.patch("/topics", params={"progress_max": 50}, json={"progress": 100})
+    assert _stats(client) == _live(client, monkeypatch)
+    client.delete("/topics", params={"deadline_from": TODAY.isoformat()})
+    stats = _stats(client)
+    assert stats == _live(client, monkeypatch)
+    assert stats["total"] == 3
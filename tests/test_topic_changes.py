@@ -0,0 +1,189 @@
+import json
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.database import session_scope
+from app.main import Topic, progress_buffer
+from app.topic_changes import (
+    change_notifier,
+    compact_changes,
+    stream_changes,
+    version_lock,
+)
+from tests.test_topic_stats import _create
+
+
+def _changes(client, since: int) -> dict[int, dict]:
+    page = client.get("/topics/changes", params={"since": since}).json()
+    assert not page["has_more"]
+    return {c["id"]: c for c in page["changes"]}
+
+
+def test_writes_are_logged_compactly(client, count_statements, changes_head):
+    since = changes_head()
+    a = _create(client, "A", 1)
+    b = _create(client, "B")
+    client.put(f"/topics/{a}/progress", json={"progress": 40})
+    client.put(f"/topics/{a}/progress", json={"progress": 70})
+    client.delete(f"/topics/{b}")
+
+    page = client.get("/topics/changes", params={"since": since}).json()
+    # По записи на тему: последнее состояние и tombstone удалённой
+    assert [(c["id"], c["deleted"]) for c in page["changes"]] == [
+        (a, False),
+        (b, True),
+    ]
+    assert page["changes"][0]["topic"]["progress"] == 70
+    assert page["changes"][1]["topic"] is None
+    assert page["version"] == page["changes"][-1]["version"]
+
+    # Нет изменений — пустая страница и та же версия, без чтения topics целиком
+    with count_statements() as statements:
+        empty = client.get("/topics/changes", params={"since": page["version"]})
+    assert empty.json() == {
+        "version": page["version"],
+        "has_more": False,
+        "changes": [],
+    }
+    assert len(statements) == 2
+
+
+def test_versions_are_monotonic_and_paged(client, changes_head):
+    since = changes_head()
+    ids = [_create(client, f"T{i}") for i in range(5)]
+    client.put(f"/topics/{ids[0]}/progress", json={"progress": 10})
+
+    seen: list[int] = []
+    versions: list[int] = []
+    params: dict = {"since": since, "limit": 2}
+    while params:
+        r = client.get("/topics/changes", params=params)
+        body = r.json()
+        assert len(body["changes"]) <= 2
+        assert body["has_more"] == ("X-Next-Cursor" in r.headers)
+        seen += [c["id"] for c in body["changes"]]
+        versions += [c["version"] for c in body["changes"]]
+        params = {}
+        if body["has_more"]:
+            params = {"cursor": r.headers["X-Next-Cursor"], "limit": 2}
+    # Обновлённая тема переехала в конец журнала
+    assert seen == ids[1:] + ids[:1]
+    assert versions == sorted(versions)
+
+
+def test_batch_bulk_and_filter_writes_are_logged(client, changes_head):
+    r = client.post("/topics/batch", json=[{"title": "X"}, {"title": "Y"}])
+    x, y = (item["id"] for item in r.json()["items"])
+    since = changes_head()
+
+    client.put("/topics/progress", json=[{"id": x, "progress": 100}])
+    assert set(_changes(client, since)) == {x}
+    since = changes_head()
+
+    client.delete("/topics", params={"progress_min": 100})
+    client.patch("/topics", params={"progress_max": 0}, json={"progress": 5})
+    changes = _changes(client, since)
+    assert changes[x]["deleted"] and not changes[y]["deleted"]
+    assert changes[y]["topic"]["progress"] == 5
+
+
+def test_buffered_progress_is_logged_on_flush(client, monkeypatch, changes_head):
+    a = _create(client, "A")
+    since = changes_head()
+    monkeypatch.setattr(progress_buffer, "enabled", True)
+    monkeypatch.setattr(progress_buffer, "interval", 3600.0)
+    client.put(f"/topics/{a}/progress", json={"progress": 30})
+    assert _changes(client, since) == {}
+    client.portal.call(progress_buffer.flush)
+    assert _changes(client, since)[a]["topic"]["progress"] == 30
+
+
+async def _compact() -> int:
+    async with session_scope() as db:
+        # Отрицательный возраст: под чистку попадают все tombstone
+        return await compact_changes(db, timedelta(seconds=-1))
+
+
+def test_compaction_expires_old_since(client, changes_head):
+    a = _create(client, "A")
+    b = _create(client, "B")
+    since = changes_head()
+    client.delete(f"/topics/{a}")
+    assert client.portal.call(_compact) >= 1
+
+    r = client.get("/topics/changes", params={"since": since})
+    assert r.status_code == 410
+    stream = client.get("/topics/changes/stream", headers={"Last-Event-ID": str(since)})
+    assert stream.status_code == 410
+
+    # Полная синхронизация постранично: промежуточные версии ниже горизонта
+    # не дают 410; живые темы есть, вычищенного tombstone нет
+    ids: set[int] = set()
+    r = client.get("/topics/changes", params={"limit": 1})
+    while True:
+        assert r.status_code == 200
+        ids |= {c["id"] for c in r.json()["changes"]}
+        if "X-Next-Cursor" not in r.headers:
+            break
+        cursor = r.headers["X-Next-Cursor"]
+        r = client.get("/topics/changes", params={"cursor": cursor, "limit": 1})
+    assert b in ids and a not in ids
+
+
+def test_invalid_cursor(client):
+    r = client.get("/topics/changes", params={"cursor": "bm90LWpzb24"})
+    assert r.status_code == 400
+
+
+@pytest.mark.parametrize("since", [-1, "x"])
+def test_since_validation(client, since):
+    r = client.get("/topics/changes", params={"since": since})
+    assert r.status_code == 422
+
+
+def test_stream_wakes_up_on_write(client, changes_head):
+    a = _create(client, "A")
+    since = changes_head() - 1
+    events = stream_changes(Topic.__table__, since, poll=30)
+    try:
+        first = client.portal.call(events.__anext__)
+        assert first.startswith(f"id: {since + 1}\nevent: changes\n")
+
+        # Следующее событие ждёт уведомления о commit, а не таймера
+        pending = client.portal.start_task_soon(events.__anext__)
+        client.put(f"/topics/{a}/progress", json={"progress": 90})
+        event = pending.result(timeout=5)
+    finally:
+        client.portal.call(events.aclose)
+    data = json.loads(event.split("data: ", 1)[1])
+    assert [(c["id"], c["topic"]["progress"]) for c in data["changes"]] == [(a, 90)]
+
+
+def test_stream_ends_on_disconnect_and_shutdown(client, changes_head):
+    async def disconnected() -> bool:
+        return True
+
+    events = stream_changes(
+        Topic.__table__, changes_head() - 1, is_disconnected=disconnected
+    )
+    with pytest.raises(StopAsyncIteration):
+        client.portal.call(events.__anext__)
+
+    events = stream_changes(Topic.__table__, changes_head(), poll=30)
+    pending = client.portal.start_task_soon(events.__anext__)
+    try:
+        # Остановка будит ждущий поток, не дожидаясь poll
+        client.portal.call(change_notifier.close)
+        with pytest.raises(StopAsyncIteration):
+            pending.result(timeout=5)
+    finally:
+        change_notifier.open()
+
+
+def test_versions_are_allocated_under_row_lock():
+    """Без триггеров версии выдаются под FOR UPDATE строки горизонта до commit."""
+    sql = str(version_lock().compile(dialect=postgresql.dialect()))
+    assert sql.endswith("FOR UPDATE")
+    assert "topic_change_horizon" in sql
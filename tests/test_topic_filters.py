@@ -0,0 +1,148 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.dialects import sqlite
+
+from app.database import engine
+from app.main import Topic, TopicFilters, _seek_after, topic_reads, topics_query
+from app.pagination import NEXT_CURSOR_HEADER, encode_cursor
+
+TODAY = date.today()
+
+
+def _seed(client) -> None:
+    deadlines = [None, TODAY + timedelta(days=1), TODAY + timedelta(days=5)]
+    for i in range(9):
+        deadline = deadlines[i % 3]
+        r = client.post(
+            "/topics",
+            json={"title": f"F{i}", "deadline": deadline and deadline.isoformat()},
+        )
+        assert r.status_code == 200
+        client.put(f"/topics/{r.json()['id']}/progress", json={"progress": i * 10})
+
+
+def _overdue(client) -> int:
+    # Прошедший дедлайн через API не создать: пишем напрямую
+    with engine.begin() as conn:
+        topic_id = conn.scalar(
+            Topic.__table__.insert()
+            .values(title="Late", deadline=TODAY - timedelta(days=2), progress=40)
+            .returning(Topic.id)
+        )
+        conn.scalar(
+            Topic.__table__.insert()
+            .values(title="Done", deadline=TODAY - timedelta(days=2), progress=100)
+            .returning(Topic.id)
+        )
+    topic_reads.bump()
+    return topic_id
+
+
+def test_deadline_range(client):
+    _seed(client)
+    params = {"deadline_from": TODAY.isoformat(), "deadline_to": TODAY + timedelta(3)}
+    items = client.get("/topics", params=params).json()
+    assert len(items) == 3
+    assert {t["deadline"] for t in items} == {(TODAY + timedelta(1)).isoformat()}
+
+
+def test_progress_range_sorted_by_progress_with_cursor(client, collect_pages):
+    _seed(client)
+    params = {"progress_min": 20, "progress_max": 70, "sort": "progress", "limit": 2}
+    items = collect_pages(params)
+    assert [t["progress"] for t in items] == [20, 30, 40, 50, 60, 70]
+
+
+def test_overdue_and_sort_by_deadline(client, collect_pages):
+    _seed(client)
+    late = _overdue(client)
+    assert [t["id"] for t in client.get("/topics?overdue=true").json()] == [late]
+
+    items = collect_pages({"sort": "deadline", "limit": 4, "progress_min": 30})
+    keys = [(t["deadline"] is not None, t["deadline"] or "", t["id"]) for t in items]
+    assert keys == sorted(keys) and all(t["progress"] >= 30 for t in items)
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"deadline_from": "2030-01-02", "deadline_to": "2030-01-01"},
+        {"progress_min": 60, "progress_max": 10},
+        {"progress_min": 101},
+    ],
+)
+def test_invalid_ranges(client, params):
+    assert client.get("/topics", params=params).status_code == 422
+
+
+def test_filters_are_part_of_cache_key(client):
+    _seed(client)
+    everything = client.get("/topics")
+    filtered = client.get("/topics", params={"progress_min": 50})
+    assert everything.headers["ETag"] != filtered.headers["ETag"]
+    assert len(filtered.json()) < len(everything.json())
+    r = client.get("/topics", params={"progress_min": 50, "limit": 1})
+    assert NEXT_CURSOR_HEADER in r.headers
+
+
+# ---- Планы запросов ----
+# Форма фильтра -> ведущая колонка индекса
+SHAPES = {
+    "deadline_from": (TopicFilters(deadline_from=TODAY), "deadline"),
+    "deadline_range": (
+        TopicFilters(deadline_from=TODAY, deadline_to=TODAY + timedelta(7)),
+        "deadline",
+    ),
+    "progress_min": (TopicFilters(progress_min=50), "progress"),
+    "progress_range": (TopicFilters(progress_min=10, progress_max=50), "progress"),
+    # Оба условия: диапазон по deadline, progress проверяется внутри индекса
+    "overdue": (TopicFilters(overdue=True), "deadline"),
+}
+# (колонка отбора, колонка сортировки) -> индекс (отбор, сортировка, id)
+INDEXES = {
+    ("deadline", "id"): "ix_topics_deadline_id",
+    ("deadline", "deadline"): "ix_topics_deadline_id",
+    ("deadline", "progress"): "ix_topics_deadline_progress_id",
+    ("progress", "id"): "ix_topics_progress_id",
+    ("progress", "progress"): "ix_topics_progress_id",
+    ("progress", "deadline"): "ix_topics_progress_deadline_id",
+}
+CURSORS = {
+    "id": {"s": "id", "id": 10},
+    "deadline": {"s": "deadline", "id": 10, "d": TODAY.isoformat()},
+    "progress": {"s": "progress", "id": 10, "p": 30},
+}
+
+
+def _plan(stmt) -> list[str]:
+    sql = stmt.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        return [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def test_indexes_exist():
+    names = {ix["name"] for ix in inspect(engine).get_indexes("topics")}
+    assert set(INDEXES.values()) <= names
+
+
+@pytest.mark.parametrize("sort", ["id", "deadline", "progress"])
+@pytest.mark.parametrize("shape", list(SHAPES))
+@pytest.mark.parametrize("with_cursor", [False, True])
+def test_every_filter_searches_an_index(shape, sort, with_cursor):
+    filters, column = SHAPES[shape]
+    index = INDEXES[column, sort]
+    stmt = topics_query(filters, sort, TODAY)
+    if with_cursor:
+        stmt = stmt.where(_seek_after(sort, encode_cursor(CURSORS[sort])))
+    plan = _plan(stmt.limit(21))
+    topics_steps = [step for step in plan if " topics" in step]
+    # Никакого SCAN: план начинается с диапазона фильтра по индексу
+    # (отбор, сортировка, id), а не с обхода в порядке сортировки
+    assert len(topics_steps) == 1, plan
+    assert topics_steps[0].startswith(
+        f"SEARCH topics USING INDEX {index} ({column}"
+    ), plan
+    # Если сортировка совпадает с отбором, порядок даёт сам индекс
+    assert ("USE TEMP B-TREE FOR ORDER BY" in plan) == (column != sort), plan
@@ -0,0 +1,95 @@
+import pytest
+
+import app.search as search
+from app.database import engine
+from app.main import topic_reads
+from app.pagination import NEXT_CURSOR_HEADER
+
+TITLES = [
+    "Linear algebra",
+    "Algebraic topology",
+    "Algorithms",
+    "Алгебра логики",
+    'Quote "x" 50%_',
+]
+
+
+@pytest.fixture()
+def ids(client):
+    result = {}
+    for title in TITLES:
+        r = client.post("/topics", json={"title": title})
+        assert r.status_code == 200
+        result[title] = r.json()["id"]
+    return result
+
+
+def _titles(client, **params) -> list[str]:
+    r = client.get("/topics", params=params)
+    assert r.status_code == 200, r.text
+    return [t["title"] for t in r.json()]
+
+
+def test_substring_search_is_case_insensitive(client, ids):
+    assert set(_titles(client, q="ALGEB")) == {"Linear algebra", "Algebraic topology"}
+    assert _titles(client, q="лгеб") == ["Алгебра логики"]
+    assert _titles(client, q="nothing here") == []
+
+
+def test_user_input_is_not_query_syntax(client, ids):
+    assert _titles(client, q='"x" 50%_') == ['Quote "x" 50%_']
+    assert _titles(client, q="NOT") == []
+    assert _titles(client, q="%") == ['Quote "x" 50%_']
+
+
+def test_short_query_falls_back_to_like(client, ids):
+    # Короче триграммы: FTS5 не найдёт, отвечает LIKE; совпадения с начала — выше
+    assert _titles(client, q="al")[:2] == ["Algebraic topology", "Algorithms"]
+    assert "Linear algebra" in _titles(client, q="al")
+
+
+def test_like_fallback_without_fts(client, ids, monkeypatch):
+    monkeypatch.setattr(search, "fts_enabled", False)
+    topic_reads.bump()
+    assert set(_titles(client, q="algeb")) == {"Linear algebra", "Algebraic topology"}
+
+
+def test_relevance_pages_walk_all_matches_once(client, ids, collect_pages):
+    items = collect_pages({"q": "alg", "limit": 1})
+    assert sorted(t["id"] for t in items) == sorted(
+        ids[t] for t in ("Linear algebra", "Algebraic topology", "Algorithms")
+    )
+    assert all("rank" not in t for t in items)
+
+
+def test_search_combines_with_filters_and_sort(client, ids):
+    client.put(f"/topics/{ids['Algorithms']}/progress", json={"progress": 80})
+    assert _titles(client, q="alg", progress_min=50) == ["Algorithms"]
+    r = client.get("/topics", params={"q": "alg", "sort": "id", "limit": 2})
+    assert [t["id"] for t in r.json()] == sorted(r.json()[i]["id"] for i in range(2))
+    assert NEXT_CURSOR_HEADER in r.headers
+
+
+def test_relevance_requires_query(client):
+    assert client.get("/topics", params={"sort": "relevance"}).status_code == 422
+
+
+def test_triggers_follow_writes(client, ids):
+    client.delete(f"/topics/{ids['Algorithms']}")
+    assert "Algorithms" not in _titles(client, q="algo")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "UPDATE topics SET title = 'Graph theory' WHERE id = ?",
+            (ids["Linear algebra"],),
+        )
+    topic_reads.bump()
+    assert _titles(client, q="graph") == ["Graph theory"]
+    assert "Graph theory" not in _titles(client, q="algeb")
+
+
+def test_install_indexes_existing_rows(client, ids):
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE topics_fts")
+    assert search.install_fts(engine)
+    topic_reads.bump()
+    assert _titles(client, q="topolog") == ["Algebraic topology"]
@@ -0,0 +1,167 @@
+from collections import Counter
+from datetime import date, timedelta
+
+import pytest
+
+import app.topic_stats as topic_stats
+from app.database import engine
+from app.main import Topic, topic_reads
+
+TODAY = date.today()
+
+
+def _stats(client) -> dict:
+    r = client.get("/topics/stats")
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _create(client, title: str, days: int | None = None) -> int:
+    deadline = None if days is None else (TODAY + timedelta(days)).isoformat()
+    r = client.post("/topics", json={"title": title, "deadline": deadline})
+    assert r.status_code == 200
+    return r.json()["id"]
+
+
+def _insert_overdue(progress: int) -> int:
+    # Прошедший дедлайн через API не создать
+    with engine.begin() as conn:
+        topic_id = conn.scalar(
+            Topic.__table__.insert()
+            .values(title=f"Late {progress}", deadline=TODAY - timedelta(3))
+            .values(progress=progress)
+            .returning(Topic.id)
+        )
+    topic_reads.bump()
+    return topic_id
+
+
+@pytest.fixture()
+def summary_mode(monkeypatch):
+    monkeypatch.setattr(topic_stats, "TOPIC_STATS_SUMMARY", True)
+    topic_stats.rebuild_topic_stats(engine, Topic.__table__)
+    topic_reads.bump()
+
+
+def _live(client, monkeypatch) -> dict:
+    """Эталон: те же цифры через GROUP BY по topics."""
+    with monkeypatch.context() as m:
+        m.setattr(topic_stats, "TOPIC_STATS_SUMMARY", False)
+        topic_reads.bump()
+        expected = _stats(client)
+    topic_reads.bump()
+    return expected
+
+
+def test_empty(client):
+    assert _stats(client) == {
+        "total": 0,
+        "completed": 0,
+        "overdue": 0,
+        "undated": 0,
+        "avg_progress": 0.0,
+        "deadlines_per_week": [],
+    }
+
+
+def test_group_by_stats(client):
+    a = _create(client, "A", 1)
+    _create(client, "B", 1)
+    _create(client, "C", 8)
+    _create(client, "D")
+    client.put(f"/topics/{a}/progress", json={"progress": 100})
+    _insert_overdue(50)
+    _insert_overdue(100)
+
+    stats = _stats(client)
+    assert stats["total"] == 6
+    assert stats["completed"] == 2
+    assert stats["overdue"] == 1
+    assert stats["undated"] == 1
+    assert stats["avg_progress"] == round(250 / 6, 2)
+    deadlines = [TODAY + timedelta(d) for d in (1, 1, 8, -3, -3)]
+    expected = Counter((d - timedelta(d.weekday())).isoformat() for d in deadlines)
+    assert stats["deadlines_per_week"] == [
+        {"week_start": week, "count": count} for week, count in sorted(expected.items())
+    ]
+
+
+def test_stats_are_cached_until_write(client):
+    first = client.get("/topics/stats")
+    r = client.get("/topics/stats", headers={"If-None-Match": first.headers["ETag"]})
+    assert r.status_code == 304
+    _create(client, "New", 2)
+    assert _stats(client)["total"] == 1
+
+
+def test_summary_follows_every_write(client, monkeypatch, summary_mode):
+    _insert_overdue(30)
+    topic_stats.rebuild_topic_stats(engine, Topic.__table__)
+    a = _create(client, "S1", 1)
+    b = _create(client, "S2", 9)
+    _create(client, "S3")
+    assert _stats(client) == _live(client, monkeypatch)
+
+    r = client.post(
+        "/topics/batch",
+        json=[{"title": "S4", "deadline": (TODAY + timedelta(1)).isoformat()}] * 2,
+    )
+    assert r.json()["created"] == 1
+    assert _stats(client) == _live(client, monkeypatch)
+
+    client.put(f"/topics/{a}/progress", json={"progress": 100})
+    client.put(f"/topics/{b}/progress", json={"progress": 40})
+    client.put(f"/topics/{a}/progress", json={"progress": 70})
+    assert (
+        client.put("/topics/999999/progress", json={"progress": 5}).status_code == 404
+    )
+    assert _stats(client) == _live(client, monkeypatch)
+
+    client.delete(f"/topics/{b}")
+    assert client.delete("/topics/999999").status_code == 404
+    stats = _stats(client)
+    assert stats == _live(client, monkeypatch)
+    assert stats["total"] == 4 and stats["overdue"] == 1
+
+
+def test_summary_read_does_not_touch_topics(client, summary_mode, count_statements):
+    _create(client, "Q", 1)
+    topic_reads.bump()
+    with count_statements() as statements:
+        assert _stats(client)["total"] == 1
+    assert statements
+    assert not any("FROM topics" in s for s in statements)
+
+
+def _tables(statements: list[str]) -> list[str]:
+    """'UPDATE topic_stats SET ...' -> 'UPDATE topic_stats'."""
+    verbs = {"INSERT": 2, "UPDATE": 1, "DELETE": 2}
+    return [f"{s.split()[0]} {s.split()[verbs[s.split()[0]]]}" for s in statements]
+
+
+def test_summary_write_statement_counts(client, summary_mode, count_statements):
+    """Цена summary: счётчики — отдельные запросы в транзакции записи."""
+    for days, on_create in (
+        (None, ["INSERT topics", "UPDATE topic_stats"]),
+        # Первая тема на дату ещё и заводит строку topic_deadline_stats
+        (5, ["INSERT topics", "UPDATE topic_stats", "INSERT topic_deadline_stats"]),
+    ):
+        with count_statements() as statements:
+            topic_id = _create(client, f"Cost {days}", days)
+        assert _tables(statements) == on_create
+
+        with count_statements() as statements:
+            client.put(f"/topics/{topic_id}/progress", json={"progress": 100})
+        assert _tables(statements) == [
+            "UPDATE topic_stats",
+            "UPDATE topic_deadline_stats",
+            "UPDATE topics",
+        ]
+
+        with count_statements() as statements:
+            client.delete(f"/topics/{topic_id}")
+        assert _tables(statements) == [
+            "UPDATE topic_stats",
+            "UPDATE topic_deadline_stats",
+            "DELETE topics",
+        ]
@@ -0,0 +1,111 @@
+import asyncio
+import hashlib
+import time
+
+import pytest
+
+import app.main as appmod
+from app.file_serving import RangeFileResponse, parse_range
+from app.secure_files import PNG
+
+
+@pytest.fixture()
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(appmod, "UPLOAD_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture()
+def uploaded(client, upload_dir):
+    data = PNG + f"download-{time.time_ns()}".encode() * 20_000
+    body = client.post("/upload", files={"file": ("a.png", data)}).json()
+    return body["name"], data
+
+
+def test_download_full_with_cache_headers(client, uploaded):
+    name, data = uploaded
+    r = client.get(f"/uploads/{name}")
+    assert r.status_code == 200
+    assert r.content == data
+    assert r.headers["content-type"] == "image/png"
+    assert r.headers["etag"] == f'"{hashlib.sha256(data).hexdigest()}"'
+    assert "immutable" in r.headers["cache-control"]
+    assert r.headers["accept-ranges"] == "bytes"
+
+
+def test_if_none_match_returns_304(client, uploaded, upload_dir):
+    name, _ = uploaded
+    etag = client.get(f"/uploads/{name}").headers["etag"]
+    # 304 не смотрит на файл: он может даже исчезнуть с диска
+    for blob in upload_dir.rglob("*.png"):
+        blob.unlink()
+    r = client.get(f"/uploads/{name}", headers={"If-None-Match": f"W/{etag}"})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+    assert client.get(f"/uploads/{name}").status_code == 404
+
+
+def test_range_requests(client, uploaded):
+    name, data = uploaded
+    url = f"/uploads/{name}"
+    r = client.get(url, headers={"Range": "bytes=10-99"})
+    assert r.status_code == 206
+    assert r.content == data[10:100]
+    assert r.headers["content-range"] == f"bytes 10-99/{len(data)}"
+    assert r.headers["content-length"] == "90"
+
+    r = client.get(url, headers={"Range": "bytes=-8"})
+    assert r.status_code == 206 and r.content == data[-8:]
+
+    r = client.get(url, headers={"Range": f"bytes={len(data)}-"})
+    assert r.status_code == 416
+    assert r.headers["content-range"] == f"bytes */{len(data)}"
+
+    # If-Range с чужим ETag — отдаём файл целиком
+    r = client.get(url, headers={"Range": "bytes=0-1", "If-Range": '"other"'})
+    assert r.status_code == 200 and r.content == data
+
+
+def test_unknown_or_malformed_names_are_404(client, upload_dir):
+    assert client.get("/uploads/" + "0" * 64 + ".png").status_code == 404
+    assert client.get("/uploads/..%2F..%2Fetc%2Fpasswd").status_code == 404
+
+
+def test_parse_range_edge_cases():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-0,5-6", 100) is None
+    assert parse_range("items=0-5", 100) is None
+    assert parse_range("bytes=50-", 100) == (50, 99)
+    assert parse_range("bytes=90-500", 100) == (90, 99)
+    assert parse_range("bytes=-500", 100) == (0, 99)
+
+
+def test_zerocopy_extension_is_used_when_advertised(tmp_path):
+    path = tmp_path / "blob.png"
+    path.write_bytes(b"0123456789")
+    sent: list[dict] = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request"}
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "extensions": {"http.response.zerocopysend": {}},
+    }
+    response = RangeFileResponse(path, path.stat(), (2, 5))
+    asyncio.run(response(scope, receive, send))
+    assert sent[0]["status"] == 206
+    assert sent[1]["type"] == "http.response.zerocopysend"
+    assert (sent[1]["offset"], sent[1]["count"]) == (2, 4)
+
+
+def test_download_route_is_documented(client):
+    r = client.get("/openapi.json")
+    assert r.status_code == 200
+    responses = r.json()["paths"]["/uploads/{name}"]["get"]["responses"]
+    assert {"200", "206", "304", "416"} <= responses.keys()
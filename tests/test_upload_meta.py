@@ -0,0 +1,88 @@
+import struct
+import time
+import zlib
+
+import pytest
+
+import app.main as appmod
+from app.image_meta import ImageHeaderParser
+from app.pagination import NEXT_CURSOR_HEADER
+from app.secure_files import EOI, PNG, SOI
+
+
+def _png(width: int, height: int, salt: bytes = b"") -> bytes:
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    chunk = struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr
+    return PNG + chunk + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr)) + salt
+
+
+def _jpeg(width: int, height: int, exif_bytes: int = 0) -> bytes:
+    app1 = b"\xff\xe1" + struct.pack(">H", exif_bytes + 2) + b"E" * exif_bytes
+    sof = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00"
+    return SOI + app1 + sof + b"\xff\xda\x00\x02" + b"\x00" * 100 + EOI
+
+
+@pytest.fixture()
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(appmod, "UPLOAD_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 64 * 1024])
+def test_parser_reads_dimensions_from_any_chunking(chunk):
+    for mime, data, dims in (
+        ("image/png", _png(640, 480), (640, 480)),
+        ("image/jpeg", _jpeg(1920, 1080, exif_bytes=30_000), (1920, 1080)),
+    ):
+        parser = ImageHeaderParser(mime)
+        for i in range(0, len(data), chunk):
+            parser.feed(data[i : i + chunk])
+        assert parser.done
+        assert (parser.width, parser.height) == dims
+
+
+def test_parser_without_header_leaves_dimensions_empty():
+    parser = ImageHeaderParser("image/png")
+    parser.feed(PNG + b"\x00" * 100)
+    assert parser.done and parser.width is None
+
+
+def test_upload_records_metadata_and_lists_it(client, upload_dir):
+    salt = f"meta-{time.time_ns()}".encode()
+    png = _png(4000, 3000, salt)
+    jpeg = _jpeg(4001, 2999, exif_bytes=5000)[:-2] + salt + EOI
+    r = client.post("/upload", files={"file": ("a.png", png)})
+    assert (r.json()["width"], r.json()["height"]) == (4000, 3000)
+    client.post("/upload", files={"file": ("b.jpg", jpeg)})
+
+    # Дальше индекс не должен обращаться к файлам
+    for blob in upload_dir.rglob("*.*"):
+        blob.unlink()
+
+    r = client.get("/uploads", params={"min_width": 4000, "limit": 1})
+    assert r.status_code == 200
+    (newest,) = r.json()
+    assert newest["mime"] == "image/jpeg"
+    assert (newest["width"], newest["height"]) == (4001, 2999)
+    assert newest["size"] == len(jpeg)
+
+    r = client.get(
+        "/uploads",
+        params={"min_width": 4000, "limit": 1, "cursor": r.headers[NEXT_CURSOR_HEADER]},
+    )
+    (older,) = r.json()
+    assert older["name"].endswith(".png") and older["width"] == 4000
+
+    r = client.get("/uploads", params={"mime": "image/png", "min_height": 3000})
+    assert all(i["mime"] == "image/png" and i["height"] >= 3000 for i in r.json())
+    assert client.get("/uploads", params={"cursor": "!!"}).status_code == 400
+
+
+def test_released_uploads_are_not_listed(client, upload_dir):
+    png = _png(5000, 5001, f"rel-{time.time_ns()}".encode())
+    name = client.post("/upload", files={"file": ("a.png", png)}).json()["name"]
+    listed = client.get("/uploads", params={"min_height": 5001}).json()
+    assert name in {i["name"] for i in listed}
+    client.delete(f"/uploads/{name}")
+    listed = client.get("/uploads", params={"min_height": 5001}).json()
+    assert name not in {i["name"] for i in listed}
@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import os
+import time
+
+import pytest
+
+import app.main as appmod
+from app.database import session_scope
+from app.secure_files import PNG, StreamingImageWriter, blob_relpath, parse_blob_name
+from app.upload_store import collect_garbage, commit_upload
+
+
+@pytest.fixture()
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(appmod, "UPLOAD_DIR", tmp_path)
+    return tmp_path
+
+
+def _png(seed: str) -> bytes:
+    return PNG + seed.encode() * 1000
+
+
+def _gc(root, grace_seconds=0) -> int:
+    async def run():
+        async with session_scope() as db:
+            return await collect_garbage(db, root, grace_seconds=grace_seconds)
+
+    return asyncio.run(run())
+
+
+def test_upload_is_content_addressed_and_sharded(client, upload_dir):
+    data = _png(f"shard-{time.time_ns()}")
+    digest = hashlib.sha256(data).hexdigest()
+    r = client.post("/upload", files={"file": ("a.png", data)})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["sha256"] == digest
+    # path остался именем файла, как до шардирования
+    assert body["path"] == body["name"] == f"{digest}.png"
+    assert body["deduplicated"] is False
+    assert (
+        upload_dir / f"{digest[:2]}/{digest[2:4]}/{digest}.png"
+    ).read_bytes() == data
+    assert parse_blob_name(body["name"]) == (digest, ".png")
+
+
+def test_duplicate_upload_is_not_rewritten(client, upload_dir):
+    data = _png(f"dup-{time.time_ns()}")
+    first = client.post("/upload", files={"file": ("a.png", data)}).json()
+    blob = upload_dir / blob_relpath(first["sha256"], ".png")
+    mtime = blob.stat().st_mtime_ns
+    second = client.post("/upload", files={"file": ("b.png", data)}).json()
+    assert second["path"] == first["path"]
+    assert second["deduplicated"] is True
+    assert blob.stat().st_mtime_ns == mtime
+    files = [p for p in upload_dir.rglob("*") if p.is_file()]
+    assert files == [blob]
+
+
+def test_gc_removes_only_unreferenced_blobs(client, upload_dir):
+    data = _png(f"gc-{time.time_ns()}")
+    body = client.post("/upload", files={"file": ("a.png", data)}).json()
+    client.post("/upload", files={"file": ("a.png", data)})
+    blob = upload_dir / blob_relpath(body["sha256"], ".png")
+
+    assert client.delete(f"/uploads/{body['name']}").json()["refcount"] == 1
+    _gc(upload_dir)
+    assert blob.exists()
+
+    assert client.delete(f"/uploads/{body['name']}").json()["refcount"] == 0
+    # В пределах grace-периода blob ещё жив
+    _gc(upload_dir, grace_seconds=3600)
+    assert blob.exists()
+    assert _gc(upload_dir) >= 1
+    assert not blob.exists()
+    assert client.delete(f"/uploads/{body['name']}").status_code == 404
+
+
+class _FailingDb:
+    rolled_back = False
+
+    async def execute(self, statement, params=None):
+        raise RuntimeError("db is down")
+
+    async def rollback(self) -> None:
+        self.rolled_back = True
+
+
+def test_failed_index_write_removes_new_blob(upload_dir):
+    async def scenario(db):
+        writer = StreamingImageWriter(upload_dir)
+        await writer.write(_png(f"fail-{time.time_ns()}"))
+        staged = await writer.finish()
+        await commit_upload(db, writer, staged)
+
+    db = _FailingDb()
+    with pytest.raises(RuntimeError):
+        asyncio.run(scenario(db))
+    assert db.rolled_back
+    # Ни blob без строки индекса, ни временного файла
+    assert [p for p in upload_dir.rglob("*") if p.is_file()] == []
+
+
+def test_gc_removes_stale_part_files(upload_dir):
+    stale = upload_dir / ".upload-old.part"
+    stale.write_bytes(b"x")
+    old = time.time() - 2 * 3600
+    os.utime(stale, (old, old))
+    fresh = upload_dir / ".upload-new.part"
+    fresh.write_bytes(b"x")
+    _gc(upload_dir)
+    assert not stale.exists()
+    assert fresh.exists()
+
+
+def test_release_rejects_bad_names(client):
+    assert client.delete("/uploads/..%2Fetc.png").status_code == 404
+    assert client.delete("/uploads/" + "0" * 64 + ".png").status_code == 404
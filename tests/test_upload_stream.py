@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+import app.main as appmod
+from app.secure_files import EOI, PNG, SOI, StreamingImageWriter
+
+PNG_BYTES = PNG + b"\x00" * 100_000
+JPEG_BYTES = SOI + b"\x00" * 1000 + EOI
+
+
+@pytest.fixture()
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(appmod, "UPLOAD_DIR", tmp_path)
+    return tmp_path
+
+
+def test_upload_streams_png_and_jpeg(client, upload_dir):
+    for name, data in (("a.png", PNG_BYTES), ("b.jpg", JPEG_BYTES)):
+        r = client.post("/upload", files={"file": (name, data)})
+        assert r.status_code == 200, r.text
+        (saved,) = upload_dir.rglob(r.json()["path"])
+        assert saved.read_bytes() == data
+    # Временные .part-файлы не остаются
+    files = [p for p in upload_dir.rglob("*") if p.is_file()]
+    assert sorted(p.suffix for p in files) == [".jpg", ".png"]
+
+
+def test_upload_rejects_bad_type_and_cleans_up(client, upload_dir):
+    r = client.post("/upload", files={"file": ("x.txt", b"not an image at all")})
+    assert r.status_code == 400
+    truncated_jpeg = SOI + b"\x00" * 1000
+    assert (
+        client.post("/upload", files={"file": ("c.jpg", truncated_jpeg)}).status_code
+        == 400
+    )
+    assert list(upload_dir.iterdir()) == []
+
+
+def test_upload_requires_file_field(client, upload_dir):
+    r = client.post("/upload", files={"other": ("a.png", PNG_BYTES)})
+    assert r.status_code == 422
+
+
+def test_writer_enforces_received_size(tmp_path):
+    async def run():
+        writer = StreamingImageWriter(tmp_path, max_size=16)
+        await writer.write(PNG + b"\x00" * 8)
+        with pytest.raises(ValueError, match="too large"):
+            await writer.write(b"\x00")
+        await writer.abort()
+
+    asyncio.run(run())
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,36 @@
+def _verbs(statements: list[str]) -> list[str]:
+    return [s.split()[0].upper() for s in statements]
+
+
+def test_each_write_is_single_statement(client, count_statements):
+    with count_statements() as create_sql:
+        r = client.post("/topics", json={"title": "One trip"})
+    assert r.status_code == 200
+    assert _verbs(create_sql) == ["INSERT"]
+    tid = r.json()["id"]
+    assert r.json()["progress"] == 0
+
+    with count_statements() as update_sql:
+        assert (
+            client.put(f"/topics/{tid}/progress", json={"progress": 70}).status_code
+            == 200
+        )
+    assert _verbs(update_sql) == ["UPDATE"]
+
+    with count_statements() as delete_sql:
+        assert client.delete(f"/topics/{tid}").status_code == 200
+    assert _verbs(delete_sql) == ["DELETE"]
+
+
+def test_empty_returning_maps_to_problem_json(client):
+    client.post("/topics", json={"title": "Dup"})
+    dup = client.post("/topics", json={"title": "Dup"})
+    assert dup.status_code == 409
+    assert dup.json()["detail"] == "Topic duplicate"
+
+    for r in (
+        client.put("/topics/424242/progress", json={"progress": 1}),
+        client.delete("/topics/424242"),
+    ):
+        assert r.status_code == 404
+        assert r.headers["content-type"].startswith("application/problem+json")